@@ -0,0 +1,157 @@
+"""
+Module: Analysis Cache
+
+This module memoizes content warning analysis results. A result is keyed by a hash of the
+normalized description together with a fingerprint of the keyword lists and the fuzzy threshold,
+so any edit to the keyword lists produces new keys and old results are never served for them.
+
+Results are kept in a bounded in-memory LRU tier, optionally backed by a persistent tier (a
+ResponseCache database) that survives restarts and can be shared between runs.
+
+Attributes:
+    DEFAULT_MAX_ENTRIES (int): Default number of results kept in memory.
+    ANALYSIS_TTL (int): Time to live of persisted results, in seconds.
+"""
+
+import hashlib  # For hashing descriptions and keyword lists
+import json  # For fingerprinting the keyword lists
+import threading  # For sharing the cache between threads
+from collections import OrderedDict  # For the LRU order of the memory tier
+
+DEFAULT_MAX_ENTRIES = 4096
+ANALYSIS_TTL = 365 * 24 * 60 * 60  # Results only depend on the key, so they can live long
+
+
+def keyword_fingerprint(keyword_warnings):
+    """
+    Computes a fingerprint of a keyword dictionary. Any change to a category, a keyword or their
+    order changes the fingerprint.
+
+    Args:
+        keyword_warnings (dict): Mapping of warning category name to a list of keywords.
+
+    Returns:
+        str: A hex digest identifying the keyword lists.
+    """
+
+    encoded = json.dumps(keyword_warnings, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def analysis_key(normalized_description, fingerprint, threshold, scorer=None):
+    """
+    Builds the cache key of an analysis result.
+
+    Args:
+        normalized_description (str): The description, normalized the way the analysis sees it.
+        fingerprint (str): The keyword_fingerprint of the keyword lists used.
+        threshold (int): The fuzzy matching threshold used.
+        scorer (str, optional): Name of the fuzzy scorer used, if not the default partial_ratio.
+
+    Returns:
+        str: A hex digest identifying the result.
+    """
+
+    digest = hashlib.sha256()
+    digest.update(f"{fingerprint}|{threshold}|".encode("utf-8"))
+    if scorer is not None:
+        digest.update(f"{scorer}|".encode("utf-8"))
+    digest.update(normalized_description.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    A two-tier cache of analysis results: a bounded in-memory LRU, optionally backed by a persistent tier.
+
+    Args:
+        max_entries (int, optional): Number of results kept in memory. Defaults to DEFAULT_MAX_ENTRIES.
+        persistent (ResponseCache, optional): A persistent cache to read through and write through to.
+    """
+
+    KIND = "analysis"  # Kind of the entries in the persistent tier
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, persistent=None):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> tuple of warnings, least recently used first
+        self._lock = threading.Lock()
+        if persistent is not None:
+            persistent.ttls.setdefault(self.KIND, ANALYSIS_TTL)
+
+    def get(self, key):
+        """
+        Returns the cached warnings for a key, or None if the result is not cached.
+
+        Args:
+            key (str): The key built by analysis_key.
+
+        Returns:
+            list: A new list of warning types, or None.
+        """
+
+        with self._lock:
+            warnings = self._entries.get(key)
+            if warnings is not None:
+                self._entries.move_to_end(key)  # Mark as most recently used
+                self.hits += 1
+                return list(warnings)
+
+        if self.persistent is not None:
+            stored = self.persistent.get_json(self.KIND, key)
+            if stored is not None:
+                self._remember(key, tuple(stored))  # Promote to the memory tier
+                with self._lock:
+                    self.hits += 1
+                return list(stored)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key, warnings):
+        """
+        Stores the warnings for a key in the memory tier and, if configured, the persistent tier.
+
+        Args:
+            key (str): The key built by analysis_key.
+            warnings (list): The warning types found.
+        """
+
+        self._remember(key, tuple(warnings))
+        if self.persistent is not None:
+            self.persistent.set_json(self.KIND, key, list(warnings))
+
+    def _remember(self, key, warnings):
+        """
+        Adds a result to the memory tier, evicting the least recently used results over max_entries.
+        """
+
+        with self._lock:
+            self._entries[key] = warnings
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Empties the memory tier and resets the counters (the persistent tier is left untouched).
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Reports the hit/miss counters and the number of results held in memory.
+
+        Returns:
+            dict: "hits", "misses" and "entries".
+        """
+
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
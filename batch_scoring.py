@@ -0,0 +1,120 @@
+"""
+Module: Batch Scoring
+
+This module scores large numbers of book descriptions for content warnings by fanning the work out
+over a pool of worker processes. Results are streamed back as they are produced, so whole catalogues
+can be rated without holding every description or result in memory.
+
+The keyword tables (KEYWORD_MATCHER and KEYWORD_FUZZY_INDEX) are built when content_analysis is
+imported, which happens once per worker process rather than once per description.
+"""
+
+import os  # For the default number of worker processes
+from collections import deque  # For the queue of in-flight chunks in submission order
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED  # For the process pool
+from itertools import islice  # For cutting the input stream into chunks
+
+from content_analysis import analyze_description  # The per-description analysis
+
+
+def score_description(description, threshold=80):
+    """
+    Scores one description, treating a missing or empty description as having no warnings.
+
+    Args:
+        description (str): The book description (may be empty or None).
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+
+    Returns:
+        list: A list of warning types found in the description.
+    """
+
+    return analyze_description(description, threshold) if description else []
+
+
+def _score_chunk(chunk, threshold):
+    """
+    Worker task: scores a chunk of (id, description) pairs.
+    """
+
+    return [(item_id, score_description(description, threshold)) for item_id, description in chunk]
+
+
+def _chunks(items, chunksize):
+    """
+    Cuts an iterable of (id, description) pairs into lists of at most chunksize pairs, lazily.
+    """
+
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_batch(items, threshold=80, processes=None, chunksize=64, ordered=True, max_pending=None):
+    """
+    Scores an iterable of (id, description) pairs over a process pool and streams back the results.
+
+    The input is consumed lazily in chunks, and at most max_pending chunks are in flight at any time,
+    so memory use stays bounded however long the input is.
+
+    Args:
+        items (iterable): (id, description) pairs. The id can be any picklable value.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+        processes (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            With processes=1 the work is done in the calling process, without a pool.
+        chunksize (int, optional): Number of descriptions sent to a worker at a time. Defaults to 64.
+        ordered (bool, optional): Yield results in input order (True, the default) or as soon as
+            each chunk finishes (False).
+        max_pending (int, optional): Maximum number of chunks in flight. Defaults to twice the
+            number of processes.
+
+    Yields:
+        tuple: (id, warnings) for each input pair, where warnings is a list of warning types.
+
+    Raises:
+        ValueError: If chunksize or processes is less than 1.
+    """
+
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1.")
+    processes = processes or os.cpu_count() or 1
+    if processes < 1:
+        raise ValueError("processes must be at least 1.")
+
+    if processes == 1:
+        # No pool needed: score in this process, still streaming one chunk at a time
+        for chunk in _chunks(items, chunksize):
+            for result in _score_chunk(chunk, threshold):
+                yield result
+        return
+
+    max_pending = max_pending or processes * 2
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        if ordered:
+            pending = deque()  # Futures in submission order
+            for chunk in _chunks(items, chunksize):
+                pending.append(executor.submit(_score_chunk, chunk, threshold))
+                if len(pending) >= max_pending:
+                    for result in pending.popleft().result():  # Wait for the oldest chunk
+                        yield result
+            while pending:
+                for result in pending.popleft().result():
+                    yield result
+        else:
+            pending = set()  # Futures in any order
+            for chunk in _chunks(items, chunksize):
+                pending.add(executor.submit(_score_chunk, chunk, threshold))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)  # Wait for any chunk
+                    for future in done:
+                        for result in future.result():
+                            yield result
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        yield result
@@ -0,0 +1,388 @@
+"""
+Module: Benchmarks
+
+This module measures the performance of the application's hot paths on reproducible inputs:
+
+    analysis-short/medium/long  analyze_description on generated descriptions of three lengths
+    merge                       get_book_info deduplicating large provider result lists, then
+                                ranking the first PROVIDER_CANDIDATES unique books of each
+    html                        get_open_books_description reading work pages (HTML fallback)
+    display                     the background part of display_selected_book (description lookup,
+                                analysis, cover download and decoding) against local stub servers
+
+Every benchmark reports throughput, p50/p95/p99 latency and the peak memory allocated by one pass.
+Inputs are generated from a fixed seed and all HTTP traffic goes to stub servers on localhost, so
+runs are comparable between changes. Caches and the book store are disabled while measuring.
+
+Usage:
+    python benchmark.py [--only analysis-long,html] [--quick] [--save baseline.json] [--compare baseline.json]
+    python benchmark.py --only analysis-medium --backend index   (measure the pure-Python fuzzy backend)
+    python benchmark.py --only html --pages saved_pages/   (use saved Open Library pages instead of generated ones)
+"""
+
+import argparse  # For command-line arguments
+import math  # For nearest-rank percentiles
+import contextlib  # For temporarily replacing module settings
+import glob  # For saved pages
+import io  # For generating the cover image
+import json  # For baseline files and stub responses
+import os  # For saved pages
+import platform  # For the baseline metadata
+import random  # For reproducible inputs
+import threading  # For the stub servers
+import time  # For timing
+import tracemalloc  # For peak memory
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # For the stub servers
+from urllib.parse import urlparse, parse_qs  # For routing stub requests
+
+import book_api  # The API layer being measured
+import book_store  # Disabled while measuring
+import content_analysis  # For clearing the analysis cache
+import cover_images  # For clearing the decoded covers
+import response_cache  # Disabled while measuring
+from content_analysis import KEYWORD_MATCHER, analyze_description  # The analysis being measured
+from fuzzy_index import BACKENDS  # For choosing the fuzzy matching backend
+
+SEED = 1234
+FILLER_WORDS = (
+    "the a an of and to in on with for from at by about after before during through under over "
+    "story novel family young woman man child girl boy mother father sister brother friend life "
+    "love secret journey house village city war summer winter letters truth past future world "
+    "discovers finds returns learns begins must keeps hides becomes remembers leaves meets "
+    "small quiet dark bright old new strange beautiful lonely brave hidden lost forgotten"
+).split()
+ANALYSIS_SIZES = {"short": (30, 300), "medium": (150, 200), "long": (2000, 30)}  # words, descriptions
+MEMORY_SAMPLE = 20  # Calls measured again under tracemalloc
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the nearest-rank percentile of an already sorted list (fraction between 0 and 1).
+    """
+
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(round(fraction * len(sorted_values), 9))  # Rounded so 0.07 * 100 is rank 7, not 8
+    index = min(len(sorted_values) - 1, max(0, rank - 1))
+    return sorted_values[index]
+
+
+def measure(func, inputs):
+    """
+    Calls func on every input and summarizes the latencies, then measures the peak memory of a
+    sample of the calls under tracemalloc (in a separate pass, so it does not distort the timings).
+
+    Args:
+        func (callable): The operation to measure, called with one input.
+        inputs (list): The inputs.
+
+    Returns:
+        dict: "count", "seconds", "throughput" (calls per second), "p50", "p95", "p99" and "mean"
+        (milliseconds) and "peak_memory" (bytes).
+    """
+
+    latencies = []
+    started = time.perf_counter()
+    for item in inputs:
+        call_started = time.perf_counter()
+        func(item)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for item in inputs[:MEMORY_SAMPLE]:
+            func(item)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "count": len(inputs),
+        "seconds": round(seconds, 4),
+        "throughput": round(len(inputs) / seconds, 2) if seconds else 0.0,
+        "p50": round(percentile(latencies, 0.50), 3),
+        "p95": round(percentile(latencies, 0.95), 3),
+        "p99": round(percentile(latencies, 0.99), 3),
+        "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "peak_memory": max(peak, 0),
+    }
+
+
+def make_description(rng, words, keywords):
+    """
+    Generates a description of about the given number of words, with a few keywords (some misspelled).
+    """
+
+    text = [rng.choice(FILLER_WORDS) for _ in range(words)]
+    for _ in range(rng.randrange(4)):
+        keyword = rng.choice(keywords)
+        if len(keyword) > 4 and rng.random() < 0.5:
+            position = rng.randrange(len(keyword))
+            keyword = keyword[:position] + keyword[position + 1:]  # Drop a letter
+        text.insert(rng.randrange(len(text) + 1), keyword)
+    sentences = [" ".join(text[i:i + 12]).capitalize() + "." for i in range(0, len(text), 12)]
+    return " ".join(sentences)
+
+
+def make_corpus(words, count, seed=SEED):
+    """
+    Generates a reproducible list of descriptions.
+    """
+
+    rng = random.Random(f"{seed}-{words}")
+    keywords = sorted(KEYWORD_MATCHER.keyword_masks)
+    return [make_description(rng, words, keywords) for _ in range(count)]
+
+
+def make_work_page(rng, description, filler_blocks):
+    """
+    Generates an Open Library work page: navigation, the description block, then filler_blocks
+    blocks of the rest of the page (editions, reviews, footer).
+    """
+
+    paragraphs = "".join(f"<p>{sentence}.</p>" for sentence in description.split(". ") if sentence)
+    rest = "".join(
+        f'<div class="edition"><a href="/books/OL{rng.randrange(10 ** 6)}M">{rng.choice(FILLER_WORDS)}</a>'
+        f"<span>{' '.join(rng.choice(FILLER_WORDS) for _ in range(20))}</span></div>"
+        for _ in range(filler_blocks))
+    return (f'<html><head><title>Work</title></head><body><nav><a href="/">Home</a></nav>'
+            f'<div class="book-description"><div class="work-description-content">{paragraphs}</div></div>'
+            f"{rest}</body></html>").encode("utf-8")
+
+
+class StubServer:
+    """
+    A local HTTP server answering with a route function, used in place of the real APIs.
+
+    Args:
+        route (callable): Called with (path, query dict); returns (status, content type, body bytes).
+    """
+
+    def __init__(self, route):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+            disable_nagle_algorithm = True  # Headers and body are separate writes; don't delay the body
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                status, content_type, body = route(parsed.path, parse_qs(parsed.query))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Keep the benchmark output readable
+
+        class Server(ThreadingHTTPServer):
+            def handle_error(self, request, client_address):
+                pass  # Clients close streamed pages early on purpose (see _open_books_description_from_html)
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@contextlib.contextmanager
+def patched(module, **attributes):
+    """
+    Temporarily replaces module attributes (API URLs, providers), restoring them afterwards.
+    """
+
+    saved = {name: getattr(module, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+def bench_analysis(size, quick=False, backend=None):
+    """
+    Benchmarks analyze_description (without its result cache) on descriptions of one size.
+    """
+
+    words, count = ANALYSIS_SIZES[size]
+    corpus = make_corpus(words, max(count // 5, 5) if quick else count)
+    return measure(lambda description: analyze_description(description, use_cache=False, backend=backend), corpus)
+
+
+def bench_merge(quick=False):
+    """
+    Benchmarks get_book_info on large provider result lists (providers answer instantly, so only
+    the fan-out and merge are measured). Deduplication scans every result, but only the first
+    PROVIDER_CANDIDATES unique books of each provider are clustered and ranked, as in a real search.
+    """
+
+    rng = random.Random(f"{SEED}-merge")
+    titles = [" ".join(rng.choice(FILLER_WORDS) for _ in range(3)).title() for _ in range(200)]
+    authors = [f"Author {number}" for number in range(50)]
+
+    def results(provider):
+        books = []
+        for _ in range(2000):  # Many near-duplicate results, as broad queries return
+            books.append({"title": rng.choice(titles), "author": rng.choice(authors),
+                          "ISBN" if provider == "google" else "key": str(rng.randrange(10 ** 9)),
+                          "link": "", "source": provider})
+        return books
+
+    google_results, open_results = results("google"), results("open")
+    providers = (("Google Books", lambda title, author, timeout: google_results),
+                 ("Open Library", lambda title, author, timeout: open_results))
+    with patched(book_api, SEARCH_PROVIDERS=providers):
+        return measure(lambda query: book_api.get_book_info(query), [f"query {n}" for n in range(50 if quick else 250)])
+
+
+def bench_html(quick=False, pages_dir=None):
+    """
+    Benchmarks get_open_books_description on work pages without a JSON description, so every call
+    takes the HTML path. Pages come from pages_dir (*.html files) or are generated (50 KB to 2 MB).
+    """
+
+    if pages_dir:
+        pages = [open(path, "rb").read() for path in sorted(glob.glob(os.path.join(pages_dir, "*.html")))]
+        if not pages:
+            raise ValueError(f"No .html pages in {pages_dir}")
+    else:
+        rng = random.Random(f"{SEED}-html")
+        descriptions = make_corpus(150, 4)
+        pages = [make_work_page(rng, description, blocks)
+                 for description, blocks in zip(descriptions, (200, 1000, 5000, 20000))]
+
+    def route(path, query):
+        if path.endswith(".json"):
+            return 200, "application/json", b'{"title": "No description here"}'
+        return 200, "text/html; charset=utf-8", pages[int(path.split("OL")[1].rstrip("W")) % len(pages)]
+
+    server = StubServer(route)
+    try:
+        with patched(book_api, OPEN_LIBRARY_BASE_URL=server.url):
+            keys = [f"/works/OL{number}W" for number in range(40 if quick else 200)]
+            return measure(book_api.get_open_books_description, keys)
+    finally:
+        server.close()
+
+
+def bench_display(quick=False):
+    """
+    Benchmarks what display_selected_book runs off the Tk thread for a Google Books result: the
+    description lookup, the analysis and the cover download and decoding (main.load_book_details
+    and main.load_cover_image), against stub servers.
+    """
+
+    from PIL import Image  # The cover decoding is part of the path
+    import main  # The GUI module; importing it does not open a window
+
+    count = 20 if quick else 100
+    descriptions = make_corpus(150, count)
+    cover = io.BytesIO()
+    Image.new("RGB", (600, 900), (120, 60, 30)).save(cover, "JPEG", quality=85)
+    cover = cover.getvalue()
+
+    def route(path, query):
+        if path.startswith("/covers/"):
+            return 200, "image/jpeg", cover
+        number = int(query["q"][0].split(":")[1])
+        volume = {"volumeInfo": {"description": descriptions[number % count],
+                                 "imageLinks": {"thumbnail": f"{server.url}/covers/{number}.jpg"}}}
+        return 200, "application/json", json.dumps({"items": [volume]}).encode("utf-8")
+
+    server = StubServer(route)
+
+    def display(number):
+        details = main.load_book_details({"title": "t", "author": "a", "ISBN": str(number)})
+        main.load_cover_image(details["img_url"])
+
+    try:
+        with patched(book_api, GOOGLE_BOOKS_API_BASE_URL=f"{server.url}/volumes"):
+            return measure(display, list(range(count)))
+    finally:
+        server.close()
+
+
+BENCHMARKS = {
+    "analysis-short": lambda options: bench_analysis("short", options.quick, options.backend),
+    "analysis-medium": lambda options: bench_analysis("medium", options.quick, options.backend),
+    "analysis-long": lambda options: bench_analysis("long", options.quick, options.backend),
+    "merge": lambda options: bench_merge(options.quick),
+    "html": lambda options: bench_html(options.quick, options.pages),
+    "display": lambda options: bench_display(options.quick),
+}
+
+
+def run_benchmarks(names, options):
+    """
+    Runs the named benchmarks with caching disabled.
+
+    Returns:
+        dict: Benchmark name -> the statistics returned by measure.
+    """
+
+    response_cache.configure_cache(enabled=False)
+    book_store.configure_book_store(enabled=False)
+    results = {}
+    for name in names:
+        content_analysis.ANALYSIS_CACHE.clear()  # Repeated runs measure the same work
+        cover_images.clear_memory_cache()
+        results[name] = BENCHMARKS[name](options)
+    return results
+
+
+def main():
+    """
+    Command-line entry point: runs the benchmarks, prints a table, and saves or compares baselines.
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the analysis, search merge and display paths.")
+    parser.add_argument("--only", help=f"Comma-separated benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--quick", action="store_true", help="Run fewer iterations")
+    parser.add_argument("--backend", choices=BACKENDS, help="Fuzzy matching backend for the analysis benchmarks")
+    parser.add_argument("--pages", help="Directory of saved Open Library work pages for the html benchmark")
+    parser.add_argument("--save", help="Write the results to this JSON file (a baseline)")
+    parser.add_argument("--compare", help="Compare the results with a baseline JSON file")
+    options = parser.parse_args()
+
+    names = options.only.split(",") if options.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results = run_benchmarks(names, options)
+    baseline = {}
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    print(f"{'benchmark':<16}{'calls/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>10}")
+    for name, stats in results.items():
+        line = (f"{name:<16}{stats['throughput']:>10.1f}{stats['p50']:>10.2f}{stats['p95']:>10.2f}"
+                f"{stats['p99']:>10.2f}{stats['peak_memory'] / 1024:>10.0f}")
+        if name in baseline and baseline[name]["p50"]:
+            line += (f"   p50 x{stats['p50'] / baseline[name]['p50']:.2f}, "
+                     f"throughput x{stats['throughput'] / baseline[name]['throughput']:.2f} vs baseline")
+        print(line)
+
+    if options.save:
+        report = {
+            "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": SEED, "quick": options.quick},
+            "results": results,
+        }
+        with open(options.save, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
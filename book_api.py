@@ -0,0 +1,727 @@
+"""
+Module: Book API Clients
+
+This module is the headless library layer of the application. It searches the Google Books and
+Open Library APIs, fetches book descriptions and cover images, and merges the search results.
+It never shows dialogs: failures are raised as BookAPIError so any front end (the Tk window, a
+script, a worker or a service) can decide how to report them.
+
+All requests go through the shared, pooled session of http_client, so they get timeouts and
+retries and reuse keep-alive connections. Google Books searches keep each volume's description and
+cover URL, so showing a Google result needs no second request. Open Library descriptions come from the JSON work
+record when possible; otherwise a small streaming parser reads just the description block of the
+work's HTML page. When instrumentation is enabled, every search and fetch is timed as a span.
+
+Searches are answered from the local book store (book_store.py) when it is confident enough, and
+every search result, description and computed warning list is recorded there.
+
+Attributes:
+    OPEN_BOOKS_API_URL (str): URL for the Open Library Books API.
+    GOOGLE_BOOKS_API_BASE_URL (str): URL for the Google Books API.
+    GOOGLE_SEARCH_FIELDS (str): Partial-response field mask of Google Books searches.
+    GOOGLE_ISBN_FIELDS (str): Partial-response field mask of Google Books ISBN lookups.
+    OPEN_LIBRARY_BASE_URL (str): Base URL for Open Library work records and pages.
+    API_ERROR_MESSAGE (str): Default error message for API connection issues.
+    PROVIDER_TIMEOUTS (dict): Seconds to wait for each provider's search results, by provider name.
+    LOCAL_CONFIDENCE (float): Minimum confidence of a book store answer used without asking the providers.
+    SEARCH_PROVIDERS (tuple): (provider name, search function) pairs queried by get_book_info.
+"""
+
+import codecs  # For decoding streamed HTML
+import logging  # For reporting unexpected API responses
+import threading  # For tracking background refreshes
+import time  # For provider deadlines
+import urllib.parse  # For URL encoding
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED  # For concurrent provider searches
+from html.parser import HTMLParser  # For the streaming Open Library page parser
+
+import requests  # For the request exception types
+
+import instrumentation  # For timing each stage of a lookup
+from http_client import http_get  # Shared pooled session with timeouts and retries
+from response_cache import get_response_cache, normalize_query  # Persistent cache of API responses
+from book_store import get_book_store  # Local store of every book seen, with a full-text index
+from book_ranking import rank_books  # Cross-provider deduplication and ranking
+
+# URLs for APIs
+OPEN_BOOKS_API_URL = "https://openlibrary.org/search.json"  # URL for Open Library search API
+GOOGLE_BOOKS_API_BASE_URL = "https://www.googleapis.com/books/v1/volumes"  # URL for Google Books API
+# Partial-response masks: Google Books only sends the fields the application reads
+GOOGLE_SEARCH_FIELDS = "items(volumeInfo(title,authors,publishedDate,infoLink,industryIdentifiers,description,imageLinks/thumbnail))"
+GOOGLE_ISBN_FIELDS = "items(volumeInfo(description,imageLinks/thumbnail))"
+OPEN_LIBRARY_BASE_URL = "https://openlibrary.org"  # Base URL for Open Library work records and pages
+
+API_ERROR_MESSAGE = "We're having trouble connecting to the system"  # Default API error message
+
+DEFAULT_PROVIDER_TIMEOUT = 10  # Seconds to wait for a provider's search results
+PROVIDER_TIMEOUTS = {"Google Books": DEFAULT_PROVIDER_TIMEOUT, "Open Library": DEFAULT_PROVIDER_TIMEOUT}
+PROVIDER_CANDIDATES = 10  # Unique results of each provider considered for ranking
+LOCAL_CONFIDENCE = 0.9  # Book store answers at least this confident are used without asking the providers
+
+logger = logging.getLogger(__name__)
+
+# Shared worker threads for the provider searches (a search is I/O bound, so threads are enough)
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="book-search")
+
+# Background refreshes of searches answered from the book store (kept apart from the searches they run)
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="book-refresh")
+_refreshing = set()  # Normalized searches being refreshed
+_refresh_lock = threading.Lock()
+
+
+class BookAPIError(Exception):
+    """
+    Raised when a request to one of the book APIs fails.
+
+    Attributes:
+        provider (str): The provider that failed ("Google Books", "Open Library", ...).
+    """
+
+    def __init__(self, message, provider=""):
+        super().__init__(message)
+        self.provider = provider
+
+
+def _cache_get(kind, key):
+    """
+    Returns a cached JSON response, or None if it is not cached (or caching is disabled).
+    """
+
+    cache = get_response_cache()
+    return cache.get_json(kind, key) if cache is not None else None
+
+
+def _cache_set(kind, key, value):
+    """
+    Stores a JSON response in the cache, if caching is enabled.
+    """
+
+    cache = get_response_cache()
+    if cache is not None:
+        cache.set_json(kind, key, value)
+
+
+@instrumentation.traced("google.isbn")
+def get_google_books_description_and_img_URL(ISBN):
+    """
+    Retrieves the description and thumbnail image URL of a book from the Google Books API using its ISBN.
+
+    This function makes a request to the Google Books API and extracts the book description and
+    thumbnail image URL if available. If the data is not found, it returns empty strings.
+
+    Args:
+        ISBN (str): The International Standard Book Number (ISBN) of the book.
+
+    Returns:
+        tuple: A tuple containing the book description and image URL. Returns empty strings if data is not found.
+
+    Raises:
+        BookAPIError: If the API request fails.
+    """
+
+    cached = _cache_get("google_isbn", ISBN)
+    if cached is not None:
+        return tuple(cached)  # Served from the response cache
+
+    google_api_url = f"{GOOGLE_BOOKS_API_BASE_URL}?q=isbn:{ISBN}&fields={GOOGLE_ISBN_FIELDS}"  # Construct the API URL
+
+    try:
+        response = http_get(google_api_url)  # Send a request to the Google Books API
+        response.raise_for_status()  # Raises HTTPError for bad HTTP response
+        data = response.json()  # Parse the JSON response
+    except ValueError as e:  # Includes requests.JSONDecodeError
+        raise BookAPIError(f"Invalid JSON response: {e}", "Google Books") from e
+    except requests.RequestException as e:
+        raise BookAPIError(f"API Request failed: {e}", "Google Books") from e
+
+    if "items" not in data:
+        logger.warning("Unexpected data structure received from Google Books API.")  # Log unexpected data structure
+        result = "", ""
+    else:
+        try:
+            volume = data["items"][0]["volumeInfo"]
+            description = volume.get("description", "")  # Extract the book description
+            image_url = volume.get("imageLinks", {}).get("thumbnail", "")  # Extract the image URL (a cover is optional)
+            result = description, image_url
+        except (KeyError, IndexError, TypeError, AttributeError):
+            result = "", ""  # Return empty strings if extraction fails
+
+    _cache_set("google_isbn", ISBN, list(result))
+    _store_description(isbn=ISBN, description=result[0])
+    return result
+
+
+def get_book_description_and_img_URL(book):
+    """
+    Returns the description and cover image URL of a search result.
+
+    Google Books results carry both from the search response. Only results without a description
+    (such as search results cached before they were kept, or a blank description) cost a request
+    for their ISBN, then for their Open Library key if that finds none. Open Library results have
+    their description fetched and no image URL.
+
+    Args:
+        book (dict): A book dictionary as returned by get_book_info or the search functions.
+
+    Returns:
+        tuple: The description and image URL (empty strings if not found).
+
+    Raises:
+        BookAPIError: If a request is needed and fails.
+    """
+
+    if book.get("description"):
+        if book.get("ISBN"):
+            _store_description(isbn=book["ISBN"], description=book["description"])
+        return book["description"], book.get("img_url", "")
+
+    description, img_url = "", book.get("img_url", "")
+    if book.get("ISBN"):
+        description, fetched_url = get_google_books_description_and_img_URL(book["ISBN"])
+        img_url = fetched_url or img_url
+    if not description and book.get("key"):
+        description = get_open_books_description(book["key"])  # Merged records can have both
+    return description, img_url
+
+
+def _store_description(isbn="", key="", description=""):
+    """
+    Records a fetched description in the book store, if it is enabled and the description is not empty.
+    """
+
+    store = get_book_store()
+    if store is not None and description:
+        store.set_details(isbn=isbn, key=key, description=description)
+
+
+class _DescriptionParser(HTMLParser):
+    """
+    Streaming HTML parser that collects the paragraphs of an Open Library work description.
+
+    It only keeps the text of <p> elements inside the work-description-content div, and sets done
+    as soon as that div closes, so the rest of the page does not need to be read or parsed.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self.done = False
+        self._depth = 0  # Depth of nested divs inside the description div (0 = outside)
+        self._paragraph = None  # Text parts of the paragraph being read
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "div":
+            if self._depth:
+                self._depth += 1
+            elif "work-description-content" in (dict(attrs).get("class") or "").split():
+                self._depth = 1  # Entering the description block
+        elif tag == "p" and self._depth:
+            self._paragraph = []
+
+    def handle_endtag(self, tag):
+        if self.done or not self._depth:
+            return
+        if tag == "p" and self._paragraph is not None:
+            self.paragraphs.append(''.join(self._paragraph).strip())
+            self._paragraph = None
+        elif tag == "div":
+            self._depth -= 1
+            if not self._depth:
+                self.done = True  # The description block is closed, stop here
+
+    def handle_data(self, data):
+        if self._paragraph is not None:
+            self._paragraph.append(data)
+
+
+@instrumentation.traced("open_library.json")
+def _open_books_description_from_json(key):
+    """
+    Reads a work description from the Open Library JSON endpoint ({key}.json).
+
+    Returns the description (possibly empty), or None if the record is not a JSON object or has no
+    description field.
+    """
+
+    response = http_get(f"{OPEN_LIBRARY_BASE_URL}{key}.json")  # Send a request for the work record
+    response.raise_for_status()  # Raises HTTPError for bad HTTP response
+
+    data = response.json()
+    if not isinstance(data, dict):
+        return None  # Not a work record (a list, string or null), so it has no description
+    description = data.get("description")
+    if isinstance(description, dict):
+        description = description.get("value")  # Text values are stored as {"type": ..., "value": ...}
+    if not isinstance(description, str):
+        return None
+    return ' '.join(description.split())  # Collapse the line breaks of the stored text
+
+
+@instrumentation.traced("open_library.html")
+def _open_books_description_from_html(key):
+    """
+    Reads a work description from the Open Library HTML page, stopping once the description is read.
+
+    Returns the description, or an empty string if the page has no description block.
+    """
+
+    parser = _DescriptionParser()
+    response = http_get(f"{OPEN_LIBRARY_BASE_URL}{key}", stream=True)  # Send a request for the page
+    try:
+        response.raise_for_status()  # Raises HTTPError for bad HTTP response
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+        for chunk in response.iter_content(chunk_size=16384):
+            parser.feed(decoder.decode(chunk))
+            if parser.done:
+                break  # No need to download or parse the rest of the page
+    finally:
+        response.close()
+    return ' '.join(parser.paragraphs)  # Join all paragraph texts into a single string
+
+
+@instrumentation.traced("open_library.description")
+def get_open_books_description_with_source(key):
+    """
+    Retrieves the book description from Open Library and reports how it was obtained.
+
+    The JSON work record ({key}.json) is tried first. If it has no description, the work's HTML page
+    is read with a streaming parser that stops as soon as the description block closes. A work
+    without a description is only remembered for the short "open_description_missing" TTL.
+
+    Args:
+        key (str): The unique key for the book on the Open Library website.
+
+    Returns:
+        tuple: (description, source), where source is "cache", "json", "html" or "none" (no
+        description found or the request failed; the description is then an empty string).
+    """
+
+    cached = _cache_get("open_description", key)
+    if cached:
+        return cached, "cache"  # Served from the response cache
+    if _cache_get("open_description_missing", key):
+        return "", "none"  # Looked up recently without finding one
+
+    try:
+        description = _open_books_description_from_json(key)
+        source = "json"
+    except (requests.RequestException, ValueError) as e:
+        logger.info("Open Library JSON record unavailable for %s: %s", key, e)
+        description = None
+
+    try:
+        if description is None:
+            description = _open_books_description_from_html(key)
+            source = "html"
+    except Exception as e:
+        logger.warning("Failed to get Open Library description for %s: %s", key, e)
+        return "", "none"  # Return an empty string in case of any exception during the process
+
+    if description:
+        _cache_set("open_description", key, description)
+    else:
+        _cache_set("open_description_missing", key, True)  # Short TTL: a description may be added
+    _store_description(key=key, description=description)
+    logger.debug("Open Library description for %s read from %s", key, source)
+    return description, (source if description else "none")
+
+
+def get_open_books_description(key):
+    """
+    Retrieves the book description from the Open Library website using a given key.
+
+    This function asks Open Library for the work's JSON record and falls back to reading the
+    description block of the work's HTML page (see get_open_books_description_with_source).
+
+    Args:
+        key (str): The unique key for the book on the Open Library website.
+
+    Returns:
+        str: The book description as a single string. Returns an empty string if the description
+        is not found or if there's an error during the request or parsing process.
+    """
+
+    return get_open_books_description_with_source(key)[0]
+
+
+@instrumentation.traced("cover.download")
+def get_book_image_data(url, use_cache=True):
+    """
+    Downloads a book cover image.
+
+    Args:
+        url (str): The URL of the image.
+        use_cache (bool, optional): Read and store the image in the response cache. Defaults to
+            True (cover_images caches resized thumbnails instead).
+
+    Returns:
+        bytes: The raw image data.
+
+    Raises:
+        BookAPIError: If the download fails.
+    """
+
+    cache = get_response_cache() if use_cache else None
+    cached = cache.get("cover_image", url) if cache is not None else None
+    if cached is not None:
+        return cached  # Served from the response cache
+
+    try:
+        response = http_get(url)  # Send request to download the image
+        response.raise_for_status()  # Check for HTTP errors
+    except requests.RequestException as e:
+        raise BookAPIError(f"Image download failed: {e}", "Cover image") from e
+
+    if cache is not None:
+        cache.set("cover_image", url, response.content)
+    return response.content
+
+
+@instrumentation.traced("open_library.search")
+def search_open_books(title, author="", timeout=None):
+    """
+    Searches for books in the Open Books API using the provided title and author.
+
+    This function constructs a query with the specified title and author (if provided),
+    then sends an HTTP request to the Open Books API. The results are parsed and formatted
+    into a list of dictionaries, each containing details about a book.
+
+    Args:
+        title (str): The title of the book to search for.
+        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
+        timeout (float, optional): Seconds to wait for the API to answer. Defaults to http_client.DEFAULT_TIMEOUT.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary contains information about a book
+        (title, author, release date, and key). Returns an empty list if no data is found.
+
+    Raises:
+        BookAPIError: If the API request fails.
+    """
+
+    cached = _cache_get("open_search", normalize_query(title, author))
+    if cached is not None:
+        return cached  # Served from the response cache
+
+    query = {"title": title, "fields": "key, title, author_name, first_publish_year"}  # Define query parameters
+    if author:
+        query["author"] = author  # Add author to the query if provided
+    query["limit"] = 10  # Set the result limit to 10
+
+    try:
+        response = http_get(OPEN_BOOKS_API_URL, params=query, timeout=timeout)  # Send the request to Open Books API
+        response.raise_for_status()  # Check for HTTP errors
+        data = response.json()  # Parse the JSON response
+    except ValueError as e:  # Includes requests.JSONDecodeError
+        raise BookAPIError(f"Invalid JSON response: {e}", "Open Library") from e
+    except requests.RequestException as e:
+        raise BookAPIError(f"API Request failed: {e}", "Open Library") from e
+
+    if "docs" not in data:
+        logger.warning("Unexpected data structure received from Open Books API.")  # Log unexpected data structure
+        return []
+
+    # Process, cache and return the search results
+    books = [
+        {
+            "title": doc.get("title", ""),
+            "author": ', '.join(doc.get("author_name", [])),
+            "release_date": doc.get("first_publish_year", ""),
+            "key": doc.get("key", ""),
+        }
+        for doc in data["docs"]
+    ]
+    _cache_set("open_search", normalize_query(title, author), books)
+    return books
+
+
+def _volume_isbn(identifiers):
+    """
+    Picks the ISBN of a Google Books volume: its ISBN-13, else its ISBN-10, else its first identifier.
+    """
+
+    by_type = {identifier.get("type"): identifier.get("identifier", "") for identifier in identifiers}
+    return by_type.get("ISBN_13") or by_type.get("ISBN_10") or (identifiers[0].get("identifier", "") if identifiers else "")
+
+
+@instrumentation.traced("google.search")
+def search_google_books(title, author="", timeout=None):
+    """
+    Searches for books in the Google Books API using the provided title and optionally the author.
+
+    This function constructs a URL for querying the Google Books API with the specified title and author,
+    sends an HTTP request, and parses the response. The results are formatted into a list of dictionaries,
+    each containing details about a book.
+
+    Args:
+        title (str): The title of the book to search for.
+        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
+        timeout (float, optional): Seconds to wait for the API to answer. Defaults to http_client.DEFAULT_TIMEOUT.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary contains information about a book
+        (title, author, release date, link, ISBN, description, and image URL). Returns an empty
+        list if no data is found.
+
+    Raises:
+        BookAPIError: If the API request fails.
+    """
+
+    cached = _cache_get("google_search", normalize_query(title, author))
+    if cached is not None:
+        return cached  # Served from the response cache
+
+    book_title_encoded = urllib.parse.quote(title)  # URL-encode the book title
+    author_name_encoded = urllib.parse.quote(author)  # URL-encode the author name
+    google_api_url = f"{GOOGLE_BOOKS_API_BASE_URL}?q=intitle:{book_title_encoded}"  # Construct the API URL
+
+    if author:
+        google_api_url += f"+inauthor:{author_name_encoded}"  # Add author to the query if provided
+
+    google_api_url += "&printType=books&maxResults=10"  # Append parameters for print type and max results
+    google_api_url += f"&fields={GOOGLE_SEARCH_FIELDS}"  # Only the fields read below
+
+    try:
+        response = http_get(google_api_url, timeout=timeout)  # Send the request to Google Books API
+        response.raise_for_status()  # Check for HTTP errors
+        data = response.json()  # Parse the JSON response
+    except ValueError as e:  # Includes requests.JSONDecodeError
+        raise BookAPIError(f"Invalid JSON response: {e}", "Google Books") from e
+    except requests.RequestException as e:
+        raise BookAPIError(f"API Request failed: {e}", "Google Books") from e
+
+    if "items" not in data:
+        logger.warning("Unexpected data structure received from Google Books API.")  # Log unexpected data structure
+        return []
+
+    # Process, cache and return the search results
+    books = [
+        {
+            "title": item.get("volumeInfo", {}).get("title", ""),
+            "author": ', '.join(item.get("volumeInfo", {}).get("authors", [])),
+            "release_date": item.get("volumeInfo", {}).get("publishedDate", ""),
+            "link": item.get("volumeInfo", {}).get("infoLink", ""),
+            "ISBN": _volume_isbn(item.get("volumeInfo", {}).get("industryIdentifiers", [])),
+            "description": item.get("volumeInfo", {}).get("description", ""),
+            "img_url": item.get("volumeInfo", {}).get("imageLinks", {}).get("thumbnail", ""),
+        }
+        for item in data["items"]
+    ]
+    _cache_set("google_search", normalize_query(title, author), books)
+    return books
+
+
+# Providers queried by get_book_info, in the order their results are listed
+SEARCH_PROVIDERS = (
+    ("Google Books", search_google_books),
+    ("Open Library", search_open_books),
+)
+
+
+def remove_duplicate_books(books, limit=3):
+    """
+    Removes duplicate books based on title and author, keeping the first occurrence of each.
+    Limits the result to the top unique books.
+
+    Args:
+        books (list): A list of book dictionaries.
+        limit (int, optional): The maximum number of unique books to keep. Defaults to 3.
+
+    Returns:
+        list: A list of unique book dictionaries.
+    """
+
+    seen = set()  # Set to keep track of seen (title, author) tuples
+    unique_books = []  # List to store unique books
+    for book in books:
+        identifier = (book['title'], book['author'])  # Create a unique identifier for each book
+        if identifier not in seen and len(unique_books) < limit:
+            seen.add(identifier)  # Add identifier to seen set
+            unique_books.append(book)  # Add book to unique list
+
+    return unique_books
+
+
+def iter_book_info(title, author="", errors=None, timeouts=None, limit=3):
+    """
+    Searches every provider concurrently and yields each provider's results as soon as they arrive.
+
+    A slow provider does not hold back a fast one, and a provider that has not answered within its
+    timeout is given up on (its failure is appended to errors, when given).
+
+    Args:
+        title (str): The title of the book to search for.
+        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
+        errors (list, optional): A list that receives a BookAPIError for each provider that failed or timed out.
+        timeouts (dict, optional): Seconds to wait for each provider, by provider name.
+            Defaults to PROVIDER_TIMEOUTS.
+        limit (int, optional): Number of unique books kept per provider. Defaults to 3.
+
+    Yields:
+        tuple: (provider name, list of the top unique books from that provider).
+    """
+
+    timeouts = PROVIDER_TIMEOUTS if timeouts is None else timeouts
+    started = time.monotonic()
+
+    futures = {}
+    deadlines = {}
+    for provider, search in SEARCH_PROVIDERS:
+        timeout = timeouts.get(provider, DEFAULT_PROVIDER_TIMEOUT)
+        future = _search_executor.submit(instrumentation.bind(search), title, author, timeout)  # Start every search at once
+        futures[future] = provider
+        deadlines[future] = started + timeout
+
+    pending = set(futures)
+    while pending:
+        # Wait until a provider answers or the earliest remaining deadline passes
+        remaining = max(0.0, min(deadlines[future] for future in pending) - time.monotonic())
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            provider = futures[future]
+            try:
+                books = future.result()
+            except BookAPIError as e:
+                if errors is not None:
+                    errors.append(e)
+                continue
+            yield provider, remove_duplicate_books(books, limit)  # Apply duplicate removal to the provider results
+
+        now = time.monotonic()
+        for future in [future for future in pending if deadlines[future] <= now]:
+            pending.discard(future)
+            future.cancel()  # Stop waiting for it; the request itself ends at its own timeout
+            if errors is not None:
+                provider = futures[future]
+                errors.append(BookAPIError(f"{provider} did not answer within {timeouts.get(provider, DEFAULT_PROVIDER_TIMEOUT)} seconds", provider))
+
+
+def _search_providers(title, author, errors, timeouts):
+    """
+    Searches every provider, then clusters and ranks their results (see get_book_info).
+    """
+
+    failures = []
+    results = dict(iter_book_info(title, author, failures, timeouts, limit=PROVIDER_CANDIDATES))
+
+    if errors is not None:
+        errors.extend(failures)
+    if not results and len(failures) == len(SEARCH_PROVIDERS):
+        raise BookAPIError("; ".join(str(e) for e in failures), "all providers")
+
+    # Merge in provider order (Google Books first, so it wins ties) whatever order the answers arrived in
+    books = [book for provider, _ in SEARCH_PROVIDERS for book in results.get(provider, [])]
+    with instrumentation.span("rank_books", records=len(books)):
+        return rank_books(books, title, author)
+
+
+def _refresh_search(title, author, timeouts):
+    """
+    Background task: searches the providers again and updates the book store with their answer.
+    """
+
+    query = normalize_query(title, author)
+    try:
+        books = _search_providers(title, author, None, timeouts)
+        store = get_book_store()
+        if store is not None:
+            store.remember_search(title, author, books)
+    except BookAPIError as e:
+        logger.info("Background refresh of %r failed: %s", query, e)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(query)
+
+
+def _schedule_refresh(title, author, timeouts):
+    """
+    Starts a background refresh of a search answered from the book store, unless one is already running.
+    """
+
+    query = normalize_query(title, author)
+    with _refresh_lock:
+        if query in _refreshing:
+            return
+        _refreshing.add(query)
+    _refresh_executor.submit(_refresh_search, title, author, timeouts)
+
+
+@instrumentation.traced("get_book_info")
+def get_book_info(title, author="", errors=None, timeouts=None, use_store=True):
+    """
+    Fetches book data (excluding descriptions) from Google Books and Open Books APIs,
+    returning the best matching candidates of both sources.
+
+    The function searches both APIs concurrently for books matching the title and author. Records of
+    the same book from either provider (same ISBN or Open Library key, or near-identical title and
+    author) are merged into one candidate, and the candidates are ranked by how well they match the
+    search (see book_ranking.rank_books). The search takes as long as the slower provider (bounded
+    by its timeout), not the sum of both.
+    If one provider fails or times out, the results of the other are still returned and the failure
+    is appended to errors (when given).
+
+    The local book store is consulted first: a search it can answer with confidence of at least
+    LOCAL_CONFIDENCE is answered from it, and refreshed from the APIs in the background. If every
+    provider fails, the best local matches are returned instead (the failures are still appended
+    to errors). Every answer of the providers is added to the store.
+
+    Args:
+        title (str): The title of the book to search for.
+        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
+        errors (list, optional): A list that receives a BookAPIError for each provider that failed.
+        timeouts (dict, optional): Seconds to wait for each provider, by provider name.
+            Defaults to PROVIDER_TIMEOUTS.
+        use_store (bool, optional): Consult and update the local book store. Defaults to True.
+
+    Returns:
+        list: A list of dictionaries, each containing information about a book from either
+        Google Books or Open Books APIs, best match first. Limited to book_ranking.MAX_RESULTS books.
+
+    Raises:
+        BookAPIError: If every provider failed and the store has no match.
+    """
+
+    store = get_book_store() if use_store else None
+    local = []
+    if store is not None:
+        with instrumentation.span("book_store.search") as current:
+            local, confidence = store.search(title, author)
+            current.set("confidence", confidence)
+        if local and confidence >= LOCAL_CONFIDENCE:
+            _schedule_refresh(title, author, timeouts)
+            return local
+
+    failures = []
+    try:
+        books = _search_providers(title, author, failures, timeouts)
+    except BookAPIError:
+        if errors is not None:
+            errors.extend(failures)
+        if local:
+            return local  # Offline: the best local matches are better than nothing
+        raise
+    if errors is not None:
+        errors.extend(failures)
+
+    if store is not None:
+        store.remember_search(title, author, books)
+    return books
+
+
+def store_book_warnings(book, warnings, fingerprint=None):
+    """
+    Records the warnings computed for a book in the local book store.
+
+    Args:
+        book (dict): The book record (with an "ISBN" or "key").
+        warnings (list): The warnings computed from its description.
+        fingerprint (str, optional): Fingerprint of the keyword lists used (KEYWORD_FINGERPRINT).
+    """
+
+    store = get_book_store()
+    if store is not None:
+        store.set_details(isbn=book.get("ISBN", "") or book.get("isbn", ""), key=book.get("key", ""),
+                          warnings=warnings, fingerprint=fingerprint)
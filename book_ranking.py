@@ -0,0 +1,233 @@
+"""
+Module: Book Ranking
+
+This module merges the search results of every provider into one ranked list of candidates.
+Records of the same book (the same ISBN or Open Library key, or near-identical titles by the same
+author, such as "The Hobbit" and "The hobbit, or There and Back Again") are clustered into one
+candidate, and the candidates are ranked by how well they match the search.
+
+Titles and authors are normalized first: case, accents, punctuation and leading articles are
+ignored, and subtitles are compared separately. Titles are compared all against all in a single
+similarity matrix, computed with rapidfuzz (process.cdist when numpy is installed) when it is
+available, and with the bit-parallel LCS of fuzzy_index otherwise. Both give the same indel
+similarity score.
+
+Attributes:
+    CLUSTER_THRESHOLD (int): Title similarity (0-100) from which two records are the same book.
+    MAX_RESULTS (int): Number of candidates returned by rank_books.
+"""
+
+import re  # For splitting titles and authors
+import unicodedata  # For removing accents
+
+from fuzzy_index import lcs_length, similarity  # Fallback similarity when rapidfuzz is not installed
+
+try:
+    from rapidfuzz import fuzz as _rapidfuzz_fuzz, process as _rapidfuzz_process  # Optional, much faster
+except ImportError:
+    _rapidfuzz_fuzz = _rapidfuzz_process = None
+
+try:
+    import numpy  # noqa: F401  (rapidfuzz's cdist returns numpy arrays)
+    _HAS_CDIST = _rapidfuzz_process is not None
+except ImportError:
+    _HAS_CDIST = False
+
+CLUSTER_THRESHOLD = 90
+MAX_RESULTS = 6
+ARTICLES = ("the", "a", "an")
+SUBTITLE_SEPARATOR = re.compile(r":|;|\(|\[| - |, or ", re.IGNORECASE)  # Where a subtitle starts
+
+
+def normalize_text(text):
+    """
+    Lowercases text and removes accents and punctuation, collapsing whitespace.
+    """
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", stripped.lower().replace("&", " and ")))
+
+
+def normalize_title(title):
+    """
+    Normalizes a title for comparison.
+
+    Args:
+        title (str): The title as returned by a provider.
+
+    Returns:
+        tuple: (full title, main title without subtitle), both normalized and without a leading article.
+    """
+
+    def strip_article(text):
+        first, _, rest = text.partition(" ")
+        return rest if first in ARTICLES and rest else text
+
+    full = strip_article(normalize_text(title))
+    main = strip_article(normalize_text(SUBTITLE_SEPARATOR.split(title, 1)[0])) or full
+    return full, main
+
+
+def author_surnames(author):
+    """
+    Returns the normalized surnames (last words) of a comma-separated author list.
+    """
+
+    surnames = set()
+    for name in author.split(","):
+        words = normalize_text(name).split()
+        if words:
+            surnames.add(words[-1])
+    return surnames
+
+
+def similarity_matrix(rows, columns):
+    """
+    Scores every row string against every column string (0-100 indel similarity).
+
+    Args:
+        rows (list): Strings.
+        columns (list): Strings.
+
+    Returns:
+        list: One list of scores per row.
+    """
+
+    if _HAS_CDIST:
+        return _rapidfuzz_process.cdist(rows, columns, scorer=_rapidfuzz_fuzz.ratio).tolist()
+    if _rapidfuzz_fuzz is not None:
+        ratio = _rapidfuzz_fuzz.ratio
+        return [[ratio(row, column) for column in columns] for row in rows]
+
+    matrix = []
+    for row in rows:
+        masks = {}
+        for position, char in enumerate(row):
+            masks[char] = masks.get(char, 0) | (1 << position)
+        matrix.append([similarity(lcs_length(masks, len(row), column), len(row), len(column)) if row or column else 100
+                       for column in columns])
+    return matrix
+
+
+def cluster_books(books, threshold=CLUSTER_THRESHOLD):
+    """
+    Groups records of the same book: records sharing an ISBN or Open Library key, and records whose
+    titles are at least threshold similar and whose authors share a surname (or whose author is
+    unknown). A record without a subtitle is also compared with the main title of a subtitled one.
+
+    Args:
+        books (list): Book dictionaries from every provider.
+        threshold (int, optional): Title similarity from which records are merged. Defaults to CLUSTER_THRESHOLD.
+
+    Returns:
+        list: Clusters (lists of books), in the order of their first record.
+    """
+
+    parent = list(range(len(books)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(first, second):
+        first, second = find(first), find(second)
+        if first != second:
+            parent[max(first, second)] = min(first, second)  # The earliest record stays the root
+
+    # Joins on identifiers
+    seen = {}
+    for index, book in enumerate(books):
+        for field in ("ISBN", "key"):
+            if book.get(field):
+                union(index, seen.setdefault((field, book[field]), index))
+
+    # Joins on similar titles by a compatible author
+    titles = [normalize_title(book.get("title", "")) for book in books]
+    surnames = [author_surnames(book.get("author", "")) for book in books]
+    subtitled = [main != full for full, main in titles]
+    full_scores = similarity_matrix([full for full, _ in titles], [full for full, _ in titles])
+    main_scores = similarity_matrix([main for _, main in titles], [full for full, _ in titles])  # Main against full
+    for first in range(len(books)):
+        for second in range(first + 1, len(books)):
+            if not titles[first][0] or not titles[second][0]:
+                continue  # Records without a title are only joined on identifiers
+            score = full_scores[first][second]
+            # A main title only stands for the book when the other record has no subtitle: two
+            # subtitled records sharing a main title are usually volumes of one series
+            if subtitled[first] and not subtitled[second]:
+                score = max(score, main_scores[first][second])
+            elif subtitled[second] and not subtitled[first]:
+                score = max(score, main_scores[second][first])
+            if score < threshold:
+                continue
+            if surnames[first] and surnames[second] and not surnames[first] & surnames[second]:
+                continue  # Same title, different authors: different books
+            union(first, second)
+
+    clusters = {}
+    for index, book in enumerate(books):
+        clusters.setdefault(find(index), []).append(book)
+    return list(clusters.values())
+
+
+def _representative(cluster):
+    """
+    Picks the record shown for a cluster (the first one with an ISBN, which has the richest
+    details, else the first one), filling its missing fields from the other records.
+    """
+
+    chosen = next((book for book in cluster if book.get("ISBN")), cluster[0])
+    merged = dict(chosen)
+    for book in cluster:
+        for field, value in book.items():
+            if value and not merged.get(field):
+                merged[field] = value
+    return merged
+
+
+def rank_books(books, title, author="", limit=MAX_RESULTS):
+    """
+    Merges the records of every provider into candidates and ranks them against the search.
+
+    A candidate scores the best title similarity of its records (full or main title against the
+    searched title), mixed with the author similarity when an author was searched, plus a small
+    bonus for each extra record agreeing on it. Ties keep the provider order.
+
+    Args:
+        books (list): Book dictionaries from every provider, in provider order.
+        title (str): The searched title.
+        author (str, optional): The searched author. Defaults to an empty string.
+        limit (int, optional): Maximum number of candidates returned. Defaults to MAX_RESULTS.
+
+    Returns:
+        list: One book dictionary per candidate, best match first.
+    """
+
+    if not books:
+        return []
+
+    clusters = cluster_books(books)
+    query_full, query_main = normalize_title(title)
+    query_surnames = author_surnames(author)
+
+    candidates = [(book, cluster_index) for cluster_index, cluster in enumerate(clusters) for book in cluster]
+    titles = [normalize_title(book.get("title", "")) for book, _ in candidates]
+    title_scores = similarity_matrix([query_full, query_main], [full for full, _ in titles] + [main for _, main in titles])
+    count = len(candidates)
+    if query_surnames:
+        author_scores = similarity_matrix([normalize_text(author)], [normalize_text(book.get("author", "")) for book, _ in candidates])[0]
+
+    scores = [0.0] * len(clusters)
+    for position, (book, cluster_index) in enumerate(candidates):
+        score = max(title_scores[0][position], title_scores[0][count + position],
+                    title_scores[1][position], title_scores[1][count + position])
+        if query_surnames:
+            author_score = 100 if query_surnames & author_surnames(book.get("author", "")) else author_scores[position]
+            score = 0.75 * score + 0.25 * author_score
+        scores[cluster_index] = max(scores[cluster_index], score)
+
+    order = sorted(range(len(clusters)), key=lambda index: (-(scores[index] + 2 * (len(clusters[index]) - 1)), index))
+    return [_representative(clusters[index]) for index in order[:limit]]
@@ -0,0 +1,351 @@
+"""
+Module: Book Store
+
+This module keeps a local SQLite store of every book record the application has seen (title,
+author, ISBN, Open Library key, description and computed warnings), with an FTS5 full-text index
+on title and author. get_book_info consults it before the remote APIs: searches it can answer with
+high confidence are answered locally (and refreshed from the APIs in the background), and when
+every provider fails the best local matches are returned, so common searches also work offline.
+Database errors (a store locked by another process, a full disk) are logged: reads then count as
+misses and writes are skipped, so get_book_info falls back to the providers.
+
+Confidence of a local answer:
+    1.0  the same search was answered by the providers within QUERY_TTL
+    0.9  several stored books have exactly the searched title (and author, when given)
+    0.7  one stored book has exactly the searched title (and author)
+    <0.7 full-text matches only, scaled by the share of the searched words they contain
+
+Attributes:
+    DEFAULT_STORE_PATH (str): Default location of the store database.
+    QUERY_TTL (int): Seconds a remembered search is answered locally with full confidence.
+"""
+
+import json  # For the stored book records
+import logging  # For reporting database errors
+import os  # For the default store location
+import re  # For splitting searches into words
+import sqlite3  # For the store and its full-text index
+import threading  # For sharing one connection between threads
+import time  # For recency timestamps
+
+from response_cache import normalize_query  # Searches are remembered under the same key as cached responses
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "BOOK_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "book_content_rating", "books.sqlite3"),
+)
+QUERY_TTL = 7 * 24 * 60 * 60  # A week
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    identity TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    key TEXT NOT NULL,
+    record TEXT NOT NULL,
+    description TEXT,
+    warnings TEXT,
+    warnings_fingerprint TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS books_isbn ON books (isbn);
+CREATE INDEX IF NOT EXISTS books_key ON books (key);
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    title, author, content='books', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, author ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+    INSERT INTO books_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+END;
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    identities TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+def book_identity(book):
+    """
+    Identifies a book record across searches: its ISBN, else its Open Library key, else its title and author.
+
+    Args:
+        book (dict): A book record as returned by the search functions.
+
+    Returns:
+        str: The identity of the record.
+    """
+
+    if book.get("ISBN"):
+        return f"isbn:{book['ISBN']}"
+    if book.get("key"):
+        return f"key:{book['key']}"
+    return "title:" + normalize_query(book.get("title", ""), book.get("author", ""))
+
+
+def _words(text):
+    """
+    Splits text into lowercased words, the way the full-text index does.
+    """
+
+    return re.findall(r"\w+", text.lower())
+
+
+def _match_expression(title, author):
+    """
+    Builds an FTS5 query requiring every word of the title (and author) in the matching column.
+    """
+
+    def column(name, words):
+        return f"{name} : (" + " AND ".join('"' + word.replace('"', '""') + '"' for word in words) + ")"
+
+    parts = [column("title", _words(title))] if _words(title) else []
+    if _words(author):
+        parts.append(column("author", _words(author)))
+    return " AND ".join(parts)
+
+
+class BookStore:
+    """
+    A local store of book records with a full-text index on title and author.
+
+    Args:
+        path (str, optional): Path of the SQLite database (":memory:" for a non-persistent store).
+            Defaults to DEFAULT_STORE_PATH.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    def add_books(self, books):
+        """
+        Adds or updates book records (as returned by the search functions). Descriptions and
+        warnings already stored for them are kept.
+
+        Args:
+            books (list): Book dictionaries.
+        """
+
+        now = time.time()
+        with self._lock:
+            try:
+                for book in books:
+                    self._connection.execute(
+                        """INSERT INTO books (identity, title, author, isbn, key, record, updated)
+                           VALUES (?, ?, ?, ?, ?, ?, ?)
+                           ON CONFLICT (identity) DO UPDATE SET
+                               title = excluded.title, author = excluded.author, record = excluded.record,
+                               updated = excluded.updated""",
+                        (book_identity(book), book.get("title", ""), book.get("author", ""),
+                         book.get("ISBN", ""), book.get("key", ""), json.dumps(book), now))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._failed("write", e)
+
+    def remember_search(self, title, author, books):
+        """
+        Stores the books a search returned and remembers the search, so it can be answered locally.
+
+        Args:
+            title (str): The searched title.
+            author (str): The searched author.
+            books (list): The books the providers returned, in order.
+        """
+
+        self.add_books(books)
+        with self._lock:
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO queries (query, identities, updated) VALUES (?, ?, ?)",
+                    (normalize_query(title, author), json.dumps([book_identity(book) for book in books]), time.time()))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._failed("write", e)
+
+    def set_details(self, isbn="", key="", description=None, warnings=None, fingerprint=None):
+        """
+        Stores the description and/or warnings of the books with the given ISBN or Open Library key.
+
+        Args:
+            isbn (str, optional): The ISBN of the book.
+            key (str, optional): The Open Library key of the book.
+            description (str, optional): The description, if it was fetched.
+            warnings (list, optional): The computed warnings, if the description was analyzed.
+            fingerprint (str, optional): Fingerprint of the keyword lists the warnings were computed with.
+        """
+
+        column, value = ("isbn", isbn) if isbn else ("key", key)
+        if not value:
+            return
+        with self._lock:
+            try:
+                if description is not None:
+                    self._connection.execute(
+                        f"UPDATE books SET description = ? WHERE {column} = ?", (description, value))
+                if warnings is not None:
+                    self._connection.execute(
+                        f"UPDATE books SET warnings = ?, warnings_fingerprint = ? WHERE {column} = ?",
+                        (json.dumps(list(warnings)), fingerprint, value))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._failed("write", e)
+
+    def get_details(self, isbn="", key=""):
+        """
+        Returns what is stored about the book with the given ISBN or Open Library key.
+
+        Returns:
+            dict: "book" (the record), "description", "warnings" and "warnings_fingerprint"
+            (None when not stored), or None if the book is not stored.
+        """
+
+        column, value = ("isbn", isbn) if isbn else ("key", key)
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    f"SELECT record, description, warnings, warnings_fingerprint FROM books WHERE {column} = ? LIMIT 1",
+                    (value,)).fetchone()
+            except sqlite3.Error as e:
+                self._failed("read", e)
+                row = None
+        if row is None:
+            return None
+        return {"book": json.loads(row[0]), "description": row[1],
+                "warnings": json.loads(row[2]) if row[2] is not None else None, "warnings_fingerprint": row[3]}
+
+    def search(self, title, author="", limit=6):
+        """
+        Answers a search from the store.
+
+        Args:
+            title (str): The searched title.
+            author (str, optional): The searched author. Defaults to an empty string.
+            limit (int, optional): Maximum number of books returned. Defaults to 6.
+
+        Returns:
+            tuple: (books, confidence), where books is a list of book records in the order the
+            providers would list them (or by relevance) and confidence is between 0 and 1 (see the
+            module documentation). Returns ([], 0.0) when nothing matches.
+        """
+
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    "SELECT identities, updated FROM queries WHERE query = ?",
+                    (normalize_query(title, author),)).fetchone()
+                if row is not None and time.time() - row[1] <= QUERY_TTL:
+                    identities = json.loads(row[0])[:limit]
+                    records = dict(self._connection.execute(
+                        f"SELECT identity, record FROM books WHERE identity IN ({','.join('?' * len(identities))})",
+                        identities).fetchall()) if identities else {}
+                    if len(records) == len(identities):
+                        return [json.loads(records[identity]) for identity in identities], 1.0
+
+                expression = _match_expression(title, author)
+                if not expression:
+                    return [], 0.0
+                rows = self._connection.execute(
+                    """SELECT books.title, books.author, books.record FROM books_fts
+                       JOIN books ON books.id = books_fts.rowid
+                       WHERE books_fts MATCH ? ORDER BY bm25(books_fts) LIMIT ?""",
+                    (expression, limit)).fetchall()
+            except sqlite3.Error as e:
+                self._failed("read", e)
+                return [], 0.0  # Searched as if nothing matched, so the providers are asked
+
+        if not rows:
+            return [], 0.0
+        wanted_title, wanted_author = ' '.join(_words(title)), ' '.join(_words(author))
+        exact = [row for row in rows if ' '.join(_words(row[0])) == wanted_title
+                 and (not wanted_author or wanted_author in ' '.join(_words(row[1])))]
+        if exact:
+            return [json.loads(row[2]) for row in exact], 0.9 if len(exact) > 1 else 0.7
+        best_title = set(_words(rows[0][0]))
+        coverage = len(set(_words(title)) & best_title) / max(len(best_title), 1)
+        return [json.loads(row[2]) for row in rows], round(0.6 * coverage, 2)
+
+    def _failed(self, action, error):
+        """
+        Rolls back after a database error and logs it. Caller holds the lock.
+        """
+
+        logger.warning("Book store %s failed: %s", action, error)
+        try:
+            self._connection.rollback()
+        except sqlite3.Error:
+            pass
+
+    def stats(self):
+        """
+        Reports the number of stored books, described books and remembered searches.
+        """
+
+        with self._lock:
+            books, described = self._connection.execute(
+                "SELECT COUNT(*), COUNT(description) FROM books").fetchone()
+            queries = self._connection.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+        return {"books": books, "described": described, "queries": queries}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+
+        with self._lock:
+            self._connection.close()
+
+
+_store = None
+_store_enabled = True
+_store_lock = threading.Lock()
+
+
+def configure_book_store(path=DEFAULT_STORE_PATH, enabled=True):
+    """
+    Replaces the shared book store, or disables it with enabled=False.
+
+    Args:
+        path (str, optional): Path of the SQLite database. Defaults to DEFAULT_STORE_PATH.
+        enabled (bool, optional): Whether searches use the local store at all. Defaults to True.
+    """
+
+    global _store, _store_enabled
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+        _store = BookStore(path) if enabled else None
+        _store_enabled = enabled
+
+
+def get_book_store():
+    """
+    Returns the shared book store, creating it with the default settings on first use.
+
+    Returns:
+        BookStore: The shared store, or None if it is disabled or the database cannot be opened.
+    """
+
+    global _store, _store_enabled
+    if _store is None and _store_enabled:
+        with _store_lock:
+            if _store is None and _store_enabled:
+                try:
+                    _store = BookStore()
+                except (OSError, sqlite3.Error):
+                    _store_enabled = False  # Work without a store rather than fail every search
+    return _store
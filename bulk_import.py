@@ -0,0 +1,370 @@
+"""
+Module: Bulk Import
+
+This module rates whole catalogues from the command line. It reads a CSV or JSON lines file of
+titles, authors and/or ISBNs as a stream and runs each record through the lookup -> description
+fetch -> analysis pipeline, writing the results incrementally to JSON lines or CSV.
+
+Each stage has its own bounded pool (threads for the two network stages, optionally processes for
+the analysis) and holds at most max_pending records. The stages pull from one another, so a slow
+stage holds back the ones before it and memory stays flat whatever the size of the input.
+
+Results are written in input order. Every checkpoint_every records the output is flushed and a
+checkpoint (records done, output size) is saved next to it; with --resume a crashed run continues
+from the last checkpoint instead of starting over.
+
+Usage:
+    python bulk_import.py catalogue.csv ratings.jsonl [--resume] [--processes 4]
+
+Input records need a "title" (optionally with an "author") or an "isbn" field; an "id" field is
+copied to the output, and defaults to the record number.
+"""
+
+import argparse  # For command-line arguments
+import csv  # For CSV input and output
+import json  # For JSON lines input, output and checkpoints
+import os  # For checkpoint files
+import sys  # For the progress report
+from collections import deque  # For the in-flight records of each stage
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor  # For the stage pools
+from functools import partial  # For passing the threshold to the analysis stage
+from itertools import islice  # For skipping records on resume
+
+from batch_scoring import score_description  # The per-description analysis
+from book_api import (  # Headless API clients
+    BookAPIError,
+    get_book_info,
+    get_google_books_description_and_img_URL,
+    get_open_books_description,
+    store_book_warnings,
+)
+from content_analysis import KEYWORD_FINGERPRINT  # Recorded with the warnings in the book store
+
+OUTPUT_FIELDS = ["id", "title", "author", "isbn", "key", "warnings", "error"]  # Columns of a CSV output
+DEFAULT_CHECKPOINT_EVERY = 100  # Records between checkpoints
+
+
+def detect_format(path):
+    """
+    Guesses a file format from its extension: "csv" for .csv and .tsv files, "jsonl" otherwise.
+    """
+
+    return "csv" if path.lower().endswith((".csv", ".tsv")) else "jsonl"
+
+
+def read_records(path, input_format=None):
+    """
+    Reads input records from a CSV (with a header row) or JSON lines file, one at a time.
+
+    Field names are matched case-insensitively, so "ISBN", "Title" and "title" all work.
+
+    Args:
+        path (str): Path of the input file.
+        input_format (str, optional): "csv" or "jsonl". Guessed from the extension if omitted.
+
+    Yields:
+        dict: A record with "id", "title", "author", "isbn" (empty strings when missing) and "error"
+        (why a JSON line could not be read as a record, otherwise empty).
+    """
+
+    input_format = input_format or detect_format(path)
+    with open(path, encoding="utf-8", newline="") as file:
+        if input_format == "csv":
+            rows = csv.DictReader(file, dialect="excel-tab" if path.lower().endswith(".tsv") else "excel")
+        else:
+            rows = (_parse_json_line(line) for line in file if line.strip())
+        for number, row in enumerate(rows):
+            if not isinstance(row, dict):
+                yield {"id": number, "title": "", "author": "", "isbn": "", "error": row}
+                continue
+            fields = {str(name).strip().lower(): value for name, value in row.items() if name is not None}
+            yield {
+                "id": fields.get("id") or number,
+                "title": str(fields.get("title") or "").strip(),
+                "author": str(fields.get("author") or "").strip(),
+                "isbn": str(fields.get("isbn") or "").strip(),
+                "error": "",
+            }
+
+
+def _parse_json_line(line):
+    """
+    Parses one JSON lines record. Returns the object, or a message saying why the line is not one.
+    """
+
+    try:
+        row = json.loads(line)
+    except ValueError as e:
+        return f"invalid JSON: {e}"
+    if not isinstance(row, dict):
+        return f"record is not a JSON object: {type(row).__name__}"
+    return row
+
+
+def lookup_record(record):
+    """
+    Pipeline stage 1: finds the book of a record. An ISBN is used as is; otherwise the best search
+    result for the title and author is taken.
+
+    Args:
+        record (dict): A record from read_records.
+
+    Returns:
+        dict: The record with "key" (Open Library key, if any) and "error" added, and "description"
+        when the search result carried it (Google Books).
+    """
+
+    result = dict(record, key="", error=record.get("error", ""))
+    if result["error"]:
+        return result  # The input line could not be read, there is nothing to look up
+    if result["isbn"]:
+        return result
+    if not result["title"]:
+        result["error"] = "record has neither a title nor an ISBN"
+        return result
+
+    try:
+        books = get_book_info(result["title"], result["author"])
+    except BookAPIError as e:
+        result["error"] = str(e)
+        return result
+    if not books:
+        result["error"] = "no book found"
+        return result
+
+    book = books[0]  # Results are ordered by provider, best match first
+    result.update(title=book["title"], author=book["author"], isbn=book.get("ISBN", ""), key=book.get("key", ""))
+    if book.get("description"):
+        result["description"] = book["description"]  # Kept from the search, nothing left to fetch
+    return result
+
+
+def fetch_description(record):
+    """
+    Pipeline stage 2: fetches the description of a looked up record.
+
+    Args:
+        record (dict): A record from lookup_record.
+
+    Returns:
+        dict: The record with "description" added (empty if there is none or the fetch failed).
+    """
+
+    result = dict(record)
+    if result.get("description"):
+        return result  # Already known from the search
+    result["description"] = ""
+    if result["error"]:
+        return result
+    try:
+        if result["isbn"]:
+            result["description"], _ = get_google_books_description_and_img_URL(result["isbn"])
+        if not result["description"] and result["key"]:
+            result["description"] = get_open_books_description(result["key"])
+    except BookAPIError as e:
+        result["error"] = str(e)
+    return result
+
+
+def analyze_record(record, threshold=80):
+    """
+    Pipeline stage 3: analyzes the description of a fetched record.
+
+    Args:
+        record (dict): A record from fetch_description.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+
+    Returns:
+        dict: The record with "warnings" (list) in place of "description".
+    """
+
+    result = dict(record)
+    result["warnings"] = score_description(result.pop("description"), threshold)
+    return result
+
+
+def _bounded_map(func, items, executor, max_pending):
+    """
+    Applies func to every item on an executor, yielding the results in input order with at most
+    max_pending items in flight. With executor=None func runs in the calling thread.
+    """
+
+    if executor is None:
+        for item in items:
+            yield func(item)
+        return
+
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()  # Wait for the oldest item before reading more input
+    while pending:
+        yield pending.popleft().result()
+
+
+def iter_ratings(records, threshold=80, lookup_workers=4, fetch_workers=4, processes=1, max_pending=None):
+    """
+    Runs records through the lookup -> description -> analysis pipeline and yields the rated records.
+
+    Args:
+        records (iterable): Records with "id", "title", "author", "isbn" and optionally "error" (see
+            read_records).
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+        lookup_workers (int, optional): Concurrent lookups. Defaults to 4.
+        fetch_workers (int, optional): Concurrent description fetches. Defaults to 4.
+        processes (int, optional): Worker processes for the analysis. With 1 (the default) the
+            analysis runs in the calling thread.
+        max_pending (int, optional): Records held by each stage. Defaults to twice its workers.
+
+    Yields:
+        dict: The rated record, in input order: "id", "title", "author", "isbn", "key", "warnings"
+        (list) and "error" (empty if the record was rated).
+    """
+
+    analysis = ProcessPoolExecutor(processes) if processes > 1 else None
+    try:
+        with ThreadPoolExecutor(lookup_workers, thread_name_prefix="bulk-lookup") as lookups, \
+                ThreadPoolExecutor(fetch_workers, thread_name_prefix="bulk-fetch") as fetches:
+            looked_up = _bounded_map(lookup_record, records, lookups, max_pending or lookup_workers * 2)
+            fetched = _bounded_map(fetch_description, looked_up, fetches, max_pending or fetch_workers * 2)
+            yield from _bounded_map(partial(analyze_record, threshold=threshold), fetched, analysis,
+                                    max_pending or processes * 2)
+    finally:
+        if analysis is not None:
+            analysis.shutdown(cancel_futures=True)
+
+
+def _load_checkpoint(path):
+    """
+    Reads a checkpoint file, or returns None if there is none.
+    """
+
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(path, checkpoint):
+    """
+    Writes a checkpoint file atomically, so a crash never leaves a half-written checkpoint.
+    """
+
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def rate_catalogue(input_path, output_path, resume=False, input_format=None, output_format=None,
+                   checkpoint_every=DEFAULT_CHECKPOINT_EVERY, progress=None, **pipeline_options):
+    """
+    Rates every record of an input file and writes the results to an output file, with checkpoints.
+
+    Args:
+        input_path (str): CSV or JSON lines file of records (see read_records).
+        output_path (str): JSON lines or CSV file the results are written to.
+        resume (bool, optional): Continue from the checkpoint of an earlier run, if there is one.
+            Otherwise the output file is overwritten. Defaults to False.
+        input_format (str, optional): "csv" or "jsonl". Guessed from the extension if omitted.
+        output_format (str, optional): "csv" or "jsonl". Guessed from the extension if omitted.
+        checkpoint_every (int, optional): Records between checkpoints. Defaults to DEFAULT_CHECKPOINT_EVERY.
+        progress (callable, optional): Called with the number of records done at every checkpoint.
+        **pipeline_options: threshold, lookup_workers, fetch_workers, processes and max_pending (see iter_ratings).
+
+    Returns:
+        dict: "done" (records in the output), "resumed_at" (records skipped from the earlier run)
+        and "errors" (records of this run that could not be rated).
+
+    Raises:
+        ValueError: If checkpoint_every is less than 1, or the checkpoint belongs to another input file.
+    """
+
+    if checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be at least 1.")
+    output_format = output_format or detect_format(output_path)
+    checkpoint_path = output_path + ".checkpoint"
+
+    checkpoint = _load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None and checkpoint["input"] != os.path.abspath(input_path):
+        raise ValueError(f"{checkpoint_path} belongs to another input file: {checkpoint['input']}")
+    done = checkpoint["done"] if checkpoint else 0
+
+    if checkpoint:
+        file = open(output_path, "r+", encoding="utf-8", newline="")
+        file.seek(checkpoint["offset"])
+        file.truncate()  # Drop the results written after the last checkpoint, they are redone
+    else:
+        file = open(output_path, "w", encoding="utf-8", newline="")
+
+    stats = {"done": done, "resumed_at": done, "errors": 0}
+    with file:
+        writer = csv.DictWriter(file, OUTPUT_FIELDS) if output_format == "csv" else None
+        if writer is not None and not checkpoint:
+            writer.writeheader()
+
+        def save():
+            file.flush()
+            os.fsync(file.fileno())
+            _save_checkpoint(checkpoint_path, {
+                "input": os.path.abspath(input_path), "done": stats["done"], "offset": file.tell()})
+            if progress is not None:
+                progress(stats["done"])
+
+        records = islice(read_records(input_path, input_format), done, None)  # Skip what is already done
+        for result in iter_ratings(records, **pipeline_options):
+            row = {field: result.get(field, "") for field in OUTPUT_FIELDS}
+            if writer is not None:
+                row["warnings"] = "; ".join(row["warnings"])
+                writer.writerow(row)
+            else:
+                file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            stats["done"] += 1
+            stats["errors"] += bool(result["error"])
+            if not result["error"]:
+                store_book_warnings(result, result["warnings"], KEYWORD_FINGERPRINT)
+            if stats["done"] % checkpoint_every == 0:
+                save()
+        save()
+
+    return stats
+
+
+def main():
+    """
+    Command-line entry point: rates a catalogue file and prints a summary.
+    """
+
+    parser = argparse.ArgumentParser(description="Rate a catalogue of books for content warnings.")
+    parser.add_argument("input", help="CSV or JSON lines file with title/author or isbn fields")
+    parser.add_argument("output", help="JSON lines or CSV file for the results")
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint of an earlier run")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"), help="Input format (default: from the extension)")
+    parser.add_argument("--output-format", choices=("csv", "jsonl"), help="Output format (default: from the extension)")
+    parser.add_argument("--threshold", type=int, default=80, help="Fuzzy matching threshold (default 80)")
+    parser.add_argument("--lookup-workers", type=int, default=4, help="Concurrent lookups (default 4)")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Concurrent description fetches (default 4)")
+    parser.add_argument("--processes", type=int, default=1, help="Analysis worker processes (default 1)")
+    parser.add_argument("--max-pending", type=int, help="Records held by each stage (default: twice its workers)")
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                        help=f"Records between checkpoints (default {DEFAULT_CHECKPOINT_EVERY})")
+    args = parser.parse_args()
+
+    stats = rate_catalogue(
+        args.input, args.output, resume=args.resume, input_format=args.input_format,
+        output_format=args.output_format, checkpoint_every=args.checkpoint_every,
+        progress=lambda done: print(f"{done} records done", file=sys.stderr),
+        threshold=args.threshold, lookup_workers=args.lookup_workers, fetch_workers=args.fetch_workers,
+        processes=args.processes, max_pending=args.max_pending)
+
+    if stats["resumed_at"]:
+        print(f"Resumed after {stats['resumed_at']} records")
+    print(f"Records written: {stats['done']}, not rated: {stats['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Module: Keyword List Check
+
+This module checks the content warning keyword lists before they ship: it reports suspicious
+entries (including string literals run together by a missing comma in the source), the entries
+compiling cleans up (duplicates, unnormalized case or spacing), and how much compiling shrinks the lists.
+
+Usage:
+    python check_keywords.py [--verbose]
+
+The exit status is 1 when a suspicious entry is found, so the check can run as a build step.
+"""
+
+import argparse  # For command-line arguments
+import inspect  # For locating the source of the keyword lists
+import io  # For tokenizing source text
+import sys  # For the exit status
+import tokenize  # For finding adjacent string literals
+
+import content_analysis  # The keyword lists to check
+from keyword_matcher import SUSPICIOUS_KINDS, keyword_table_stats, validate_keywords
+
+
+def find_implicit_concatenations(source):
+    """
+    Finds string literals written next to each other without a comma, which Python silently joins
+    into one string (for example "graphic attack""combat").
+
+    Args:
+        source (str): Python source code.
+
+    Returns:
+        list: (line number, joined text) for each run of adjacent string literals.
+    """
+
+    found = []
+    run = []  # Consecutive STRING tokens
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.STRING:
+            run.append(token)
+            continue
+        if token.type in (tokenize.NL, tokenize.COMMENT):
+            continue  # Strings split across lines are still joined
+        if len(run) > 1:
+            found.append((run[0].start[0], "".join(t.string for t in run)))
+        run = []
+    return found
+
+
+def main():
+    """
+    Command-line entry point: prints the issues and the size report of KEYWORD_WARNINGS.
+    """
+
+    parser = argparse.ArgumentParser(description="Check the content warning keyword lists.")
+    parser.add_argument("--verbose", action="store_true", help="Also list duplicates and unnormalized entries")
+    args = parser.parse_args()
+
+    suspicious = 0
+    for line, text in find_implicit_concatenations(inspect.getsource(content_analysis)):
+        print(f"content_analysis.py:{line}: adjacent string literals {text} (missing comma?)")
+        suspicious += 1
+
+    issues = validate_keywords(content_analysis.KEYWORD_WARNINGS)
+    for issue in issues:
+        if issue.kind in SUSPICIOUS_KINDS:
+            print(f"{issue.category}: {issue.problem}")
+            suspicious += 1
+        elif args.verbose:
+            print(f"{issue.category}: {issue.problem} (cleaned up when compiling)")
+
+    stats = keyword_table_stats(content_analysis.KEYWORD_WARNINGS, content_analysis.KEYWORD_MATCHER)
+    print(f"Entries: {stats['entries']} ({stats['characters']} characters)")
+    print(f"Compiled: {stats['unique_keywords']} unique keywords ({stats['unique_characters']} characters), "
+          f"{stats['trie_states']} automaton states")
+    print(f"Removed {stats['duplicates_removed']} duplicates within categories; "
+          f"{stats['shared_keywords']} keywords shared by several categories are stored once")
+    print(f"Reduction: {stats['reduction']:.1%} fewer patterns")
+    print(f"Suspicious entries: {suspicious}")
+
+    sys.exit(1 if suspicious else 0)
+
+
+if __name__ == "__main__":
+    main()
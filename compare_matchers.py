@@ -0,0 +1,127 @@
+"""
+Module: Matcher Comparison Harness
+
+This module compares the original content warning analysis (a substring test plus
+fuzz.partial_ratio for every keyword) with the current analyze_description, and reports every
+description on which the two disagree. Use it after changing the matcher or the keyword lists.
+
+Usage:
+    python compare_matchers.py descriptions.txt [--threshold 80]
+
+The input file holds one description per line, or one JSON object per line with a "description" field.
+"""
+
+import argparse  # For command-line arguments
+import json  # For reading JSON lines input
+import time  # For timing both paths
+
+from content_analysis import KEYWORD_WARNINGS, analyze_description  # The current analysis path
+
+
+def legacy_analyze_description(description, threshold=80):
+    """
+    Analyzes a description exactly as the original implementation did.
+
+    Every keyword is tested with a substring check and then with fuzz.partial_ratio against the
+    whole lowercased description. This is slow and is only kept as the reference for comparisons.
+
+    Args:
+        description (str): The book description to be analyzed.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+
+    Returns:
+        list: A list of warning types that match keywords found in the description.
+    """
+
+    from fuzzywuzzy import fuzz  # Only the reference path needs fuzzywuzzy
+
+    warnings = []
+    for warning_name, warning_keywords in KEYWORD_WARNINGS.items():
+        for keyword in warning_keywords:
+            if keyword in description.lower() or fuzz.partial_ratio(keyword, description.lower()) > threshold:
+                warnings.append(warning_name)
+                break
+    return warnings
+
+
+def compare_descriptions(descriptions, threshold=80):
+    """
+    Runs both analysis paths over the given descriptions and collects their disagreements.
+
+    Args:
+        descriptions (iterable): The book descriptions to analyze.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+
+    Returns:
+        dict: A report with the number of descriptions, the time spent in each path, and a list of
+        disagreements. Each disagreement holds the description index, the categories only the legacy
+        path found ("legacy_only") and the categories only the new path found ("new_only").
+    """
+
+    report = {"descriptions": 0, "legacy_seconds": 0.0, "new_seconds": 0.0, "disagreements": []}
+
+    for index, description in enumerate(descriptions):
+        start = time.perf_counter()
+        legacy = set(legacy_analyze_description(description, threshold))
+        middle = time.perf_counter()
+        new = set(analyze_description(description, threshold, use_cache=False))
+        end = time.perf_counter()
+
+        report["descriptions"] += 1
+        report["legacy_seconds"] += middle - start
+        report["new_seconds"] += end - middle
+
+        if legacy != new:
+            report["disagreements"].append({
+                "index": index,
+                "legacy_only": sorted(legacy - new),
+                "new_only": sorted(new - legacy),
+            })
+
+    return report
+
+
+def read_descriptions(path):
+    """
+    Reads descriptions from a text file (one per line) or a JSON lines file with a "description" field.
+
+    Args:
+        path (str): Path of the input file.
+
+    Yields:
+        str: Each non-empty description.
+    """
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                line = json.loads(line).get("description", "")
+            if line:
+                yield line
+
+
+def main():
+    """
+    Command-line entry point: compares both paths on a file of descriptions and prints the report.
+    """
+
+    parser = argparse.ArgumentParser(description="Compare the legacy and current content warning matchers.")
+    parser.add_argument("path", help="File with one description per line (plain text or JSON lines)")
+    parser.add_argument("--threshold", type=int, default=80, help="Fuzzy matching threshold (default 80)")
+    args = parser.parse_args()
+
+    report = compare_descriptions(read_descriptions(args.path), args.threshold)
+
+    print(f"Descriptions: {report['descriptions']}")
+    print(f"Legacy path: {report['legacy_seconds']:.2f}s, new path: {report['new_seconds']:.2f}s")
+    print(f"Disagreements: {len(report['disagreements'])}")
+    for disagreement in report["disagreements"]:
+        print(f"  #{disagreement['index']}: legacy only {disagreement['legacy_only']}, "
+              f"new only {disagreement['new_only']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""
+Module: Content Analysis
+
+This module holds the content warning keyword lists and the analysis that matches them against a
+book description. It has no GUI dependencies, so it can be imported by scripts, workers and tools.
+
+Attributes:
+    KEYWORD_WARNINGS (dict): Content warning categories and the keywords associated with each.
+    KEYWORD_MATCHER (CompiledKeywords): KEYWORD_WARNINGS compiled into a single keyword automaton.
+    KEYWORD_FUZZY_INDEX (FuzzyIndex): Q-gram index over the keywords for approximate matching.
+    KEYWORD_FINGERPRINT (str): Fingerprint of KEYWORD_WARNINGS, part of every cached result's key.
+    ANALYSIS_CACHE (AnalysisCache): Memoized analysis results (in memory unless configured otherwise).
+    HIT_RATES (KeywordHitRates): How often each keyword matched, used to order the budgeted fuzzy pass.
+    BudgetedAnalysis (namedtuple): The result of analyze_description_budgeted.
+"""
+
+import threading  # For sharing the hit rates between threads
+import time  # For the latency budget
+from collections import namedtuple  # For the budgeted result
+from keyword_matcher import compile_keywords, find_categories  # For single-pass keyword matching
+from fuzzy_index import (  # For the fuzzy pass
+    TextMatcher, batch_fuzzy_categories, build_fuzzy_index, find_fuzzy_categories, resolve_backend, scorer_name)
+from analysis_cache import AnalysisCache, DEFAULT_MAX_ENTRIES, analysis_key, keyword_fingerprint  # For memoized results
+import instrumentation  # For timing the analysis passes
+
+# Dictionary of keywords associated with various content warnings
+# Each key represents a type of content warning with a list of keywords related to that warning
+KEYWORD_WARNINGS = {
+    "Animal Abuse": ["animal", "cruelty", "neglect", "harm", "suffering", "mistreatment", "abuse","beating", "starvation", "malnourishment", "torment", "torture", "maltreat",
+        "exploit", "kill", "slaughter", "poach", "trap", "experiment", "hunt", "cage","abandon", "discard", "pain", "whip", "shoot", "trap", "confine", "enslave",
+        "skin", "fur", "endanger", "bait", "bleed", "choke", "crush", "misuse","overwork", "punish", "scar", "shock", "strangle", "wound", "maim", "disfigure",
+        "mutilate", "vivisection", "imprisoned", "lab animal", "chained", "caged","trafficked", "illegal trade", "baiting", "fight", "abusement park", "entertainment",
+        "circuses", "rodeo", "farming", "fur trade", "leather", "cosmetic testing","laboratory", "breed", "overbreed", "pet mill", "racing", "gamblers", "breeders",
+        "discard", "euthanize", "abandoned", "stray", "wildlife", "marine life","inhumane", "captivity", "illegal hunting", "brutality", "battery", "factory farming",
+        "intensive farming", "live transport", "overfishing", "pollution", "habitat destruction","deforestation", "illegal capture", "smuggling", "animal testing", "genetic manipulation",
+        "cloning", "forced feeding", "foie gras", "shark finning", "ivory trade", "horn trade","bear bile", "exotic pets", "wildlife trade", "dolphin hunt", "whale hunt", "seal hunt",
+        "fur farming", "battery cages", "veal crates", "puppy mills", "cockfight", "dogfight","bullfight", "horse whipping", "elephant ride", "animal performance", "animal hoarding",
+        "overpopulation", "negligent care", "physical abuse", "psychological abuse", "overbreeding","debeaking", "tail docking", "ear cropping", "declawing", "force molting", "live bait","animal sacrifice", "roadkill", "pest control", "inhumane slaughter", "live skinning",
+        "animal fighting", "dog racing", "horse racing", "animal exploitation", "speciesism","wild capture", "wildlife disruption", "ecosystem damage", "bioaccumulation",
+        "toxic testing", "animal abandonment", "zoo captivity", "unsustainable practices","destructive fishing", "bycatch", "animal hoarder", "animal neglect", "animal collector"],
+    "Sexual Violence": ["rape", "sexual assault", "molestation", "abuse", "harassment", "exploitation",
+        "predator", "stalking", "coercion", "forced", "non-consensual", "trafficking","grooming", "victimization", "indecent", "violence", "aggression", "dominance",
+        "power abuse", "lewd", "sex crime", "sexual misconduct", "unwanted advances","inappropriate touch", "intimidation", "survivor", "sexual violence", "sexual threat",
+        "sodomy", "non-consent", "predatory", "sexual predator", "date rape", "gang rape","spousal abuse", "marital rape", "child sexual abuse", "incest", "voyeurism",
+        "exhibitionism", "sexual humiliation", "sexual slavery", "forced prostitution","sexual exploitation", "sexual coercion", "revenge porn", "upskirt", "peeping tom",
+        "statutory rape", "sexual bullying", "cyber harassment", "sextortion", "sexual blackmail",
+        "fondling", "indecency", "sexual aggression", "sexual dominance", "rape culture","non-consensual", "nonconsensual", "harassment","grope", "abuse", "forced", "attack", "inappropriate", "unwanted", "exploit", "violate",
+        "coerce", "intimidate", "threaten", "predator", "offender", "consent", "groom", "stalk","unsolicited", "touch", "fear", "trauma", "victim", "traumatize", "vulnerable", "invasion",
+        "inappropriate", "violation", "indecent", "forceful", "abusive relationship", "manipulation","intimate violence", "uninvited", "molest", "statutory", "silence", "hush", "date rape","drugged", "power", "control", "cyber", "explicit", "sexting", "blackmail", "shaming","exploitation", "revenge porn", "intimate threat", "exposure", "uncomfortable", "unsafe","minor", "child", "elderly", "defenseless"],
+    "Body Image/Disordered Eating": ["body image", "eating disorder", "anorexia", "bulimia", "body dysmorphia", "binge","starvation", "diet", "thin", "fat", "overeating", "weight", "obesity", "underweight",
+        "purge", "overeating","binge eating", "starvation", "purging", "body shaming", "weight obsession","negative body image", "fat shaming", "dieting", "extreme dieting", "laxative abuse",
+        "compulsive eating", "restrictive eating", "body hatred", "thinness", "overexercising","body dissatisfaction", "weight criticism", "calorie counting", "self-starvation",
+        "food phobia", "negative self-image", "body comparison", "weight loss","unhealthy body image", "beauty standards", "food guilt",
+        "perfectionism in diet", "malnutrition", "underweight", "overweight", "obesity","body negativity", "food obsession", "diet pills", "appetite suppressants",
+        "body image distortion", "self-esteem issues", "unrealistic body standards","size zero", "model thin", "skinny ideal", "appearance-focused culture","restriction", "calorie", "fast", "unhealthy", "mirror", "self-worth","appearance", "pressure", "ideal", "size", "dieting", "body shaming", "self-conscious",
+        "perfection", "body dissatisfaction", "exercise", "obsession", "orthorexia", "laxatives","diuretics", "body checking", "guilt", "shame", "control", "image", "food fear","compulsive", "scale", "weight gain", "weight loss", "muscle", "toning", "fitness","skinny", "plump", "heavy", "light", "self-esteem", "self-hate", "mirror check","avoidance", "pinch", "measure", "waist", "BMI", "comparison"],
+    "Self-Harm/Suicide": ["self-harm", "suicide", "cutting", "overdose", "self-inflict", "end life", "attempt",
+        "despair", "self-harm", "self-injury", "cutting", "suicide", "suicidal thoughts", "self-mutilation","self-destructive behavior", "overdose", "self-inflicted", "self-abuse", "harmful behavior","self-punishment", "self-cutting", "self-burning", "suicide attempt", "suicide ideation",
+        "self-poisoning", "self-sabotage", "suicidal ideation", "suicidal tendencies", "hanging",
+        "jumping", "poisoning", "drowning", "asphyxiation", "suicide note", "suicide plan","fatal injury", "self-inflicted wound", "self-aggression", "self-hatred", "suicide pact",
+        "suicide prevention", "cry for help", "self-scarification", "suicide hotline", "suicide crisis","self-strangulation", "lethal means", "death wish", "desperation", "hopelessness",
+        "suicide survivor", "fatal self-harm", "suicidal behavior", "suicidal crisis", "suicide watch","suicide risk", "suicide method", "self-inflicted pain", "suicide contagion", "hopelessness", "pain", "wrist", "bleed", "scars", "burn", "jump", "hang","suffocate", "cry", "lonely", "depressed", "worthless", "numb", "lost", "void", "struggle","isolation", "helplessness", "grieve", "self-loathing", "suicidal thoughts", "ideation","death wish", "razor", "pills", "intoxication", "sadness", "sorrow", "self-punishment",
+        "self-destructive", "darkness", "emptiness", "rope", "bridge", "height", "firearm","blade", "cutting tool", "gas", "drowning", "substance", "ingest", "alcohol", "method","means", "lethality", "intent", "crisis", "hotline"],
+    "Discrimination/Hate Crimes": ["discrimination", "racism", "homophobia", "sexism", "hate crime", "prejudice", "bigotry","intolerance", "xenophobia", "bias", "stereotype", "slur", "discriminate", "marginalize",
+        "oppress", "discrimination", "racism", "sexism", "homophobia", "transphobia", "xenophobia",
+        "bigotry", "prejudice", "hate crime", "bias", "intolerance", "stereotyping","inequality", "marginalization", "exclusion", "hate speech", "racial profiling",
+        "gender discrimination", "sexual orientation discrimination", "religious intolerance","ethnic hatred", "social injustice", "civil rights violation", "racial slur",
+        "gender bias", "misogyny", "misandry", "ageism", "ableism", "classism","scapegoating", "victimization", "hateful rhetoric", "sectarian violence",
+        "racial violence", "gender-based violence", "ethnocentrism", "cultural discrimination","lynching", "apartheid", "segregation", "genocide", "ethnic cleansing",
+        "hate group", "white supremacy", "neo-nazism", "radical extremism", "racial supremacy","gender inequality", "institutional racism", "structural discrimination", "oppression",
+        "cultural bias", "social exclusion", "minority oppression", "racial injustice", "gender violence", "racial tension", "cultural clash", "religious persecution","caste discrimination", "social stratification", "hate propaganda", "racial discrimination",
+        "ethnic bias", "religious bias", "gender stereotyping", "cultural stereotyping", "minority", "inequality", "unfair", "segregation", "racist", "sexist", "bigot","prejudiced", "hateful", "derogatory", "injustice", "persecute", "isolate", "alienate",
+        "ostracize", "scapegoat", "gender bias", "ethnicity", "nationality", "caste", "class","religious", "anti-Semitism", "Islamophobia", "disability", "ageism", "LGBTQ+","gender identity", "transphobia", "colorism", "microaggressions", "supremacy", "radical","extremist", "prejudice", "bias-motivated", "targeted", "offense", "vandalism", "symbol","hate speech", "propaganda"],
+    "Violence & Graphic Content": ["violence", "graphic", "gore", "brutal", "vicious", "blood", "wound", "injury", "attack","hurt", "punch", "stab", "hit", "fight", "assault", "battle", "conflict", "terror", "shock","horror", "aggression", "intense", "disturb", "trauma", "frighten", "scar", "fear", "threat","danger", "menace", "brawl", "riot", "massacre", "ambush", "explosive", "bomb", "firearm",
+        "weapon", "gunshot",  "violence", "graphic content", "gore", "brutality", "bloodshed", "assault",
+        "fighting", "murder", "homicide", "torture", "abuse", "physical attack","warfare", "combat", "mutilation", "graphic injury", "fatal violence", 
+        "violent crime", "bloodletting", "gruesome scene", "violent death", "massacre","bloodbath", "carnage", "atrocity", "savagery", "graphic murder", "violent assault",
+        "gruesome injury", "sadistic torture", "brutal killing", "violent conflict", "graphic violence", "violent imagery", "vicious attack", "bloody conflict",
+        "graphic torture", "violent struggle", "violent aggression", "barbaric acts","graphic killing", "sadistic violence", "graphic depiction", "violent encounter",
+        "gruesome detail", "violent retribution", "violent reprisal", "bloody violence","gory scene", "graphic description", "graphic battle", "violent scene", 
+        "violence portrayal", "gory detail", "brutal scene", "violent act", "violent behavior","violent clash", "violent uprising", "violent confrontation", "graphic attack", "combat", "warfare", "sadism", "torture", "mutilation", "decapitation","beheading", "suffering", "pain", "traumatic", "scarring", "nightmare", "terrorize", "harm","damage", "intimidation", "coercion"],
+    "Substance Abuse/Addiction": ["drugs", "drug use", "substance abuse", "narcotics", 
+        "overdose", "addiction", "substance abuse", "addiction", "drug abuse", "alcoholism", "drug addiction","alcohol abuse", "overdose", "dependency", "substance use disorder", "drug dependency",
+        "narcotics", "intoxication", "withdrawal", "rehabilitation", "sober", "sobriety","substance misuse", "drunk", "high", "addict", "relapse", "detoxification",
+        "intervention", "drug rehabilitation", "alcohol dependency", "chemical dependency","opioid crisis", "methamphetamine", "cocaine", "heroin", "prescription drug abuse",
+        "illegal drugs", "controlled substances", "substance use", "drug treatment","alcohol treatment", "addiction recovery", "substance dependence", "drug overdose",
+        "alcohol overdose", "drug intoxication", "alcohol intoxication", "drug addict","alcohol addict", "drug withdrawal", "alcohol withdrawal", "substance abuse treatment","addiction treatment", "drug rehabilitation center", "alcohol rehabilitation center",
+        "substance abuse recovery", "addiction therapy", "substance abuse counseling","drug abuse prevention", "alcohol abuse prevention", "substance addiction","chemical abuse", "addictive behavior", "drug craving", "alcohol craving",
+        "substance craving", "drug relapse", "alcohol relapse", "addiction relapse","dependence","heroin", "cocaine", "methamphetamine", "crystal meth", "amphetamine", "speed", "ecstasy", "MDMA","marijuana", "weed", "pot", "cannabis", "THC", "CBD", "psychedelics", "LSD", "acid", "magic mushrooms", "psilocybin","opioids", "opiates", "painkillers", "morphine", "codeine", 
+        "benzodiazepines", "valium", "xanax","alcohol", "alcoholism", "drinking", "intoxication", "tobacco", "smoking", "cigarettes", "nicotine", "inhalants", "huffing", "prescription drugs", "pharmaceutical abuse", "caffeine", "energy drinks", "coffee addiction", "anabolic steroids","barbiturates", "sedatives","hallucinogens", "PCP", "ketamine", "binge drinking", "drunk", "hangover","rehab", "rehabilitation", "detox", "withdrawal"],
+    "Child Abuse/Domestic Violence": ["child abuse", "domestic violence", "molestation", "beating", "hurt", "neglect","exploit", "trauma", "emotional abuse", "verbal abuse", "physical abuse", "bullying","endanger", "child labor", "trafficking", "kidnap", "abandon", "fear", "threat","intimidate", "victim", "vulnerable", "protective services", "shelter", "coercion",
+        "manipulate", "child abuse", "neglect", "maltreatment", "domestic violence", "physical abuse","emotional abuse", "psychological abuse", "sexual abuse", "exploitation", "bullying",
+        "harassment", "intimidation", "trauma", "traumatic", "beating", "hitting", "slapping","shaking", "burning", "scalding", "biting", "bruising", "wounding", "injury", "injuries","torture", "assault", "molestation", "incest", "rape", "grooming", "threats", "threatening","screaming", "yelling", "verbal abuse", "coercion", "manipulation", "isolation", "neglecting","abandonment", "starvation", "malnutrition", "withholding care", "medical neglect", "emotional neglect","unsanitary conditions", "unsafe living conditions", "poverty", "homelessness", "drug exposure",
+        "alcohol exposure", "custody issues", "legal battles", "restraining order", "protection order","foster care", "adoption issues", "guardianship", "parental rights", "custodial interference",
+        "parental kidnapping", "runaway", "missing children", "child exploitation", "child labor","child trafficking", "sex trafficking", "child soldiers", "child marriage", "forced marriage",
+        "honor violence", "female genital mutilation", "dowry violence", "acid attacks", "bride burning","spousal abuse", "partner violence", "intimate partner violence", "marital rape", "economic abuse",
+        "financial abuse", "control", "power dynamics", "victimization", "victim blaming", "gaslighting","mental health impact", "post-traumatic stress disorder", "anxiety", "depression", "suicidal ideation",
+        "self-harm", "substance abuse", "alcoholism", "drug addiction", "escape", "survivor", "resilience","coping mechanisms", "therapy", "counseling", "support groups", "legal action", "law enforcement",
+        "social services", "child protective services", "domestic violence shelters", "safe houses","restraining orders", "legal aid", "court cases", "testimony", "witness", "perpetrator", "abuser","predator", "stalking", "cyberstalking", "online harassment", "blackmail", "extortion", "revenge porn",
+        "divorce", "separation", "child custody", "visitation rights", "parental alienation", "paternal rights","maternal rights", "family dynamics", "dysfunctional family", "broken home", "family secrets",
+        "silence", "denial", "shame", "guilt", "blame", "accusations", "false accusations", "judgment","societal attitudes", "cultural norms", "tradition", "honor", "disgrace", "scandal", "public opinion","media portrayal", "advocacy", "activism", "awareness campaigns", "policy changes", "legislation","protective laws", "child welfare", "human rights", "victim rights", "survivor stories",
+        "autobiographical accounts", "biographies", "case studies", "documentaries", "non-fiction","fictional representations", "literary analysis", "sociological studies", "psychological studies",
+        "research findings", "statistical data", "data analysis", "academic discourse", "scholarly articles","expert opinions", "testimonials", "personal narratives", "first-hand accounts", "survivor testimonies","healing journey", "recovery process", "rebuilding lives", "empowerment", "strength", "courage",
+        "overcoming adversity", "resilience", "hope", "inspiration", "transformation", "growth", "change","new beginnings", "moving forward", "forgiveness", "reconciliation", "peace", "harmony", "healing","closure", "resolution", "justice", "accountability", "consequences", "retribution", "penalties","punishment", "incarceration", "prison", "jail", "legal system", "criminal justice", "law enforcement",
+        "police", "detectives", "investigation", "evidence", "proof", "trial", "courtroom", "judge","jury", "verdict", "sentencing", "appeals", "legal battles", "rights", "civil liberties",
+        "constitutional rights", "legal representation", "attorneys", "lawyers", "prosecutors","defense attorneys", "legal aid", "pro bono", "advocates", "victim advocates", "counselors",
+        "therapists", "psychologists", "psychiatrists", "social workers", "case managers", "support staff","volunteers", "non-profit organizations", "government agencies", "community resources", "hotlines",
+        "emergency services", "crisis intervention", "prevention programs", "education", "outreach","public awareness", "campaigns", "fundraising", "donations", "grants", "sponsorships", "partnerships",
+        "coalitions", "networks", "conferences", "seminars", "workshops", "training", "certification","professional development", "best practices", "guidelines", "protocols", "standards", "ethics",
+        "morals", "values", "beliefs", "attitudes", "perspectives", "opinions", "views", "ideologies","philosophies", "doctrines", "theories", "hypotheses", "assumptions", "prejudices", "biases",
+        "stereotypes", "myths", "misconceptions", "misunderstandings", "ignorance", "lack of knowledge","unawareness", "insensitivity", "indifference", "apathy", "lack of empathy", "lack of compassion",
+        "lack of understanding", "lack of awareness", "lack of concern", "lack of interest", "lack of involvement","lack of engagement", "lack of commitment", "lack of support", "lack of resources", "lack of funding",
+        "lack of access", "barriers", "obstacles", "challenges", "difficulties", "hardships", "struggles","suffering", "pain", "anguish", "agony", "grief", "loss", "mourning", "bereavement", "trauma",
+        "traumatic experiences", "shock", "horror", "terror", "fear", "anxiety", "stress", "tension","pressure", "nervousness", "worry", "concern", "apprehension", "dread", "panic", "alarm",
+        "desperation", "hopelessness", "helplessness", "vulnerability", "exposure", "risk", "danger","threat", "hazard", "peril", "jeopardy", "insecurity", "uncertainty", "instability", "unpredictability",
+        "chaos", "disorder", "disruption", "upheaval", "turmoil", "conflict", "confrontation", "clash","struggle", "fight", "battle", "war", "hostilities", "violence", "aggression", "hostility","antagonism", "animosity", "hatred", "enmity", "rivalry", "competition", "contention", "dispute",
+        "argument", "debate", "discussion", "dialogue", "negotiation", "mediation", "arbitration","conciliation", "compromise", "settlement", "agreement", "consensus", "understanding", "reconciliation",
+        "resolution", "solution", "outcome", "result", "conclusion", "closure", "finality", "end","termination", "cessation", "conclusion", "completion", "fulfillment", "achievement", "accomplishment",
+        "success", "victory", "triumph", "conquest", "dominance", "control", "power", "influence","authority", "leadership", "command", "mastery", "expertise", "skill", "ability", "capability",
+        "competence", "proficiency", "knowledge", "understanding", "insight", "wisdom", "intelligence","intellect", "reason", "logic", "rationality", "objectivity", "clarity", "precision", "accuracy","reliability", "trustworthiness", "credibility", "authenticity","dominate", "control", "isolation", "aggressor", "batterer", "offender","assault", "bruise", "injury", "scar", "harm", "abuser", "perpetrator", "childhood trauma","custody", "violation", "power", "intimidation", "dependency", "escape", "survivor","restraint", "punishment", "silent", "witness", "rescue", "report", "intervention","counseling", "therapy", "recovery", "rescue", "guardian", "broken home", "toxic",
+        "unsafe","threaten", "menace", "torment", "dysfunctional", "parent", "guardian"],
+    "Homicide/Gun Violence": ["murder", "homicide", "gunshot", "shooting", "kill", "death", "assassination", "slaughter","massacre", "victim", "shooter", "gunman", "firearm", "bullet", "weapon", "fatal", "deadly","ambush", "sniper", "gang violence", "drive-by", "murderer", "assailant", "harm", "threat",
+        "armed", "pistol", "rifle", "semi-automatic", "assault rifle", "machine gun", "ammo", "ammunition","casualty", "crime scene", "forensic", "detective", "investigation", "vengeance", "revenge",
+        "bloodshed", "trigger", "motive", "premeditated", "malice", "aforethought", "victim", "fatal","injury", "intentional", "cold-blooded", "violent", "manslaughter", "execution",     "stray bullet", "fatal shooting", "armed robbery", "terrorist attack", "extremist violence","political assassination", "lynching", "school shooting", "public shooting", "workplace violence",
+        "domestic terrorism", "hate crime", "suicidal shooter", "armed conflict", "civil unrest", "riot","mob violence", "paramilitary action", "guerrilla warfare", "tactical operation", "counterterrorism",
+        "military assault", "shootout", "execution style", "hitman", "contract killing", "armed assault",
+        "war crime", "ethnic cleansing", "genocide", "rebel attack", "insurgency", "militia", "radicalization","extremism", "survivor", "witness", "trauma", "PTSD", "self-defense", "murder plot", "conspiracy",
+        "illegal arms", "gun trafficking", "arms dealer", "warlord", "death toll", "fatalities", "body count",
+        "bloodbath", "mass murderer", "serial killer", "spree killer", "psychopath", "sociopath", "criminal","felony", "misdemeanor", "law enforcement", "SWAT", "police shooting", "officer-involved shooting",
+        "justice", "inquest", "criminal trial", "jury", "verdict", "conviction", "acquittal", "plea bargain","self-incrimination", "testimony", "eyewitness", "forensic evidence", "ballistic", "autopsy", "coroner",
+        "crime lab", "DNA evidence", "fingerprint", "crime analyst", "profiling", "criminal psychology","hostage situation", "negotiation", "siege", "barricade", "emergency response", "first responder",
+        "crisis management", "public safety", "security breach", "lockdown", "emergency drill", "threat assessment","risk management", "surveillance", "counterintelligence", "intelligence gathering", "undercover operation",
+        "stakeout", "raid", "interrogation", "suspect", "informant", "witness protection", "safe house","criminal network", "organized crime", "drug cartel", "mafia", "syndicate", "gang war", "turf war",
+        "retaliation", "payback", "blood feud", "code of silence", "omerta", "vigilante", "justice seeker","retribution", "counterstrike", "rebellious", "uprising", "revolt", "anarchy", "chaos", "mayhem",
+        "destructive", "catastrophe", "disaster", "atrocity", "brutality", "savagery", "inhumanity","cruelty", "barbarism", "tyranny", "oppression", "persecution", "victimization", "abuse", "exploitation",
+        "torture", "mutilation", "disfigurement", "beheading", "execution", "slaughter", "genocide","mass murder", "annihilation", "extermination","crime rate","gang-related", "vendetta", "feud", "hostility", "aggression", "vengeance", "retaliation","bloodthirsty", "gun control", "legislation", "concealed carry", "standoff", "altercation"]
+}
+
+# Compile all keyword lists into one automaton once, when the module loads
+KEYWORD_MATCHER = compile_keywords(KEYWORD_WARNINGS)
+
+# Index the same keywords by character grams for the approximate (fuzzy) pass
+KEYWORD_FUZZY_INDEX = build_fuzzy_index(KEYWORD_MATCHER.keyword_masks)
+
+# Results are cached under this fingerprint, so editing the keyword lists invalidates them
+KEYWORD_FINGERPRINT = keyword_fingerprint(KEYWORD_WARNINGS)
+ANALYSIS_CACHE = AnalysisCache()
+
+# The result of a budgeted analysis
+#   warnings: the categories found so far, in the order of KEYWORD_WARNINGS
+#   confidence: category name -> share (0 to 1) of the category's checks behind its verdict;
+#       1.0 for found categories and categories whose keywords were all checked
+#   complete: True if every check ran, in which case warnings equals analyze_description's result
+#   comparisons: number of keywords scored by the fuzzy pass
+BudgetedAnalysis = namedtuple("BudgetedAnalysis", ["warnings", "confidence", "complete", "comparisons"])
+
+
+class KeywordHitRates:
+    """
+    Counts how often each keyword was the fuzzy match of a category, so the budgeted analysis can
+    check the keywords most likely to match first. Safe to share between threads.
+
+    Args:
+        counts (dict, optional): keyword -> number of hits to start from, e.g. the
+            keyword_hit_counts() of an incremental_rescore.EvidenceStore.
+    """
+
+    def __init__(self, counts=None):
+        self._counts = dict(counts or {})
+        self._order = None  # Every keyword of KEYWORD_MATCHER by descending count, until the counts change
+        self._lock = threading.Lock()
+
+    def count(self, keyword):
+        """
+        Returns the number of hits recorded for a keyword.
+        """
+
+        return self._counts.get(keyword, 0)
+
+    def record(self, keywords):
+        """
+        Adds one hit to each of the given keywords.
+        """
+
+        self.update(dict.fromkeys(keywords, 1))
+
+    def update(self, counts):
+        """
+        Adds hit counts (keyword -> number of hits).
+        """
+
+        if counts:
+            with self._lock:
+                for keyword, hits in counts.items():
+                    self._counts[keyword] = self._counts.get(keyword, 0) + hits
+                self._order = None
+
+    def ordered(self):
+        """
+        Returns every keyword of KEYWORD_MATCHER, the most frequent hits first (list order otherwise),
+        and the weight of each category: the sum of its keywords' hit counts plus one each. All three
+        parts come from the same snapshot of the counts.
+
+        Returns:
+            tuple: (list of keywords, list of category weights in the bit order of keyword_masks,
+            dict of the hit counts they were computed from).
+        """
+
+        order = self._order
+        if order is None:
+            with self._lock:
+                counts = dict(self._counts)
+                keywords = sorted(KEYWORD_MATCHER.keyword_masks, key=lambda k: -counts.get(k, 0))
+                weights = [0] * len(KEYWORD_MATCHER.categories)
+                for keyword, mask in KEYWORD_MATCHER.keyword_masks.items():
+                    for bit in range(len(weights)):
+                        if mask >> bit & 1:
+                            weights[bit] += counts.get(keyword, 0) + 1
+                order = self._order = (keywords, weights, counts)
+        return order
+
+
+HIT_RATES = KeywordHitRates()
+
+
+def configure_analysis_cache(max_entries=None, persistent_path=None):
+    """
+    Replaces the shared analysis cache.
+
+    Args:
+        max_entries (int, optional): Number of results kept in memory. Defaults to DEFAULT_MAX_ENTRIES.
+        persistent_path (str, optional): Path of a SQLite database used as a persistent tier.
+            Defaults to no persistent tier.
+    """
+
+    global ANALYSIS_CACHE
+    from response_cache import ResponseCache  # Only needed for the persistent tier
+
+    persistent = ResponseCache(persistent_path) if persistent_path else None
+    ANALYSIS_CACHE = AnalysisCache(max_entries or DEFAULT_MAX_ENTRIES, persistent)
+
+
+def normalize_description(description):
+    """
+    Normalizes a description for analysis: lowercased, with whitespace runs collapsed to one space.
+
+    Args:
+        description (str): The book description.
+
+    Returns:
+        str: The normalized description.
+    """
+
+    return ' '.join(description.lower().split())
+
+def analyze_description(description, threshold=80, use_cache=True, backend=None, scorer=None):
+    """
+    Analyzes a book description to identify potential content warnings based on predefined keywords.
+
+    This function checks each keyword in the KEYWORD_WARNINGS dictionary against the given book 
+    description. Exact keyword hits for all categories are found in one pass with KEYWORD_MATCHER;
+    categories without an exact hit fall back to an approximate match above the specified threshold.
+    The approximate matches are found with one batch rapidfuzz call over the keywords of those
+    categories when rapidfuzz is installed, and through KEYWORD_FUZZY_INDEX otherwise (with a
+    RuntimeWarning, as that is slower). Matching warnings are included in the result.
+
+    Results are memoized in ANALYSIS_CACHE, so a description that was already analyzed with the
+    same keyword lists and threshold is answered without running the matcher.
+
+    With instrumentation enabled, the exact and fuzzy passes are recorded as spans, with one span
+    per category checked by the fuzzy pass and a "fuzzy_comparisons" counter.
+
+    Args:
+        description (str): The book description to be analyzed.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+        use_cache (bool, optional): Read and store results in ANALYSIS_CACHE (default is True).
+        backend (str, optional): The fuzzy matching backend, "rapidfuzz" or "index" (default is
+            rapidfuzz when installed; see fuzzy_index.resolve_backend).
+        scorer (str or callable, optional): A rapidfuzz scorer to use instead of partial_ratio,
+            such as "token_set_ratio" (rapidfuzz backend only).
+
+    Returns:
+        list: A list of warning types that match keywords found in the description.
+
+    Raises:
+        ValueError: If the description is not provided or is not a string, or the backend cannot
+            use the scorer.
+        ImportError: If the rapidfuzz backend is asked for but rapidfuzz is not installed.
+    """
+
+    # Validate input description
+    if not isinstance(description, str):
+        raise ValueError("Description must be a string.")
+
+    description_lower = normalize_description(description)  # Normalize the description once for every check
+    backend = resolve_backend(backend, scorer)
+
+    with instrumentation.span("analyze_description", length=len(description_lower)) as current:
+        if use_cache:
+            key = analysis_key(description_lower, KEYWORD_FINGERPRINT, threshold, scorer_name(scorer))
+            cached = ANALYSIS_CACHE.get(key)
+            current.set("cached", cached is not None)
+            if cached is not None:
+                return cached  # Already analyzed with the same keyword lists and threshold
+
+        # Exact pass: a single scan of the description finds every category with a keyword in it
+        with instrumentation.span("analyze_description.exact"):
+            exact_matches = set(find_categories(KEYWORD_MATCHER, description_lower))
+
+        # Fuzzy pass: score the remaining categories' keywords in one batch, or through the gram index
+        pending = [name for name in KEYWORD_MATCHER.categories if name not in exact_matches]
+        stats = {} if instrumentation.enabled else None
+        with instrumentation.span("analyze_description.fuzzy", categories=len(pending), backend=backend):
+            if backend == "rapidfuzz":
+                fuzzy_matches = set(batch_fuzzy_categories(
+                    KEYWORD_MATCHER.keywords_by_category, description_lower, threshold, pending, scorer, stats))
+            else:
+                fuzzy_matches = set(find_fuzzy_categories(
+                    KEYWORD_FUZZY_INDEX, KEYWORD_MATCHER.keywords_by_category, description_lower, threshold, pending, stats))
+            if stats:
+                for category, category_stats in stats.items():
+                    instrumentation.record("analyze_description.fuzzy.category", category_stats["seconds"],
+                                           category=category, comparisons=category_stats["comparisons"])
+                instrumentation.count("fuzzy_comparisons", sum(s["comparisons"] for s in stats.values()))
+
+    # Keep the category order of KEYWORD_WARNINGS
+    warnings = [name for name in KEYWORD_MATCHER.categories if name in exact_matches or name in fuzzy_matches]
+
+    if use_cache:
+        ANALYSIS_CACHE.set(key, warnings)
+
+    return warnings  # Return the list of found warnings
+
+
+def analyze_description_budgeted(description, threshold=80, time_budget=None, max_comparisons=None,
+                                 hit_rates=None, backend=None):
+    """
+    Analyzes a book description like analyze_description, but stops the fuzzy pass once a time or
+    comparison budget is spent, so interactive lookups get an upper bound on their latency.
+
+    The exact pass always runs over every category. The fuzzy pass then checks the keywords of the
+    categories still undecided one at a time, the keywords with the most recorded hits first
+    (hit_rates), so the likely matches come before the budget runs out. A hit decides every
+    category listing the keyword. When the budget ends the checks early, the categories not found
+    yet get a confidence below 1: the share of their keywords' hit counts (plus one each) that was
+    already checked. The budget bounds the fuzzy pass; the exact pass and the preparation of the
+    text take time linear in the description's length.
+
+    The fuzzy hits are added to hit_rates. A complete result is stored in ANALYSIS_CACHE; a partial
+    one is never cached, so the next lookup of the description runs again.
+
+    Args:
+        description (str): The book description to be analyzed.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+        time_budget (float, optional): Seconds the analysis may take. Defaults to no limit.
+        max_comparisons (int, optional): Number of keywords the fuzzy pass may score. Defaults to no limit.
+        hit_rates (KeywordHitRates, optional): The keyword order to follow. Defaults to HIT_RATES.
+        backend (str, optional): The fuzzy matching backend, "rapidfuzz" or "index" (see
+            fuzzy_index.resolve_backend).
+
+    Returns:
+        BudgetedAnalysis: The warnings found, their confidence, and whether every check ran.
+
+    Raises:
+        ValueError: If the description is not provided or is not a string.
+        ImportError: If the rapidfuzz backend is asked for but rapidfuzz is not installed.
+    """
+
+    if not isinstance(description, str):
+        raise ValueError("Description must be a string.")
+
+    started = time.perf_counter()
+    deadline = None if time_budget is None else started + time_budget
+    hit_rates = HIT_RATES if hit_rates is None else hit_rates
+    description_lower = normalize_description(description)
+    backend = resolve_backend(backend)
+    categories = KEYWORD_MATCHER.categories
+    keyword_masks = KEYWORD_MATCHER.keyword_masks
+
+    key = analysis_key(description_lower, KEYWORD_FINGERPRINT, threshold)
+    cached = ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        return BudgetedAnalysis(cached, dict.fromkeys(categories, 1.0), True, 0)
+
+    with instrumentation.span("analyze_description_budgeted", length=len(description_lower)) as current:
+        with instrumentation.span("analyze_description.exact"):
+            found = set(find_categories(KEYWORD_MATCHER, description_lower))
+
+        # One bit per undecided category, in the bit order of keyword_masks
+        pending = sum(1 << i for i, name in enumerate(categories) if name not in found)
+        matches = TextMatcher(KEYWORD_FUZZY_INDEX, description_lower, threshold, backend)
+        order, weights, counts = hit_rates.ordered()
+        hits = []
+        position = len(order)
+        with instrumentation.span("analyze_description.fuzzy", backend=backend):
+            for i, keyword in enumerate(order):
+                mask = keyword_masks[keyword] & pending
+                if not mask:
+                    continue  # Every category listing it is decided already
+                if ((max_comparisons is not None and matches.comparisons >= max_comparisons)
+                        or (deadline is not None and time.perf_counter() >= deadline)):
+                    position = i
+                    break
+                if matches(keyword):
+                    hits.append(keyword)
+                    pending &= ~mask
+                    found.update(name for bit, name in enumerate(categories) if mask >> bit & 1)
+        complete = position == len(order)
+        current.set("complete", complete)
+        current.set("comparisons", matches.comparisons)
+
+    warnings = [name for name in categories if name in found]
+    confidence = dict.fromkeys(categories, 1.0)
+    if complete:
+        ANALYSIS_CACHE.set(key, warnings)
+    else:
+        # The weight of the keywords left unchecked, for each category still undecided
+        unchecked = [0] * len(categories)
+        for keyword in order[position:]:
+            mask = keyword_masks[keyword] & pending
+            while mask:
+                low = mask & -mask
+                unchecked[low.bit_length() - 1] += counts.get(keyword, 0) + 1  # Same snapshot as weights
+                mask ^= low
+        for bit, name in enumerate(categories):
+            if pending >> bit & 1:
+                confidence[name] = min(1.0, max(0.0, 1.0 - unchecked[bit] / weights[bit]))
+    hit_rates.record(hits)
+    return BudgetedAnalysis(warnings, confidence, complete, matches.comparisons)
@@ -0,0 +1,144 @@
+"""
+Module: Cover Images
+
+This module turns cover image URLs into display-ready thumbnails. Decoded thumbnails are kept in a
+small in-memory LRU, so showing the same cover again is instant, and the resized thumbnail bytes
+are stored in the response cache under the "cover_thumbnail" kind, so later runs neither download
+nor decode the full-size image again. The original image bytes are not cached.
+
+JPEG covers are decoded with Image.draft, which lets the decoder scale the image down while
+decoding (by 1/2, 1/4 or 1/8) instead of decoding every full-resolution pixel first.
+
+Everything here runs on worker threads; only the conversion to a Tk PhotoImage belongs on the Tk
+thread (see main.display_cover_image). Pillow is imported lazily, as only the GUI needs it.
+
+Attributes:
+    COVER_SIZE (tuple): Maximum (width, height) of a cover thumbnail.
+    MEMORY_ENTRIES (int): Number of decoded thumbnails kept in memory.
+"""
+
+import io  # For byte stream operations
+import threading  # For sharing the in-memory thumbnails between workers
+from collections import OrderedDict  # For the in-memory LRU
+
+from book_api import get_book_image_data  # For downloading covers
+from response_cache import get_response_cache  # For the persistent thumbnail tier
+
+COVER_SIZE = (100, 150)
+MEMORY_ENTRIES = 64
+
+_thumbnails = OrderedDict()  # (url, size) -> decoded thumbnail, least recently used first
+_lock = threading.Lock()
+
+
+def _cache_key(url, size):
+    """
+    Builds the response cache key of a thumbnail.
+    """
+
+    return f"{size[0]}x{size[1]} {url}"
+
+
+def decode_thumbnail(data, size=COVER_SIZE):
+    """
+    Decodes image data into a thumbnail no larger than size, keeping the aspect ratio.
+
+    Args:
+        data (bytes): The encoded image.
+        size (tuple, optional): Maximum (width, height). Defaults to COVER_SIZE.
+
+    Returns:
+        PIL.Image.Image: The decoded thumbnail.
+    """
+
+    from PIL import Image  # For decoding images
+
+    image = Image.open(io.BytesIO(data))
+    if image.format == "JPEG":
+        image.draft("RGB", size)  # Decode at the smallest scale that is still at least size
+    image.thumbnail(size, Image.Resampling.LANCZOS)  # Decodes the image and resizes it
+    return image
+
+
+def encode_thumbnail(image):
+    """
+    Encodes a thumbnail for the persistent cache (PNG, so it is not recompressed with losses).
+    Modes PNG cannot store, such as the CMYK of many JPEG covers, are converted to RGB first.
+    """
+
+    if image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGB")
+    output = io.BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+def cached_cover_thumbnail(url, size=COVER_SIZE):
+    """
+    Returns the thumbnail of a cover if it is decoded in memory, without any I/O. Safe to call on
+    the Tk thread.
+
+    Returns:
+        PIL.Image.Image: The thumbnail, or None if it is not in memory.
+    """
+
+    with _lock:
+        image = _thumbnails.get((url, size))
+        if image is not None:
+            _thumbnails.move_to_end((url, size))
+        return image
+
+
+def _remember(url, size, image):
+    """
+    Keeps a decoded thumbnail in memory, evicting the least recently used ones.
+    """
+
+    with _lock:
+        _thumbnails[(url, size)] = image
+        _thumbnails.move_to_end((url, size))
+        while len(_thumbnails) > MEMORY_ENTRIES:
+            _thumbnails.popitem(last=False)
+
+
+def load_cover_thumbnail(url, size=COVER_SIZE):
+    """
+    Returns the thumbnail of a cover: from memory, else from the persistent cache, else by
+    downloading and decoding the image (and caching the thumbnail). Runs on a worker thread.
+
+    Args:
+        url (str): The URL of the cover image.
+        size (tuple, optional): Maximum (width, height). Defaults to COVER_SIZE.
+
+    Returns:
+        PIL.Image.Image: The decoded thumbnail.
+
+    Raises:
+        BookAPIError: If the download fails.
+        OSError: If the image cannot be decoded.
+    """
+
+    image = cached_cover_thumbnail(url, size)
+    if image is not None:
+        return image
+
+    cache = get_response_cache()
+    data = cache.get("cover_thumbnail", _cache_key(url, size)) if cache is not None else None
+    if data is not None:
+        image = decode_thumbnail(data, size)  # Already small: a cheap decode
+    else:
+        image = decode_thumbnail(get_book_image_data(url, use_cache=False), size)
+        if cache is not None:
+            cache.set("cover_thumbnail", _cache_key(url, size), encode_thumbnail(image))
+
+    _remember(url, size, image)
+    return image
+
+
+def clear_memory_cache():
+    """
+    Forgets the decoded thumbnails kept in memory (the persistent tier is kept).
+    """
+
+    with _lock:
+        _thumbnails.clear()
@@ -0,0 +1,491 @@
+"""
+Module: Fuzzy Keyword Index
+
+This module finds keywords that approximately occur in a description without running a sliding
+edit-distance comparison for every keyword. Keywords are indexed by their character q-grams once;
+each description is indexed once, and only keywords sharing enough q-grams with it are verified.
+
+A keyword matches when some window of the description with the keyword's length has a similarity
+above the threshold, where similarity is 100 * 2 * LCS / (len(keyword) + len(window)) rounded to
+an integer. This is the indel-based ratio fuzz.partial_ratio computes over its candidate windows.
+Truncated windows at the very start or end of the description are not considered.
+
+The index is pure Python. When rapidfuzz is installed, batch_fuzzy_categories scores a description
+against every keyword of the pending categories in one C-backed call instead (about twice as fast
+for descriptions up to a few thousand words), with fuzz.partial_ratio by default or any other
+rapidfuzz-style scorer. resolve_backend picks between the two.
+
+Attributes:
+    FuzzyIndex (namedtuple): The q-gram index over a set of keywords.
+    BACKENDS (tuple): Names of the fuzzy matching backends.
+    DEFAULT_BACKEND (str): "rapidfuzz" when it is installed, "index" otherwise.
+"""
+
+import time  # For the optional per-category timings
+import warnings  # For reporting the slow fallback
+from difflib import SequenceMatcher  # For scoring short texts exactly as fuzz.partial_ratio did
+from collections import namedtuple  # For the index representation
+from functools import lru_cache  # For caching per-length mismatch limits
+
+try:
+    from rapidfuzz import fuzz as _rapidfuzz_fuzz, process as _rapidfuzz_process  # Optional, much faster
+except ImportError:
+    _rapidfuzz_fuzz = _rapidfuzz_process = None
+
+BACKENDS = ("rapidfuzz", "index")
+DEFAULT_BACKEND = "rapidfuzz" if _rapidfuzz_process is not None else "index"
+_PADDING = "\x00"  # Never part of a keyword (see batch_fuzzy_categories)
+_warned_fallback = False
+
+# Index over a set of keywords
+#   q: length of the indexed character grams
+#   keyword_grams: keyword -> tuple of (offset, gram) pairs for every gram in the keyword
+#   distinct_grams: keyword -> number of distinct grams in the keyword
+#   gram_index: gram -> list of keywords containing that gram
+#   char_masks: keyword -> dict of character -> bitmask of its positions (for bit-parallel LCS)
+FuzzyIndex = namedtuple("FuzzyIndex", ["q", "keyword_grams", "distinct_grams", "gram_index", "char_masks"])
+
+
+def build_fuzzy_index(keywords, q=2):
+    """
+    Builds a q-gram index over the given keywords.
+
+    Args:
+        keywords (iterable): Normalized (lowercased) keywords to index.
+        q (int, optional): Length of the character grams. Defaults to 2.
+
+    Returns:
+        FuzzyIndex: The index, ready to be used with find_fuzzy_categories.
+    """
+
+    keyword_grams = {}
+    distinct_grams = {}
+    gram_index = {}
+    char_masks = {}
+
+    for keyword in keywords:
+        if keyword in keyword_grams:
+            continue  # Each keyword is indexed only once
+        grams = tuple((offset, keyword[offset:offset + q]) for offset in range(len(keyword) - q + 1))
+        keyword_grams[keyword] = grams
+        unique_grams = set(gram for _, gram in grams)
+        distinct_grams[keyword] = len(unique_grams)
+        for gram in unique_grams:
+            gram_index.setdefault(gram, []).append(keyword)
+
+        masks = {}
+        for position, char in enumerate(keyword):
+            masks[char] = masks.get(char, 0) | (1 << position)
+        char_masks[keyword] = masks
+
+    return FuzzyIndex(q, keyword_grams, distinct_grams, gram_index, char_masks)
+
+
+def index_text(text, q=2):
+    """
+    Indexes every q-gram of a text by its start positions. This is done once per description.
+
+    Args:
+        text (str): The (lowercased) text to index.
+        q (int, optional): Length of the character grams. Defaults to 2.
+
+    Returns:
+        dict: Mapping of gram -> list of start positions in the text.
+    """
+
+    positions = {}
+    for start in range(len(text) - q + 1):
+        positions.setdefault(text[start:start + q], []).append(start)
+    return positions
+
+
+def lcs_length(char_masks, length, text):
+    """
+    Computes the length of the longest common subsequence between a keyword and a text.
+
+    Uses the bit-parallel algorithm of Hyyrö, processing one text character per step.
+
+    Args:
+        char_masks (dict): The keyword's character position bitmasks (see build_fuzzy_index).
+        length (int): The keyword length.
+        text (str): The text (usually a window of the description) to compare against.
+
+    Returns:
+        int: The LCS length.
+    """
+
+    all_ones = (1 << length) - 1
+    row = all_ones
+    for char in text:
+        matches = row & char_masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & all_ones
+    return length - bin(row).count("1")
+
+
+def similarity(lcs, keyword_length, window_length):
+    """
+    Converts an LCS length into the 0-100 similarity score used for the fuzzy threshold.
+    """
+
+    total = keyword_length + window_length
+    return int(round(100.0 * 2 * lcs / total)) if total else 0
+
+
+@lru_cache(maxsize=None)
+def max_mismatches(keyword_length, threshold):
+    """
+    Returns how many keyword characters may be missing from a window while still scoring above threshold.
+
+    Args:
+        keyword_length (int): Length of the keyword.
+        threshold (int): The similarity score the match must exceed.
+
+    Returns:
+        int: The largest number of unmatched characters allowed, or -1 if even an exact match fails.
+    """
+
+    for mismatches in range(keyword_length + 1):
+        if similarity(keyword_length - mismatches, keyword_length, keyword_length) <= threshold:
+            return mismatches - 1
+    return keyword_length
+
+
+def required_grams(gram_count, mismatches, q):
+    """
+    Returns how many of a keyword's grams must survive in a window that scores above the threshold.
+
+    Each missing keyword character and each extra window character breaks at most q (resp. q - 1)
+    grams, so a close enough window keeps at least this many. A result <= 0 means grams cannot
+    rule any window out.
+    """
+
+    return gram_count - mismatches * (2 * q - 1)
+
+
+def _diagonal_votes(index, keyword, text_positions):
+    """
+    Counts, for each alignment (text start minus keyword offset), how many keyword grams agree with it.
+    """
+
+    votes = {}
+    for offset, gram in index.keyword_grams[keyword]:
+        for position in text_positions.get(gram, ()):
+            diagonal = position - offset
+            votes[diagonal] = votes.get(diagonal, 0) + 1
+    return votes
+
+
+def _window_bound(needle, haystack):
+    """
+    Returns the best LCS score of the needle against the windows starting in the haystack (cut
+    short at its end). It is never below the score of short_text_score.
+    """
+
+    if _rapidfuzz_fuzz is not None:
+        # Padding the start rules out rapidfuzz's windows hanging over the start of the haystack
+        return _rapidfuzz_fuzz.partial_ratio(needle, _PADDING * len(needle) + haystack)
+    masks = {}
+    for position, char in enumerate(needle):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    size = len(needle)
+    return max(similarity(lcs_length(masks, size, haystack[start:start + size]), size,
+                          len(haystack[start:start + size])) for start in range(len(haystack)))
+
+
+def short_text_score(keyword, text, threshold):
+    """
+    Scores a text no longer than a keyword exactly as the original fuzz.partial_ratio(keyword, text)
+    (fuzzywuzzy) did: the shorter string (the text, or the keyword when both have the same length)
+    is compared with the window of the longer one aligned on each of their difflib matching
+    blocks. Windows start inside the longer string and are cut short at its end.
+
+    The LCS score of every window (_window_bound) bounds this score from above, so difflib only
+    runs for the keywords that may pass the threshold.
+
+    Args:
+        keyword (str): The keyword.
+        text (str): The lowercased text, at most as long as the keyword.
+        threshold (int): The similarity score the match must exceed.
+
+    Returns:
+        int: The score, or 0 if it does not exceed the threshold.
+    """
+
+    if not text:
+        return 0
+    if text == keyword:
+        return 100 if threshold < 100 else 0
+    needle, haystack = (text, keyword) if len(text) < len(keyword) else (keyword, text)
+    if int(round(_window_bound(needle, haystack))) <= threshold:
+        return 0
+
+    best = 0.0
+    for block in SequenceMatcher(None, needle, haystack).get_matching_blocks():
+        start = max(block[1] - block[0], 0)
+        ratio = SequenceMatcher(None, needle, haystack[start:start + len(needle)]).ratio()
+        if ratio > .995:
+            best = 1.0
+            break
+        best = max(best, ratio)
+    score = 100 if best == 1.0 else int(round(100 * best))
+    return score if score > threshold else 0
+
+
+def keyword_score(index, keyword, text, text_positions, threshold):
+    """
+    Finds whether a keyword approximately occurs in the text above the given threshold.
+
+    Args:
+        index (FuzzyIndex): The keyword index.
+        keyword (str): The (indexed) keyword to look for.
+        text (str): The lowercased text.
+        text_positions (dict): The text's gram positions from index_text.
+        threshold (int): The similarity score the match must exceed.
+
+    Returns:
+        int: The best similarity score found, or 0 if no window can exceed the threshold.
+    """
+
+    length = len(keyword)
+    mismatches = max_mismatches(length, threshold)
+    if mismatches < 0 or not length:
+        return 0
+
+    if len(text) <= length:
+        return short_text_score(keyword, text, threshold)  # The text slides over the keyword instead
+
+    required = required_grams(len(index.keyword_grams[keyword]), mismatches, index.q)
+
+    last_start = len(text) - length
+    if required <= 0:
+        starts = range(last_start + 1)  # Grams cannot rule anything out, check every window
+    else:
+        votes = _diagonal_votes(index, keyword, text_positions)
+        diagonals = sorted(votes)
+        starts = set()
+        low = 0
+        support = 0
+        # Slide over the alignments: a window start s can only be supported by alignments in [s - m, s + m]
+        for diagonal in diagonals:
+            support += votes[diagonal]
+            while diagonal - diagonals[low] > 2 * mismatches:
+                support -= votes[diagonals[low]]
+                low += 1
+            if support >= required:
+                starts.update(range(max(diagonal - mismatches, 0), min(diagonal + mismatches, last_start) + 1))
+
+    best = 0
+    masks = index.char_masks[keyword]
+    for start in starts:
+        score = similarity(lcs_length(masks, length, text[start:start + length]), length, length)
+        if score > best:
+            best = score
+            if best == 100:
+                break
+    return best if best > threshold else 0
+
+
+class TextMatcher:
+    """
+    Tells, one keyword at a time, whether keywords approximately occur in one text, so a caller can
+    stop between keywords (see content_analysis.analyze_description_budgeted). The verdicts are
+    those of find_fuzzy_categories and batch_fuzzy_categories.
+
+    Args:
+        index (FuzzyIndex): The keyword index (only indexed keywords can be checked).
+        text (str): The lowercased text to search.
+        threshold (int, optional): The similarity score a match must exceed. Defaults to 80.
+        backend (str, optional): "index" (gram filter and bit-parallel LCS) or "rapidfuzz"
+            (partial_ratio on the padded text, as batch_fuzzy_categories does). Defaults to "index".
+
+    Attributes:
+        comparisons (int): Number of keywords actually scored (not ruled out by the gram filter).
+    """
+
+    def __init__(self, index, text, threshold=80, backend="index"):
+        self.index = index
+        self.text = text
+        self.threshold = threshold
+        self.backend = backend
+        self.comparisons = 0
+        if backend == "rapidfuzz":
+            self._padded = _PADDING * max(map(len, index.keyword_grams), default=0)
+            self._padded = self._padded + text + self._padded
+            return
+
+        self._positions = index_text(text, index.q)
+        # Count the distinct grams each keyword shares with the text through the inverted index
+        self._shared = {}
+        for gram in self._positions:
+            for keyword in index.gram_index.get(gram, ()):
+                self._shared[keyword] = self._shared.get(keyword, 0) + 1
+
+    def __call__(self, keyword):
+        threshold = self.threshold
+        if self.backend == "rapidfuzz":
+            self.comparisons += 1
+            if len(keyword) >= len(self.text):
+                return bool(short_text_score(keyword, self.text, threshold))
+            score = _rapidfuzz_fuzz.partial_ratio(self._padded, keyword, score_cutoff=threshold + 0.5)
+            return int(round(score)) > threshold
+
+        mismatches = max_mismatches(len(keyword), threshold)
+        required = required_grams(self.index.distinct_grams[keyword], mismatches, self.index.q)
+        # A text no longer than the keyword slides over it (short_text_score), which the grams cannot rule out
+        if len(self.text) > len(keyword) and self._shared.get(keyword, 0) < required:
+            return False  # Too few grams in common, the keyword cannot be close enough
+        self.comparisons += 1
+        return bool(keyword_score(self.index, keyword, self.text, self._positions, threshold))
+
+
+def find_fuzzy_categories(index, keywords_by_category, text, threshold=80, categories=None, stats=None):
+    """
+    Finds the categories with at least one keyword approximately present in the text.
+
+    The text is indexed once; for each category the keywords are checked in order and the
+    category is accepted on its first hit. Each keyword is scored at most once per text, so a
+    keyword listed under several categories costs a single comparison, and a category holding a
+    keyword that already matched for another category is accepted without scoring anything.
+
+    Args:
+        index (FuzzyIndex): The keyword index.
+        keywords_by_category (dict): Mapping of category name to its normalized keywords.
+        text (str): The lowercased text to search.
+        threshold (int, optional): The similarity score a match must exceed. Defaults to 80.
+        categories (iterable, optional): Only check these categories. Defaults to all of them.
+        stats (dict, optional): Receives, for each checked category, {"seconds": time spent,
+            "comparisons": number of keywords scored against the text}.
+
+    Returns:
+        list: The matching category names, in the order they were checked.
+    """
+
+    matches = TextMatcher(index, text, threshold)
+    found = []
+    scored = {}  # keyword -> whether it matched, shared by every category listing it
+    hits = set()
+    for category in (keywords_by_category if categories is None else categories):
+        started = time.perf_counter() if stats is not None else 0.0
+        compared_before = matches.comparisons
+        keywords = keywords_by_category[category]
+        if not hits.isdisjoint(keywords):
+            found.append(category)  # A keyword of this category already matched for another one
+        else:
+            for keyword in keywords:
+                if keyword in scored:
+                    continue  # Already scored for an earlier category, and it did not match
+                matched = scored[keyword] = matches(keyword)
+                if matched:
+                    hits.add(keyword)
+                    found.append(category)
+                    break  # Stop checking more keywords in the same category
+        if stats is not None:
+            stats[category] = {"seconds": time.perf_counter() - started,
+                               "comparisons": matches.comparisons - compared_before}
+    return found
+
+
+def resolve_backend(backend=None, scorer=None):
+    """
+    Picks the backend that runs the fuzzy pass.
+
+    Without an explicit backend, rapidfuzz is used when it is installed; otherwise the pure-Python
+    index is used and a RuntimeWarning is issued (once), since every analysis is then slower.
+
+    Args:
+        backend (str, optional): "rapidfuzz", "index", or None for DEFAULT_BACKEND.
+        scorer (str or callable, optional): A custom scorer (see batch_fuzzy_categories). Only
+            the rapidfuzz backend supports one.
+
+    Returns:
+        str: The backend name.
+
+    Raises:
+        ValueError: If the backend is unknown, or a custom scorer is asked of the index backend.
+        ImportError: If the rapidfuzz backend is asked for but rapidfuzz is not installed.
+    """
+
+    global _warned_fallback
+    if backend is None:
+        backend = DEFAULT_BACKEND if scorer is None else "rapidfuzz"
+        if backend == "index" and not _warned_fallback:
+            _warned_fallback = True
+            warnings.warn("rapidfuzz is not installed: fuzzy matching falls back to the pure-Python "
+                          "index, which is slower (pip install rapidfuzz)", RuntimeWarning, stacklevel=3)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown fuzzy matching backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend == "rapidfuzz" and _rapidfuzz_process is None:
+        raise ImportError("The rapidfuzz fuzzy matching backend needs rapidfuzz (pip install rapidfuzz)")
+    if backend == "index" and scorer is not None:
+        raise ValueError("The index backend only implements partial_ratio; use the rapidfuzz backend for other scorers")
+    return backend
+
+
+def scorer_name(scorer):
+    """
+    Names a scorer for cache keys: None (the default partial_ratio) stays None.
+    """
+
+    if scorer is None or isinstance(scorer, str):
+        return scorer
+    return f"{getattr(scorer, '__module__', '')}.{getattr(scorer, '__qualname__', repr(scorer))}"
+
+
+def batch_fuzzy_categories(keywords_by_category, text, threshold=80, categories=None, scorer=None, stats=None):
+    """
+    Finds the categories with at least one keyword approximately present in the text, scoring the
+    text against every keyword of the checked categories in a single rapidfuzz call.
+
+    Scores are rounded to integers and must exceed the threshold, as with find_fuzzy_categories.
+    With the default scorer (fuzz.partial_ratio) the results are exactly those of find_fuzzy_categories.
+
+    Args:
+        keywords_by_category (dict): Mapping of category name to its normalized keywords.
+        text (str): The lowercased text to search.
+        threshold (int, optional): The similarity score a match must exceed. Defaults to 80.
+        categories (iterable, optional): Only check these categories. Defaults to all of them.
+        scorer (str or callable, optional): The name of a rapidfuzz.fuzz scorer (such as
+            "token_set_ratio") or a callable scorer(text, keyword, score_cutoff=None) returning
+            0-100. Defaults to fuzz.partial_ratio.
+        stats (dict, optional): Receives, for each checked category, {"seconds": its share of the
+            batch time (in proportion to the keywords it added), "comparisons": number of keywords
+            it added to the batch}.
+
+    Returns:
+        list: The matching category names, in the order they were checked.
+    """
+
+    categories = list(keywords_by_category if categories is None else categories)
+    keywords = {}  # keyword -> first category listing it, in check order
+    for category in categories:
+        for keyword in keywords_by_category[category]:
+            keywords.setdefault(keyword, category)
+
+    # score_cutoff lets rapidfuzz skip keywords early; rounding is checked afterwards
+    cutoff = threshold + 0.5
+    started = time.perf_counter()
+    if scorer is None:
+        # Padding the text with a character no keyword contains turns partial_ratio's truncated edge
+        # windows into full-length windows that never score above the real ones. Keywords at least
+        # as long as the text are scored one by one with short_text_score
+        shorter = [keyword for keyword in keywords if len(keyword) < len(text)]
+        padding = _PADDING * max(map(len, shorter), default=0)
+        scores = _rapidfuzz_process.extract(padding + text + padding, shorter, scorer=_rapidfuzz_fuzz.partial_ratio,
+                                            score_cutoff=cutoff, limit=None)
+        scores += [(keyword, 100, None) for keyword in keywords
+                   if len(keyword) >= len(text) and short_text_score(keyword, text, threshold)]
+    else:
+        if isinstance(scorer, str):
+            scorer = getattr(_rapidfuzz_fuzz, scorer)
+        scores = _rapidfuzz_process.extract(text, list(keywords), scorer=scorer, score_cutoff=cutoff, limit=None)
+    hits = {keyword for keyword, score, _ in scores if int(round(score)) > threshold}
+    elapsed = time.perf_counter() - started
+
+    if stats is not None:
+        added = {}
+        for category in keywords.values():
+            added[category] = added.get(category, 0) + 1
+        for category in categories:
+            share = added.get(category, 0)
+            stats[category] = {"seconds": elapsed * share / max(len(keywords), 1), "comparisons": share}
+    return [category for category in categories if not hits.isdisjoint(keywords_by_category[category])]
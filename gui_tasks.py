@@ -0,0 +1,130 @@
+"""
+Module: GUI Background Tasks
+
+This module runs slow work (API calls, description analysis, image decoding) on background threads
+for the Tk front end and hands the results back to the Tk thread, which is the only thread allowed
+to touch widgets. Workers put their results on a thread-safe queue; the Tk thread drains it from a
+root.after polling loop, so the event loop never blocks.
+
+Tasks are submitted on named channels ("search", "details", ...). Cancelling a channel bumps its
+generation: results of tasks from an older generation are discarded when they arrive, so a slow
+answer to an old search can never overwrite a newer one.
+
+Attributes:
+    POLL_INTERVAL_MS (int): How often the Tk thread checks for finished tasks (about 60 times a second).
+"""
+
+import logging  # For reporting callbacks that fail
+import queue  # For handing results from worker threads to the Tk thread
+from concurrent.futures import ThreadPoolExecutor  # For the background worker threads
+
+POLL_INTERVAL_MS = 16  # ~60 checks per second keeps the UI responsive without busy waiting
+MAX_CALLBACKS_PER_POLL = 20  # Bound the work done per tick so the UI keeps redrawing
+
+logger = logging.getLogger(__name__)
+
+
+class TkTaskRunner:
+    """
+    Runs functions on background threads and delivers their results on the Tk thread.
+
+    Args:
+        root (tk.Tk): The Tk root window (used for its after() scheduling).
+        max_workers (int, optional): Number of background threads. Defaults to 4.
+        poll_interval (int, optional): Milliseconds between result checks. Defaults to POLL_INTERVAL_MS.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gui-task")
+        self._results = queue.Queue()  # (channel, generation, callback, value) from the workers
+        self._generations = {}  # channel -> current generation
+        self._pending = {}  # channel -> number of tasks still running in the current generation
+        self._futures = {}  # channel -> futures of the current generation
+        self.root.after(self.poll_interval, self._poll)
+
+    def submit(self, channel, func, *args, on_done=None, on_error=None):
+        """
+        Runs func(*args) on a background thread.
+
+        Args:
+            channel (str): The channel of the task (its results are dropped if the channel is cancelled).
+            func (callable): The function to run. It must not touch any widget.
+            *args: Arguments for func.
+            on_done (callable, optional): Called on the Tk thread with func's return value.
+            on_error (callable, optional): Called on the Tk thread with the exception func raised.
+
+        Returns:
+            concurrent.futures.Future: The future of the task.
+        """
+
+        generation = self._generations.get(channel, 0)
+
+        def run():
+            try:
+                value = func(*args)
+            except Exception as e:
+                self._results.put((channel, generation, on_error, e))
+            else:
+                self._results.put((channel, generation, on_done, value))
+
+        self._pending[channel] = self._pending.get(channel, 0) + 1
+        future = self._executor.submit(run)
+        self._futures.setdefault(channel, []).append(future)
+        return future
+
+    def cancel(self, *channels):
+        """
+        Cancels the given channels: tasks not started yet are dropped, and results of running
+        tasks are discarded when they arrive.
+
+        Args:
+            *channels (str): The channels to cancel. With no argument, every channel is cancelled.
+        """
+
+        for channel in channels or list(self._generations.keys() | self._pending.keys()):
+            self._generations[channel] = self._generations.get(channel, 0) + 1
+            self._pending[channel] = 0
+            for future in self._futures.pop(channel, []):
+                future.cancel()  # Only has an effect on tasks that have not started
+
+    def is_busy(self, *channels):
+        """
+        Tells whether any task of the given channels (or of any channel) is still running.
+        """
+
+        return any(self._pending.get(channel, 0) for channel in (channels or self._pending))
+
+    def _poll(self):
+        """
+        Delivers finished results on the Tk thread, then schedules the next check. A callback
+        that raises is logged and does not stop the delivery of the other results.
+        """
+
+        try:
+            for _ in range(MAX_CALLBACKS_PER_POLL):
+                try:
+                    channel, generation, callback, value = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if generation != self._generations.get(channel, 0):
+                    continue  # Stale result from a cancelled generation
+                self._pending[channel] = max(self._pending.get(channel, 0) - 1, 0)
+                if not self._pending[channel]:
+                    self._futures.pop(channel, None)
+                if callback is not None:
+                    try:
+                        callback(value)
+                    except Exception:
+                        logger.exception("Result callback of channel %r failed", channel)
+        finally:
+            self.root.after(self.poll_interval, self._poll)  # Keep polling whatever happened
+
+    def shutdown(self):
+        """
+        Stops accepting tasks and drops the ones that have not started.
+        """
+
+        self.cancel()
+        self._executor.shutdown(wait=False)
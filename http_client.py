@@ -0,0 +1,178 @@
+"""
+Module: HTTP Client
+
+This module provides the shared HTTP session used for every outbound API call. Reusing one session
+keeps connections to googleapis.com and openlibrary.org alive between requests (one connection pool
+per host), so repeated calls skip the TCP and TLS handshakes. Every request gets a connect/read
+timeout, and requests answered with a 5xx status are retried with exponential backoff
+(honouring Retry-After).
+
+Requests to the provider hosts are paced by rate_limiter: they wait in line for their turn, and a
+request answered with 429 slows its host down (honouring Retry-After) and goes back in line,
+instead of being retried on a fixed schedule.
+
+Attributes:
+    DEFAULT_TIMEOUT (tuple): Default (connect, read) timeout in seconds.
+    DEFAULT_POOL_SIZE (int): Default number of pooled connections kept per host.
+    DEFAULT_RETRIES (int): Default number of retries for failed requests.
+    DEFAULT_BACKOFF (float): Default backoff factor between retries, in seconds.
+    RETRY_STATUSES (tuple): HTTP statuses that are retried.
+    THROTTLE_RETRIES (int): Number of times a request answered with 429 is sent again.
+"""
+
+import threading  # For creating the shared session safely from several threads
+import time  # For backing off unlimited hosts
+from email.utils import parsedate_to_datetime  # For Retry-After dates
+from urllib.parse import urlsplit  # For finding the host of a request
+
+import requests  # For making HTTP requests
+from requests.adapters import HTTPAdapter  # For connection pooling
+from urllib3.util.retry import Retry  # For retries with backoff
+
+from rate_limiter import DEFAULT_MAX_WAIT, get_limiter  # For pacing the provider hosts
+
+DEFAULT_TIMEOUT = (3.05, 10)  # Seconds to connect, seconds to wait for data
+DEFAULT_POOL_SIZE = 10  # Keep-alive connections per host
+DEFAULT_RETRIES = 3  # Retries after the first attempt
+DEFAULT_BACKOFF = 0.5  # Waits 0.5s, 1s, 2s, ... between retries
+RETRY_STATUSES = (500, 502, 503, 504)  # Server errors (429 goes back through the rate limiter)
+THROTTLE_RETRIES = 5
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Creates a requests session with pooled keep-alive connections and retries.
+
+    Args:
+        pool_size (int, optional): Number of connections kept alive per host. Defaults to DEFAULT_POOL_SIZE.
+        retries (int, optional): Number of retries for failed requests. Defaults to DEFAULT_RETRIES.
+        backoff (float, optional): Backoff factor between retries, in seconds. Defaults to DEFAULT_BACKOFF.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),  # Only retry idempotent requests
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Return the last response so callers see the real status
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Replaces the shared session with one using the given pool size and retry settings.
+
+    Args:
+        pool_size (int, optional): Number of connections kept alive per host. Defaults to DEFAULT_POOL_SIZE.
+        retries (int, optional): Number of retries for failed requests. Defaults to DEFAULT_RETRIES.
+        backoff (float, optional): Backoff factor between retries, in seconds. Defaults to DEFAULT_BACKOFF.
+    """
+
+    global _session
+    with _session_lock:
+        old_session = _session
+        _session = create_session(pool_size, retries, backoff)
+    if old_session is not None:
+        old_session.close()  # Release the pooled connections of the previous session
+
+
+def get_session():
+    """
+    Returns the shared session, creating it with the default settings on first use.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def retry_after_seconds(response):
+    """
+    Returns the seconds a response's Retry-After header asks to wait (None without a valid header).
+    """
+
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def http_get(url, params=None, timeout=None, max_wait=DEFAULT_MAX_WAIT, **kwargs):
+    """
+    Sends a GET request through the shared session, waiting for its turn if the host is rate limited.
+
+    A request answered with 429 is sent again (up to THROTTLE_RETRIES times) once the host may be
+    asked again: after Retry-After, and at the rate the limiter lowered.
+
+    A timeout given as a number is the deadline of the whole call: waiting in line, the throttle
+    retries and the requests themselves all fit in it, so the call ends when its caller gives up
+    (the last 429 response is returned if the deadline is reached). Without it (or with a tuple),
+    the waits of the call add up to at most max_wait seconds.
+
+    Args:
+        url (str): The URL to request.
+        params (dict, optional): Query string parameters.
+        timeout (float or tuple, optional): Timeout in seconds, or a (connect, read) tuple.
+            Defaults to DEFAULT_TIMEOUT.
+        max_wait (float, optional): Seconds to wait for a turn at most. Defaults to rate_limiter.DEFAULT_MAX_WAIT.
+        **kwargs: Any other argument accepted by requests.Session.get.
+
+    Returns:
+        requests.Response: The response (after any retries).
+
+    Raises:
+        requests.RequestException: If the request fails (rate_limiter.RateLimitTimeout if it
+            waited too long for its turn).
+    """
+
+    limiter = get_limiter(urlsplit(url).hostname)
+    session = get_session()
+    overall = isinstance(timeout, (int, float))
+    deadline = time.monotonic() + (min(timeout, max_wait) if overall else max_wait)
+    for attempt in range(THROTTLE_RETRIES + 1):
+        if limiter is not None:
+            limiter.acquire(max(0.0, deadline - time.monotonic()))
+        request_timeout = max(0.001, deadline - time.monotonic()) if overall else timeout or DEFAULT_TIMEOUT
+        try:
+            response = session.get(url, params=params, timeout=request_timeout, **kwargs)
+        except BaseException:
+            if limiter is not None:
+                limiter.release(answered=False)
+            raise
+
+        throttled = response.status_code == 429
+        retry_after = retry_after_seconds(response) if throttled else None
+        if limiter is not None:
+            limiter.release(throttled, retry_after)
+        remaining = deadline - time.monotonic()
+        if not throttled or attempt == THROTTLE_RETRIES or remaining <= 0 or (retry_after or 0) >= remaining:
+            return response  # Answered, or no time left to be answered
+        response.close()
+        if limiter is None:
+            time.sleep(min(retry_after or DEFAULT_BACKOFF * 2 ** attempt, remaining))  # No line to wait in
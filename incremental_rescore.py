@@ -0,0 +1,410 @@
+"""
+Module: Incremental Re-scoring
+
+This module keeps the match evidence of a catalogue of books (which keywords were found in each
+book's description) so that edits to the keyword lists can be applied without re-analyzing every
+description.
+
+When the keyword lists change, the old and new lists are diffed. Removed keywords and keywords that
+moved between categories only need the stored evidence. Keywords that were never evaluated before
+are looked up through an inverted index of description tokens: only the books whose tokens hold
+enough of the keyword's character bigrams are verified with the matcher. Finally, only the books
+with evidence for an affected keyword have their warnings recomputed.
+
+The evidence is kept in SQLite, so it can persist between runs. Changing the fuzzy threshold
+invalidates every piece of evidence; use rescore_all in that case.
+"""
+
+import json  # For storing keyword lists and warnings
+import sqlite3  # For the evidence store
+import threading  # For sharing the connection between threads
+
+from keyword_matcher import compile_keywords, iter_matches  # For the exact pass
+from fuzzy_index import (  # For the approximate pass
+    TextMatcher,
+    build_fuzzy_index,
+    max_mismatches,
+    required_grams,
+)
+from content_analysis import KEYWORD_WARNINGS, normalize_description  # The current keyword lists
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    book_id TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    warnings TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keyword_hits (
+    keyword TEXT NOT NULL,
+    book_id TEXT NOT NULL,
+    PRIMARY KEY (keyword, book_id)
+);
+CREATE INDEX IF NOT EXISTS keyword_hits_book ON keyword_hits (book_id);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def find_keyword_hits(text, keywords, threshold=80, fuzzy_index=None, compiled=None):
+    """
+    Finds every keyword from a list that occurs in a text, exactly or approximately.
+
+    Unlike analyze_description, this does not stop at the first hit of a category: the full set of
+    matching keywords is the evidence kept for incremental re-scoring.
+
+    Args:
+        text (str): The normalized description.
+        keywords (iterable): Normalized keywords to look for.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+        fuzzy_index (FuzzyIndex, optional): A prebuilt index over the keywords.
+        compiled (CompiledKeywords, optional): A prebuilt automaton over the keywords.
+
+    Returns:
+        set: The keywords found in the text.
+    """
+
+    keywords = list(keywords)
+    if compiled is None:
+        compiled = compile_keywords({"keywords": keywords})
+    if fuzzy_index is None:
+        fuzzy_index = build_fuzzy_index(keywords)
+
+    hits = set(keyword for _, keyword in iter_matches(compiled, text))  # Exact pass
+
+    # Fuzzy pass, with the gram filter and verdicts of analyze_description
+    matches = TextMatcher(fuzzy_index, text, threshold)
+    hits.update(keyword for keyword in keywords if keyword not in hits and matches(keyword))
+    return hits
+
+
+def diff_keyword_lists(old_lists, new_lists):
+    """
+    Compares two sets of normalized keyword lists.
+
+    Args:
+        old_lists (dict): Category name -> list of normalized keywords, before the edit.
+        new_lists (dict): Category name -> list of normalized keywords, after the edit.
+
+    Returns:
+        dict: "added" (keywords in no old list), "removed" (keywords in no new list), and
+        "changed" (keywords whose set of categories changed, including added and removed ones).
+    """
+
+    def categories_by_keyword(lists):
+        result = {}
+        for category, keywords in lists.items():
+            for keyword in keywords:
+                result.setdefault(keyword, set()).add(category)
+        return result
+
+    old_categories = categories_by_keyword(old_lists)
+    new_categories = categories_by_keyword(new_lists)
+
+    return {
+        "added": set(new_categories) - set(old_categories),
+        "removed": set(old_categories) - set(new_categories),
+        "changed": set(
+            keyword for keyword in set(old_categories) | set(new_categories)
+            if old_categories.get(keyword) != new_categories.get(keyword)
+        ),
+    }
+
+
+class EvidenceStore:
+    """
+    Stores per-book keyword evidence and applies keyword list edits incrementally.
+
+    Args:
+        path (str, optional): Path of the SQLite database. Defaults to an in-memory store.
+        keyword_warnings (dict, optional): The keyword lists a new store starts with.
+            Defaults to KEYWORD_WARNINGS. An existing store keeps the lists it was last updated with.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+    """
+
+    def __init__(self, path=":memory:", keyword_warnings=None, threshold=80):
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._token_books = None  # Inverted index: token -> set of book ids (built on demand)
+        self._gram_tokens = None  # Vocabulary index: bigram -> set of tokens (built on demand)
+
+        stored_lists = self._get_meta("keyword_lists")
+        if stored_lists is None:
+            self._set_meta("keyword_lists", compile_keywords(keyword_warnings or KEYWORD_WARNINGS).keywords_by_category)
+            self._set_meta("threshold", threshold)
+            self._connection.commit()
+        elif self._get_meta("threshold") != threshold:
+            raise ValueError("The store was built with a different threshold; use rescore_all to change it.")
+        self.threshold = threshold
+        self._load_lists(self._get_meta("keyword_lists"))
+
+    def _get_meta(self, name):
+        row = self._connection.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _set_meta(self, name, value):
+        self._connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def _load_lists(self, keyword_lists):
+        """
+        Compiles the matcher for the current keyword lists.
+        """
+
+        self.keyword_lists = keyword_lists
+        self._compiled = compile_keywords(keyword_lists)
+        self._fuzzy_index = build_fuzzy_index(self._compiled.keyword_masks)
+
+    def _warnings_from_hits(self, hits):
+        """
+        Derives the warning categories (in list order) from a set of keyword hits.
+        """
+
+        return [category for category, keywords in self.keyword_lists.items() if any(k in hits for k in keywords)]
+
+    def _book_hits(self, book_id):
+        return set(row[0] for row in self._connection.execute(
+            "SELECT keyword FROM keyword_hits WHERE book_id = ?", (book_id,)))
+
+    def add_book(self, book_id, description):
+        """
+        Analyzes a book's description against every keyword and stores the evidence.
+
+        Args:
+            book_id (str): The book identifier.
+            description (str): The book description.
+
+        Returns:
+            list: The warning types found.
+        """
+
+        text = normalize_description(description)
+        hits = find_keyword_hits(text, self._compiled.keyword_masks, self.threshold, self._fuzzy_index, self._compiled)
+        warnings = self._warnings_from_hits(hits)
+
+        with self._lock:
+            self._connection.execute("DELETE FROM keyword_hits WHERE book_id = ?", (book_id,))
+            self._connection.execute(
+                "INSERT OR REPLACE INTO books (book_id, description, warnings) VALUES (?, ?, ?)",
+                (book_id, text, json.dumps(warnings)))
+            self._connection.executemany(
+                "INSERT INTO keyword_hits (keyword, book_id) VALUES (?, ?)", [(k, book_id) for k in hits])
+            self._connection.commit()
+            if self._token_books is not None:
+                self._index_book(book_id, text)
+        return warnings
+
+    def warnings(self, book_id):
+        """
+        Returns the stored warnings of a book.
+
+        Args:
+            book_id (str): The book identifier.
+
+        Returns:
+            list: The warning types, or None if the book is not in the store.
+        """
+
+        row = self._connection.execute("SELECT warnings FROM books WHERE book_id = ?", (book_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def evidence(self, book_id):
+        """
+        Returns the stored evidence of a book: the keywords that hit each of its categories.
+
+        Args:
+            book_id (str): The book identifier.
+
+        Returns:
+            dict: Category name -> sorted list of the keywords found for it.
+        """
+
+        hits = self._book_hits(book_id)
+        return {
+            category: sorted(k for k in keywords if k in hits)
+            for category, keywords in self.keyword_lists.items()
+            if any(k in hits for k in keywords)
+        }
+
+    def _index_book(self, book_id, text):
+        """
+        Adds a book's tokens to the inverted index.
+        """
+
+        for token in set(text.split(" ")):
+            books = self._token_books.get(token)
+            if books is None:
+                books = self._token_books[token] = set()
+                for start in range(len(token) - 1):
+                    self._gram_tokens.setdefault(token[start:start + 2], set()).add(token)
+            books.add(book_id)
+
+    def _build_token_index(self):
+        """
+        Builds the inverted index of description tokens (and the bigram index of the vocabulary).
+        """
+
+        self._token_books = {}
+        self._gram_tokens = {}
+        for book_id, text in self._connection.execute("SELECT book_id, description FROM books"):
+            self._index_book(book_id, text)
+
+    def _evaluate_new_keywords(self, keywords):
+        """
+        Finds the stored books that contain any of the given (never evaluated) keywords.
+
+        Returns a list of (keyword, book id) hits.
+        """
+
+        if self._token_books is None:
+            self._build_token_index()
+
+        # Very short descriptions are compared as a whole, which the bigram filter does not cover
+        longest = max(len(k) for k in keywords)
+        short_books = set(row[0] for row in self._connection.execute(
+            "SELECT book_id FROM books WHERE length(description) <= ?", (longest,)))
+
+        candidates = {}  # book id -> keywords to verify
+        all_books = None
+        for keyword in keywords:
+            books = self._candidate_books(keyword)
+            if books is None:
+                if all_books is None:
+                    all_books = [row[0] for row in self._connection.execute("SELECT book_id FROM books")]
+                books = all_books
+            for book_id in set(books) | short_books:
+                candidates.setdefault(book_id, []).append(keyword)
+
+        fuzzy_index = build_fuzzy_index(keywords)
+        compiled = compile_keywords({"keywords": keywords})
+        hits = []
+        for book_id, book_keywords in candidates.items():
+            text = self._connection.execute(
+                "SELECT description FROM books WHERE book_id = ?", (book_id,)).fetchone()[0]
+            found = find_keyword_hits(text, book_keywords, self.threshold, fuzzy_index, compiled)
+            hits.extend((keyword, book_id) for keyword in book_keywords if keyword in found)
+        return hits
+
+    def _candidate_books(self, keyword):
+        """
+        Finds the books that could contain a keyword, exactly or within the fuzzy threshold.
+
+        A close enough window keeps at least required_grams of the keyword's distinct bigrams.
+        Bigrams without a space always lie inside one description token, so counting, per book,
+        the keyword bigrams found in its tokens gives a safe filter. Returns None when the filter
+        cannot rule out any book.
+        """
+
+        grams = set(keyword[start:start + 2] for start in range(len(keyword) - 1))
+        inner_grams = set(gram for gram in grams if " " not in gram)
+        needed = required_grams(len(grams), max(max_mismatches(len(keyword), self.threshold), 0), 2)
+        needed -= len(grams) - len(inner_grams)  # Grams spanning two words are not indexed
+        if needed <= 0:
+            return None  # The filter cannot rule any book out
+
+        counts = {}
+        for gram in inner_grams:
+            books = set()
+            for token in self._gram_tokens.get(gram, ()):
+                books.update(self._token_books[token])
+            for book_id in books:
+                counts[book_id] = counts.get(book_id, 0) + 1
+        return set(book_id for book_id, count in counts.items() if count >= needed)
+
+    def update_keywords(self, keyword_warnings):
+        """
+        Applies new keyword lists, re-examining only what the edit can affect.
+
+        Args:
+            keyword_warnings (dict): The new keyword lists (as in KEYWORD_WARNINGS).
+
+        Returns:
+            dict: Book id -> (old warnings, new warnings) for every book whose warnings changed.
+        """
+
+        with self._lock:
+            new_lists = compile_keywords(keyword_warnings).keywords_by_category
+            diff = diff_keyword_lists(self.keyword_lists, new_lists)
+
+            # Books with evidence for a keyword whose categories changed (including removed keywords)
+            affected_books = set()
+            if list(new_lists) != list(self.keyword_lists):
+                # Categories were renamed, added or reordered: recompute every book from its evidence
+                affected_books.update(row[0] for row in self._connection.execute("SELECT book_id FROM books"))
+            for keyword in diff["changed"]:
+                affected_books.update(row[0] for row in self._connection.execute(
+                    "SELECT book_id FROM keyword_hits WHERE keyword = ?", (keyword,)))
+
+            # Removed keywords: their evidence is simply dropped
+            self._connection.executemany(
+                "DELETE FROM keyword_hits WHERE keyword = ?", [(k,) for k in diff["removed"]])
+
+            self._load_lists(new_lists)
+
+            # Added keywords: verify them only against the books the token index cannot rule out
+            if diff["added"]:
+                new_hits = self._evaluate_new_keywords(sorted(diff["added"]))
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO keyword_hits (keyword, book_id) VALUES (?, ?)", new_hits)
+                affected_books.update(book_id for _, book_id in new_hits)
+
+            # Recompute the warnings of the affected books only
+            changes = {}
+            for book_id in affected_books:
+                old = self.warnings(book_id)
+                new = self._warnings_from_hits(self._book_hits(book_id))
+                if old != new:
+                    changes[book_id] = (old, new)
+                    self._connection.execute(
+                        "UPDATE books SET warnings = ? WHERE book_id = ?", (json.dumps(new), book_id))
+
+            self._set_meta("keyword_lists", new_lists)
+            self._connection.commit()
+            return changes
+
+    def rescore_all(self, keyword_warnings=None, threshold=None):
+        """
+        Re-analyzes every stored description from scratch (needed after a threshold change).
+
+        Args:
+            keyword_warnings (dict, optional): New keyword lists. Defaults to the current ones.
+            threshold (int, optional): New fuzzy threshold. Defaults to the current one.
+
+        Returns:
+            dict: Book id -> (old warnings, new warnings) for every book whose warnings changed.
+        """
+
+        with self._lock:
+            if keyword_warnings is not None:
+                self._load_lists(compile_keywords(keyword_warnings).keywords_by_category)
+                self._set_meta("keyword_lists", self.keyword_lists)
+            if threshold is not None:
+                self.threshold = threshold
+                self._set_meta("threshold", threshold)
+
+            changes = {}
+            books = self._connection.execute("SELECT book_id, description, warnings FROM books").fetchall()
+            for book_id, text, warnings in books:
+                old = json.loads(warnings)
+                new = self.add_book(book_id, text)
+                if old != new:
+                    changes[book_id] = (old, new)
+            return changes
+
+    def keyword_hit_counts(self):
+        """
+        Counts the books each keyword was found in, e.g. to seed content_analysis.KeywordHitRates.
+
+        Returns:
+            dict: keyword -> number of books.
+        """
+
+        return dict(self._connection.execute("SELECT keyword, COUNT(*) FROM keyword_hits GROUP BY keyword"))
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+
+        self._connection.close()
@@ -0,0 +1,353 @@
+"""
+Module: Instrumentation
+
+This module times the stages of a lookup (provider searches, description fetches, the analysis
+passes, cover downloads and decoding) so a slow lookup can be broken down. Timings are recorded
+as spans: a name, a duration, optional attributes, and the span they ran inside (also across the
+worker threads of a search), so every stage of one lookup can be traced back to it.
+
+Finished spans are kept in a bounded buffer and aggregated per name. They can be exported as JSON
+lines (or logged one per line as they finish) and as a Prometheus-style text dump. Counters
+(for example the number of fuzzy comparisons) are aggregated the same way.
+
+Instrumentation is off by default and costs one flag check per instrumented call while off. Turn
+it on with enable() or the BOOK_RATING_TRACE=1 environment variable. profiled() runs a block of
+code under cProfile and, optionally, tracemalloc.
+
+Attributes:
+    enabled (bool): Whether spans and counters are being recorded.
+    DEFAULT_MAX_SPANS (int): Number of finished spans kept for export.
+"""
+
+import cProfile  # For the profiling hook
+import contextlib  # For the profiling context manager
+import functools  # For the traced decorator
+import io  # For formatting profiler output
+import itertools  # For span ids
+import json  # For structured span export
+import logging  # For logging spans as they finish
+import os  # For the environment switch
+import pstats  # For formatting profiler output
+import threading  # For per-thread span stacks
+import time  # For timing
+import tracemalloc  # For the memory profiling hook
+from collections import deque  # For the bounded span buffer
+
+DEFAULT_MAX_SPANS = 10000
+
+logger = logging.getLogger(__name__)
+
+enabled = False
+_log_spans = False
+_finished = deque(maxlen=DEFAULT_MAX_SPANS)  # Finished spans, oldest first
+_totals = {}  # span name -> [count, total seconds, max seconds]
+_counters = {}  # counter name -> value
+_lock = threading.Lock()
+_local = threading.local()  # .stack: the open spans of the current thread
+_ids = itertools.count(1)
+
+
+class Span:
+    """
+    A timed stage. Use it through span(); set() adds attributes while the stage runs.
+    """
+
+    __slots__ = ("name", "attributes", "id", "parent", "started", "_start")
+
+    def __init__(self, name, attributes, parent=None):
+        self.name = name
+        self.attributes = attributes
+        self.id = next(_ids)
+        self.parent = parent
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        stack = _stack()
+        if self.parent is None and stack:
+            self.parent = stack[-1].id
+        stack.append(self)
+        self.started = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _finish(self.name, duration, self.attributes, self.id, self.parent, self.started)
+        return False
+
+
+class _NullSpan:
+    """
+    Stands in for a span while instrumentation is off.
+    """
+
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _stack():
+    """
+    Returns the open spans of the current thread.
+    """
+
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _finish(name, duration, attributes, span_id=None, parent=None, started=None):
+    """
+    Stores a finished span and adds it to the per-name totals.
+    """
+
+    record = {"name": name, "duration": duration, "id": span_id, "parent": parent,
+              "start": started if started is not None else time.time() - duration,
+              "thread": threading.current_thread().name}
+    if attributes:
+        record["attributes"] = attributes
+    with _lock:
+        _finished.append(record)
+        totals = _totals.get(name)
+        if totals is None:
+            _totals[name] = [1, duration, duration]
+        else:
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+    if _log_spans:
+        logger.info(json.dumps(record, default=str))
+
+
+def enable(log_spans=False, max_spans=DEFAULT_MAX_SPANS):
+    """
+    Starts recording spans and counters.
+
+    Args:
+        log_spans (bool, optional): Also log every finished span as a JSON line (logger "instrumentation"). Defaults to False.
+        max_spans (int, optional): Number of finished spans kept for export. Defaults to DEFAULT_MAX_SPANS.
+    """
+
+    global enabled, _log_spans, _finished
+    with _lock:
+        _finished = deque(_finished, maxlen=max_spans)
+    _log_spans = log_spans
+    enabled = True
+
+
+def disable():
+    """
+    Stops recording (what was recorded is kept until reset()).
+    """
+
+    global enabled
+    enabled = False
+
+
+def reset():
+    """
+    Forgets every recorded span, total and counter.
+    """
+
+    with _lock:
+        _finished.clear()
+        _totals.clear()
+        _counters.clear()
+
+
+def span(name, **attributes):
+    """
+    Times a block of code:
+
+        with instrumentation.span("google.search", provider="Google Books") as current:
+            ...
+            current.set("results", len(books))
+
+    Args:
+        name (str): The stage name.
+        **attributes: Attributes stored with the span.
+
+    Returns:
+        Span: A context manager (a no-op one while instrumentation is off).
+    """
+
+    if not enabled:
+        return _NULL_SPAN
+    return Span(name, attributes)
+
+
+def traced(name):
+    """
+    Decorator that times every call of a function as a span with the given name.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def bind(func):
+    """
+    Wraps a function that will run on another thread so its spans are attached to the span that is
+    open here (for example the provider searches of get_book_info). Returns func itself while off.
+    """
+
+    if not enabled:
+        return func
+    stack = _stack()
+    parent = stack[-1].id if stack else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with Span(getattr(func, "__name__", "task"), {}, parent):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def record(name, seconds, **attributes):
+    """
+    Records a stage that was timed elsewhere (for example per-category analysis times).
+    """
+
+    if enabled:
+        stack = _stack()
+        _finish(name, seconds, attributes, next(_ids), stack[-1].id if stack else None)
+
+
+def count(name, amount=1):
+    """
+    Adds to a counter (for example the number of fuzzy comparisons).
+    """
+
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + amount
+
+
+def spans():
+    """
+    Returns the finished spans, oldest first, as dicts with "name", "duration" (seconds), "id",
+    "parent", "start" (epoch seconds), "thread" and "attributes" (when any were set).
+    """
+
+    with _lock:
+        return list(_finished)
+
+
+def summary():
+    """
+    Returns the per-name totals and the counters.
+
+    Returns:
+        dict: "spans" (name -> {"count", "total", "max"} in seconds) and "counters" (name -> value).
+    """
+
+    with _lock:
+        return {
+            "spans": {name: {"count": c, "total": total, "max": longest} for name, (c, total, longest) in _totals.items()},
+            "counters": dict(_counters),
+        }
+
+
+def export_json_lines(file):
+    """
+    Writes every finished span to a file object as JSON lines.
+    """
+
+    for record in spans():
+        file.write(json.dumps(record, default=str) + "\n")
+
+
+def prometheus_text(prefix="book_rating"):
+    """
+    Formats the totals and counters in the Prometheus text exposition format.
+
+    Returns:
+        str: A summary per span name (count and sum of seconds), a gauge of the longest span per
+        span name and a counter per counter name.
+    """
+
+    totals = summary()
+    spans = [(name.replace("\\", "\\\\").replace('"', '\\"'), values)
+             for name, values in sorted(totals["spans"].items())]
+    lines = [f"# TYPE {prefix}_span_seconds summary"]
+    for label, values in spans:
+        lines.append(f'{prefix}_span_seconds_count{{span="{label}"}} {values["count"]}')
+        lines.append(f'{prefix}_span_seconds_sum{{span="{label}"}} {values["total"]:.6f}')
+    lines.append(f"# TYPE {prefix}_span_max_seconds gauge")  # A summary family cannot hold a max series
+    for label, values in spans:
+        lines.append(f'{prefix}_span_max_seconds{{span="{label}"}} {values["max"]:.6f}')
+    for name, value in sorted(totals["counters"].items()):
+        metric = f"{prefix}_{''.join(char if char.isalnum() else '_' for char in name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@contextlib.contextmanager
+def profiled(limit=25, memory=False, sort="cumulative"):
+    """
+    Runs a block under cProfile (and tracemalloc with memory=True) and reports where time and
+    memory went:
+
+        with instrumentation.profiled(memory=True) as report:
+            analyze_description(text)
+        print(report["profile"])
+
+    Args:
+        limit (int, optional): Number of functions / allocation sites reported. Defaults to 25.
+        memory (bool, optional): Also trace memory allocations. Defaults to False.
+        sort (str, optional): pstats sort key. Defaults to "cumulative".
+
+    Yields:
+        dict: Filled when the block ends: "profile" (text), and with memory=True "peak_memory"
+        (bytes) and "allocations" (text, top allocation sites).
+    """
+
+    report = {}
+    profiler = cProfile.Profile()
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler.enable()
+    try:
+        yield report
+    finally:
+        profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(sort).print_stats(limit)
+        report["profile"] = output.getvalue()
+        if memory:
+            report["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            top = tracemalloc.take_snapshot().statistics("lineno")[:limit]
+            report["allocations"] = "\n".join(str(statistic) for statistic in top)
+            if started_tracing:
+                tracemalloc.stop()
+
+
+if os.environ.get("BOOK_RATING_TRACE") == "1":
+    enable(log_spans=True)
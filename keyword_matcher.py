@@ -0,0 +1,288 @@
+"""
+Module: Keyword Matcher
+
+This module compiles the content warning keyword lists into a single Aho-Corasick automaton so a
+book description can be scanned for every keyword of every category in one linear pass, instead of
+one substring search per keyword.
+
+The keyword lists are validated, normalized and deduplicated while they are compiled: each distinct
+keyword is stored once (as an interned string), with a bitmask of every category it belongs to.
+
+Attributes:
+    CompiledKeywords (namedtuple): The compiled automaton together with the normalized keyword lists.
+    KeywordIssue (namedtuple): A problem found in the keyword lists by validate_keywords.
+"""
+
+import sys  # For interning keyword strings
+from collections import namedtuple, deque  # For the compiled table and breadth-first construction
+
+# Compiled representation of a keyword dictionary
+#   categories: category names in their original order
+#   keywords_by_category: normalized, deduplicated keywords for each category (original order kept)
+#   keyword_masks: keyword -> bitmask of the categories it belongs to
+#   goto: list of dicts, one per automaton state, mapping a character to the next state
+#   fail: list of failure links, one per state
+#   outputs: list of tuples of keywords that end at each state (failure chain included)
+#   masks: list of category bitmasks for the keywords that end at each state
+CompiledKeywords = namedtuple(
+    "CompiledKeywords",
+    ["categories", "keywords_by_category", "keyword_masks", "goto", "fail", "outputs", "masks"],
+)
+
+# A problem found in the keyword lists
+#   category: the category the entry is listed under
+#   keyword: the entry as written
+#   kind: "type", "empty", "joined" (suspicious), or "duplicate", "unnormalized" (cleaned up when compiling)
+#   problem: a readable description of the problem
+KeywordIssue = namedtuple("KeywordIssue", ["category", "keyword", "kind", "problem"])
+
+SUSPICIOUS_KINDS = ("type", "empty", "joined")  # Issues that compiling cannot fix by itself
+
+
+def normalize_keyword(keyword):
+    """
+    Normalizes a keyword for matching by lowercasing it and collapsing surrounding/inner whitespace.
+
+    Args:
+        keyword (str): The keyword as written in the keyword lists.
+
+    Returns:
+        str: The normalized keyword (may be empty if the keyword was only whitespace).
+    """
+
+    return ' '.join(keyword.lower().split())  # Lowercase and collapse whitespace runs to one space
+
+
+def compile_keywords(keyword_warnings):
+    """
+    Builds an Aho-Corasick automaton from a dictionary of warning categories and keywords.
+
+    Keywords are normalized with normalize_keyword and deduplicated within each category. A keyword
+    listed under several categories is stored once, with a bitmask of all categories it belongs to.
+    Keywords and category names are interned, so every table shares a single copy of each string.
+
+    Args:
+        keyword_warnings (dict): Mapping of warning category name to a list of keywords.
+
+    Returns:
+        CompiledKeywords: The compiled automaton, ready to be used with find_categories.
+    """
+
+    categories = [sys.intern(category) for category in keyword_warnings]  # Keep the source order
+    keywords_by_category = {}
+    keyword_masks = {}
+
+    # Normalize and deduplicate the keyword lists
+    for index, category in enumerate(categories):
+        unique_keywords = []
+        seen = set()
+        for keyword in keyword_warnings[category]:
+            normalized = normalize_keyword(keyword)
+            if not normalized or normalized in seen:
+                continue  # Skip empty entries and duplicates within the same category
+            normalized = sys.intern(normalized)
+            seen.add(normalized)
+            unique_keywords.append(normalized)
+            keyword_masks[normalized] = keyword_masks.get(normalized, 0) | (1 << index)
+        keywords_by_category[category] = unique_keywords
+
+    # Build the keyword trie (state 0 is the root)
+    goto = [{}]
+    terminal = [None]  # Keyword ending at each state, if any
+    for keyword in keyword_masks:
+        state = 0
+        for char in keyword:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][char] = next_state
+                goto.append({})
+                terminal.append(None)
+            state = next_state
+        terminal[state] = keyword
+
+    # Compute failure links breadth first, merging the outputs of each failure state
+    fail = [0] * len(goto)
+    outputs = [(keyword,) if keyword else () for keyword in terminal]
+    queue = deque(goto[0].values())  # Children of the root fail back to the root
+    while queue:
+        state = queue.popleft()
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]  # Follow failure links until the character can be consumed
+            fail[next_state] = goto[fallback].get(char, 0)
+            outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+
+    # Collapse each state's outputs into a single category bitmask for fast category lookups
+    masks = []
+    for state_outputs in outputs:
+        mask = 0
+        for keyword in state_outputs:
+            mask |= keyword_masks[keyword]
+        masks.append(mask)
+
+    return CompiledKeywords(categories, keywords_by_category, keyword_masks, goto, fail, outputs, masks)
+
+
+def validate_keywords(keyword_warnings):
+    """
+    Checks the keyword lists for entries that are wrong or that compile_keywords has to clean up.
+
+    Suspicious entries (see SUSPICIOUS_KINDS) are entries that are not strings, are empty, or look
+    like two keywords run together by a missing comma (a multi-word keyword whose last word ends
+    with another keyword, such as "graphic attackcombat"). Duplicates within a category and
+    entries that are not lowercased and trimmed are reported too; compiling removes those.
+
+    Args:
+        keyword_warnings (dict): Mapping of warning category name to a list of keywords.
+
+    Returns:
+        list: A KeywordIssue for each problem, in the order of the source lists.
+    """
+
+    issues = []
+    all_keywords = {normalize_keyword(keyword) for keywords in keyword_warnings.values()
+                    for keyword in keywords if isinstance(keyword, str)}
+    all_keywords.discard("")
+    word_counts = {}  # How many distinct keywords use each word
+    for keyword in all_keywords:
+        for word in set(keyword.split()):
+            word_counts[word] = word_counts.get(word, 0) + 1
+    all_words = {word for word, count in word_counts.items() if count > 1}  # Words used by several keywords
+
+    for category, keywords in keyword_warnings.items():
+        seen = set()
+        for keyword in keywords:
+            if not isinstance(keyword, str):
+                issues.append(KeywordIssue(category, keyword, "type", f"{keyword!r} is not a string"))
+                continue
+            normalized = normalize_keyword(keyword)
+            if not normalized:
+                issues.append(KeywordIssue(category, keyword, "empty", "empty keyword"))
+                continue
+            if normalized in seen:
+                issues.append(KeywordIssue(category, keyword, "duplicate", f"{normalized!r} is listed more than once"))
+            seen.add(normalized)
+            if normalized != keyword:
+                issues.append(KeywordIssue(category, keyword, "unnormalized", f"{keyword!r} is matched as {normalized!r}"))
+
+            # A missing comma between two entries concatenates them: "graphic attack" "combat". Single
+            # words are not checked, they are too often real compounds ("dogfight", "methamphetamine")
+            prefix, _, last_word = normalized.rpartition(" ")
+            if not prefix or last_word in all_words:
+                continue
+            for split in range(3, len(last_word) - 2):
+                if last_word[:split] in all_words and last_word[split:] in all_keywords:
+                    issues.append(KeywordIssue(
+                        category, keyword, "joined",
+                        f"{normalized!r} looks like {prefix + ' ' + last_word[:split]!r} and "
+                        f"{last_word[split:]!r} joined by a missing comma"))
+                    break
+
+    return issues
+
+
+def keyword_table_stats(keyword_warnings, compiled=None):
+    """
+    Measures how much compiling shrinks the keyword lists.
+
+    Args:
+        keyword_warnings (dict): Mapping of warning category name to a list of keywords.
+        compiled (CompiledKeywords, optional): The compiled lists. Compiled from keyword_warnings if omitted.
+
+    Returns:
+        dict: "entries" and "characters" of the source lists, "unique_keywords" and "unique_characters"
+        after compiling, "duplicates_removed" (within a category), "shared_keywords" (listed under
+        several categories, now stored once), "trie_states" and "reduction" (fraction of entries removed).
+    """
+
+    if compiled is None:
+        compiled = compile_keywords(keyword_warnings)
+
+    entries = sum(len(keywords) for keywords in keyword_warnings.values())
+    per_category = sum(len(keywords) for keywords in compiled.keywords_by_category.values())
+    unique = len(compiled.keyword_masks)
+    return {
+        "entries": entries,
+        "characters": sum(len(keyword) for keywords in keyword_warnings.values() for keyword in keywords),
+        "unique_keywords": unique,
+        "unique_characters": sum(len(keyword) for keyword in compiled.keyword_masks),
+        "duplicates_removed": entries - per_category,
+        "shared_keywords": sum(1 for mask in compiled.keyword_masks.values() if mask & (mask - 1)),
+        "trie_states": len(compiled.goto),
+        "reduction": 1 - unique / entries if entries else 0.0,
+    }
+
+
+def iter_matches(compiled, text):
+    """
+    Scans text with the compiled automaton and yields every keyword occurrence.
+
+    Args:
+        compiled (CompiledKeywords): The automaton built by compile_keywords.
+        text (str): The text to scan. It should already be lowercased.
+
+    Yields:
+        tuple: (end_index, keyword) for each occurrence, where end_index is the index just past the match.
+    """
+
+    goto, fail, outputs = compiled.goto, compiled.fail, compiled.outputs
+    state = 0
+    for index, char in enumerate(text):
+        while state and char not in goto[state]:
+            state = fail[state]  # Fall back until the character can be consumed (or we reach the root)
+        state = goto[state].get(char, 0)
+        for keyword in outputs[state]:
+            yield index + 1, keyword
+
+
+def _is_whole_word(text, start, end):
+    """
+    Checks whether text[start:end] is bounded by non-alphanumeric characters (or the text edges).
+    """
+
+    before_ok = start == 0 or not text[start - 1].isalnum()
+    after_ok = end == len(text) or not text[end].isalnum()
+    return before_ok and after_ok
+
+
+def find_categories(compiled, text, whole_words=False):
+    """
+    Finds every category with at least one keyword present in the text, in a single pass.
+
+    By default a keyword matches anywhere in the text (the same substring test analyze_description
+    has always used). With whole_words=True a keyword only counts when it is not part of a longer word.
+
+    Args:
+        compiled (CompiledKeywords): The automaton built by compile_keywords.
+        text (str): The text to scan. It should already be lowercased.
+        whole_words (bool, optional): Only accept matches on word boundaries. Defaults to False.
+
+    Returns:
+        list: The matching category names, in the order of the source keyword dictionary.
+    """
+
+    all_mask = (1 << len(compiled.categories)) - 1
+    found = 0
+
+    if whole_words:
+        for end, keyword in iter_matches(compiled, text):
+            if _is_whole_word(text, end - len(keyword), end):
+                found |= compiled.keyword_masks[keyword]
+                if found == all_mask:
+                    break  # Every category already matched, no need to scan further
+    else:
+        goto, fail, masks = compiled.goto, compiled.fail, compiled.masks
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if masks[state]:
+                found |= masks[state]
+                if found == all_mask:
+                    break  # Every category already matched, no need to scan further
+
+    return [category for index, category in enumerate(compiled.categories) if found & (1 << index)]
@@ -1,492 +1,314 @@
 """
 Module: Book Content Rating Application
 
-This module provides the functionality for a book content rating application. It uses tkinter for the GUI, 
-requests for API calls, and various other libraries for processing data.
+This module provides the Tk front end of the book content rating application. The searching,
+fetching and analysis happen in the headless book_api and content_analysis modules; this module
+builds the window, calls into them, and shows their results and errors.
 
-Attributes:
-    OPEN_BOOKS_API_URL (str): URL for the Open Library Books API.
-    GOOGLE_BOOKS_API_BASE_URL (str): URL for the Google Books API.
-    API_ERROR_MESSAGE (str): Default error message for API connection issues.
+Importing this module does not open a window: the GUI is created only when it is run as a script.
 """
 
 import tkinter as tk  # Tkinter for GUI components
 from tkinter import messagebox, Listbox, Label, Button, Entry, Frame, Text  # Tkinter widgets
-import requests  # For making API requests
-import urllib.parse  # For URL encoding
-from fuzzywuzzy import fuzz  # For string matching
-from bs4 import BeautifulSoup  # For HTML parsing
 import webbrowser  # For opening URLs in a web browser
-from PIL import Image, ImageTk  # For handling images
-import io  # For byte stream operations
-from collections import namedtuple  # For creating named tuples
-
-# URLs for APIs
-OPEN_BOOKS_API_URL = "https://openlibrary.org/search.json"  # URL for Open Library search API
-GOOGLE_BOOKS_API_BASE_URL = "https://www.googleapis.com/books/v1/volumes"  # URL for Google Books API
-
-API_ERROR_MESSAGE = "We're having trouble connecting to the system"  # Default API error message
-
-# Dictionary of keywords associated with various content warnings
-# Each key represents a type of content warning with a list of keywords related to that warning
-KEYWORD_WARNINGS = {
-    "Animal Abuse": ["animal", "cruelty", "neglect", "harm", "suffering", "mistreatment", "abuse","beating", "starvation", "malnourishment", "torment", "torture", "maltreat",
-        "exploit", "kill", "slaughter", "poach", "trap", "experiment", "hunt", "cage","abandon", "discard", "pain", "whip", "shoot", "trap", "confine", "enslave",
-        "skin", "fur", "endanger", "bait", "bleed", "choke", "crush", "misuse","overwork", "punish", "scar", "shock", "strangle", "wound", "maim", "disfigure",
-        "mutilate", "vivisection", "imprisoned", "lab animal", "chained", "caged","trafficked", "illegal trade", "baiting", "fight", "abusement park", "entertainment",
-        "circuses", "rodeo", "farming", "fur trade", "leather", "cosmetic testing","laboratory", "breed", "overbreed", "pet mill", "racing", "gamblers", "breeders",
-        "discard", "euthanize", "abandoned", "stray", "wildlife", "marine life","inhumane", "captivity", "illegal hunting", "brutality", "battery", "factory farming",
-        "intensive farming", "live transport", "overfishing", "pollution", "habitat destruction","deforestation", "illegal capture", "smuggling", "animal testing", "genetic manipulation",
-        "cloning", "forced feeding", "foie gras", "shark finning", "ivory trade", "horn trade","bear bile", "exotic pets", "wildlife trade", "dolphin hunt", "whale hunt", "seal hunt",
-        "fur farming", "battery cages", "veal crates", "puppy mills", "cockfight", "dogfight","bullfight", "horse whipping", "elephant ride", "animal performance", "animal hoarding",
-        "overpopulation", "negligent care", "physical abuse", "psychological abuse", "overbreeding","debeaking", "tail docking", "ear cropping", "declawing", "force molting", "live bait","animal sacrifice", "roadkill", "pest control", "inhumane slaughter", "live skinning",
-        "animal fighting", "dog racing", "horse racing", "animal exploitation", "speciesism","wild capture", "wildlife disruption", "ecosystem damage", "bioaccumulation",
-        "toxic testing", "animal abandonment", "zoo captivity", "unsustainable practices","destructive fishing", "bycatch", "animal hoarder", "animal neglect", "animal collector"],
-    "Sexual Violence": ["rape", "sexual assault", "molestation", "abuse", "harassment", "exploitation",
-        "predator", "stalking", "coercion", "forced", "non-consensual", "trafficking","grooming", "victimization", "indecent", "violence", "aggression", "dominance",
-        "power abuse", "lewd", "sex crime", "sexual misconduct", "unwanted advances","inappropriate touch", "intimidation", "survivor", "sexual violence", "sexual threat",
-        "sodomy", "non-consent", "predatory", "sexual predator", "date rape", "gang rape","spousal abuse", "marital rape", "child sexual abuse", "incest", "voyeurism",
-        "exhibitionism", "sexual humiliation", "sexual slavery", "forced prostitution","sexual exploitation", "sexual coercion", "revenge porn", "upskirt", "peeping tom",
-        "statutory rape", "sexual bullying", "cyber harassment", "sextortion", "sexual blackmail",
-        "fondling", "indecency", "sexual aggression", "sexual dominance", "rape culture","non-consensual", "nonconsensual", "harassment","grope", "abuse", "forced", "attack", "inappropriate", "unwanted", "exploit", "violate",
-        "coerce", "intimidate", "threaten", "predator", "offender", "consent", "groom", "stalk","unsolicited", "touch", "fear", "trauma", "victim", "traumatize", "vulnerable", "invasion",
-        "inappropriate", "violation", "indecent", "forceful", "abusive relationship", "manipulation","intimate violence", "uninvited", "molest", "statutory", "silence", "hush", "date rape","drugged", "power", "control", "cyber", "explicit", "sexting", "blackmail", "shaming","exploitation", "revenge porn", "intimate threat", "exposure", "uncomfortable", "unsafe","minor", "child", "elderly", "defenseless"],
-    "Body Image/Disordered Eating": ["body image", "eating disorder", "anorexia", "bulimia", "body dysmorphia", "binge","starvation", "diet", "thin", "fat", "overeating", "weight", "obesity", "underweight",
-        "purge", "overeating","binge eating", "starvation", "purging", "body shaming", "weight obsession","negative body image", "fat shaming", "dieting", "extreme dieting", "laxative abuse",
-        "compulsive eating", "restrictive eating", "body hatred", "thinness", "overexercising","body dissatisfaction", "weight criticism", "calorie counting", "self-starvation",
-        "food phobia", "negative self-image", "body comparison", "weight loss","unhealthy body image", "beauty standards", "food guilt",
-        "perfectionism in diet", "malnutrition", "underweight", "overweight", "obesity","body negativity", "food obsession", "diet pills", "appetite suppressants",
-        "body image distortion", "self-esteem issues", "unrealistic body standards","size zero", "model thin", "skinny ideal", "appearance-focused culture","restriction", "calorie", "fast", "unhealthy", "mirror", "self-worth","appearance", "pressure", "ideal", "size", "dieting", "body shaming", "self-conscious",
-        "perfection", "body dissatisfaction", "exercise", "obsession", "orthorexia", "laxatives","diuretics", "body checking", "guilt", "shame", "control", "image", "food fear","compulsive", "scale", "weight gain", "weight loss", "muscle", "toning", "fitness","skinny", "plump", "heavy", "light", "self-esteem", "self-hate", "mirror check","avoidance", "pinch", "measure", "waist", "BMI", "comparison"],
-    "Self-Harm/Suicide": ["self-harm", "suicide", "cutting", "overdose", "self-inflict", "end life", "attempt",
-        "despair", "self-harm", "self-injury", "cutting", "suicide", "suicidal thoughts", "self-mutilation","self-destructive behavior", "overdose", "self-inflicted", "self-abuse", "harmful behavior","self-punishment", "self-cutting", "self-burning", "suicide attempt", "suicide ideation",
-        "self-poisoning", "self-sabotage", "suicidal ideation", "suicidal tendencies", "hanging",
-        "jumping", "poisoning", "drowning", "asphyxiation", "suicide note", "suicide plan","fatal injury", "self-inflicted wound", "self-aggression", "self-hatred", "suicide pact",
-        "suicide prevention", "cry for help", "self-scarification", "suicide hotline", "suicide crisis","self-strangulation", "lethal means", "death wish", "desperation", "hopelessness",
-        "suicide survivor", "fatal self-harm", "suicidal behavior", "suicidal crisis", "suicide watch","suicide risk", "suicide method", "self-inflicted pain", "suicide contagion", "hopelessness", "pain", "wrist", "bleed", "scars", "burn", "jump", "hang","suffocate", "cry", "lonely", "depressed", "worthless", "numb", "lost", "void", "struggle","isolation", "helplessness", "grieve", "self-loathing", "suicidal thoughts", "ideation","death wish", "razor", "pills", "intoxication", "sadness", "sorrow", "self-punishment",
-        "self-destructive", "darkness", "emptiness", "rope", "bridge", "height", "firearm","blade", "cutting tool", "gas", "drowning", "substance", "ingest", "alcohol", "method","means", "lethality", "intent", "crisis", "hotline"],
-    "Discrimination/Hate Crimes": ["discrimination", "racism", "homophobia", "sexism", "hate crime", "prejudice", "bigotry","intolerance", "xenophobia", "bias", "stereotype", "slur", "discriminate", "marginalize",
-        "oppress", "discrimination", "racism", "sexism", "homophobia", "transphobia", "xenophobia",
-        "bigotry", "prejudice", "hate crime", "bias", "intolerance", "stereotyping","inequality", "marginalization", "exclusion", "hate speech", "racial profiling",
-        "gender discrimination", "sexual orientation discrimination", "religious intolerance","ethnic hatred", "social injustice", "civil rights violation", "racial slur",
-        "gender bias", "misogyny", "misandry", "ageism", "ableism", "classism","scapegoating", "victimization", "hateful rhetoric", "sectarian violence",
-        "racial violence", "gender-based violence", "ethnocentrism", "cultural discrimination","lynching", "apartheid", "segregation", "genocide", "ethnic cleansing",
-        "hate group", "white supremacy", "neo-nazism", "radical extremism", "racial supremacy","gender inequality", "institutional racism", "structural discrimination", "oppression",
-        "cultural bias", "social exclusion", "minority oppression", "racial injustice", "gender violence", "racial tension", "cultural clash", "religious persecution","caste discrimination", "social stratification", "hate propaganda", "racial discrimination",
-        "ethnic bias", "religious bias", "gender stereotyping", "cultural stereotyping", "minority", "inequality", "unfair", "segregation", "racist", "sexist", "bigot","prejudiced", "hateful", "derogatory", "injustice", "persecute", "isolate", "alienate",
-        "ostracize", "scapegoat", "gender bias", "ethnicity", "nationality", "caste", "class","religious", "anti-Semitism", "Islamophobia", "disability", "ageism", "LGBTQ+","gender identity", "transphobia", "colorism", "microaggressions", "supremacy", "radical","extremist", "prejudice", "bias-motivated", "targeted", "offense", "vandalism", "symbol","hate speech", "propaganda"],
-    "Violence & Graphic Content": ["violence", "graphic", "gore", "brutal", "vicious", "blood", "wound", "injury", "attack","hurt", "punch", "stab", "hit", "fight", "assault", "battle", "conflict", "terror", "shock","horror", "aggression", "intense", "disturb", "trauma", "frighten", "scar", "fear", "threat","danger", "menace", "brawl", "riot", "massacre", "ambush", "explosive", "bomb", "firearm",
-        "weapon", "gunshot",  "violence", "graphic content", "gore", "brutality", "bloodshed", "assault",
-        "fighting", "murder", "homicide", "torture", "abuse", "physical attack","warfare", "combat", "mutilation", "graphic injury", "fatal violence", 
-        "violent crime", "bloodletting", "gruesome scene", "violent death", "massacre","bloodbath", "carnage", "atrocity", "savagery", "graphic murder", "violent assault",
-        "gruesome injury", "sadistic torture", "brutal killing", "violent conflict", "graphic violence", "violent imagery", "vicious attack", "bloody conflict",
-        "graphic torture", "violent struggle", "violent aggression", "barbaric acts","graphic killing", "sadistic violence", "graphic depiction", "violent encounter",
-        "gruesome detail", "violent retribution", "violent reprisal", "bloody violence","gory scene", "graphic description", "graphic battle", "violent scene", 
-        "violence portrayal", "gory detail", "brutal scene", "violent act", "violent behavior","violent clash", "violent uprising", "violent confrontation", "graphic attack""combat", "warfare", "sadism", "torture", "mutilation", "decapitation","beheading", "suffering", "pain", "traumatic", "scarring", "nightmare", "terrorize", "harm","damage", "intimidation", "coercion"],
-    "Substance Abuse/Addiction": ["drugs", "drug use", "substance abuse", "narcotics", 
-        "overdose", "addiction", "substance abuse", "addiction", "drug abuse", "alcoholism", "drug addiction","alcohol abuse", "overdose", "dependency", "substance use disorder", "drug dependency",
-        "narcotics", "intoxication", "withdrawal", "rehabilitation", "sober", "sobriety","substance misuse", "drunk", "high", "addict", "relapse", "detoxification",
-        "intervention", "drug rehabilitation", "alcohol dependency", "chemical dependency","opioid crisis", "methamphetamine", "cocaine", "heroin", "prescription drug abuse",
-        "illegal drugs", "controlled substances", "substance use", "drug treatment","alcohol treatment", "addiction recovery", "substance dependence", "drug overdose",
-        "alcohol overdose", "drug intoxication", "alcohol intoxication", "drug addict","alcohol addict", "drug withdrawal", "alcohol withdrawal", "substance abuse treatment","addiction treatment", "drug rehabilitation center", "alcohol rehabilitation center",
-        "substance abuse recovery", "addiction therapy", "substance abuse counseling","drug abuse prevention", "alcohol abuse prevention", "substance addiction","chemical abuse", "addictive behavior", "drug craving", "alcohol craving",
-        "substance craving", "drug relapse", "alcohol relapse", "addiction relapse","dependence","heroin", "cocaine", "methamphetamine", "crystal meth", "amphetamine", "speed", "ecstasy", "MDMA","marijuana", "weed", "pot", "cannabis", "THC", "CBD", "psychedelics", "LSD", "acid", "magic mushrooms", "psilocybin","opioids", "opiates", "painkillers", "morphine", "codeine", 
-        "benzodiazepines", "valium", "xanax","alcohol", "alcoholism", "drinking", "intoxication", "tobacco", "smoking", "cigarettes", "nicotine", "inhalants", "huffing", "prescription drugs", "pharmaceutical abuse", "caffeine", "energy drinks", "coffee addiction", "anabolic steroids","barbiturates", "sedatives","hallucinogens", "PCP", "ketamine", "binge drinking", "drunk", "hangover","rehab", "rehabilitation", "detox", "withdrawal"],
-    "Child Abuse/Domestic Violence": ["child abuse", "domestic violence", "molestation", "beating", "hurt", "neglect","exploit", "trauma", "emotional abuse", "verbal abuse", "physical abuse", "bullying","endanger", "child labor", "trafficking", "kidnap", "abandon", "fear", "threat","intimidate", "victim", "vulnerable", "protective services", "shelter", "coercion",
-        "manipulate", "child abuse", "neglect", "maltreatment", "domestic violence", "physical abuse","emotional abuse", "psychological abuse", "sexual abuse", "exploitation", "bullying",
-        "harassment", "intimidation", "trauma", "traumatic", "beating", "hitting", "slapping","shaking", "burning", "scalding", "biting", "bruising", "wounding", "injury", "injuries","torture", "assault", "molestation", "incest", "rape", "grooming", "threats", "threatening","screaming", "yelling", "verbal abuse", "coercion", "manipulation", "isolation", "neglecting","abandonment", "starvation", "malnutrition", "withholding care", "medical neglect", "emotional neglect","unsanitary conditions", "unsafe living conditions", "poverty", "homelessness", "drug exposure",
-        "alcohol exposure", "custody issues", "legal battles", "restraining order", "protection order","foster care", "adoption issues", "guardianship", "parental rights", "custodial interference",
-        "parental kidnapping", "runaway", "missing children", "child exploitation", "child labor","child trafficking", "sex trafficking", "child soldiers", "child marriage", "forced marriage",
-        "honor violence", "female genital mutilation", "dowry violence", "acid attacks", "bride burning","spousal abuse", "partner violence", "intimate partner violence", "marital rape", "economic abuse",
-        "financial abuse", "control", "power dynamics", "victimization", "victim blaming", "gaslighting","mental health impact", "post-traumatic stress disorder", "anxiety", "depression", "suicidal ideation",
-        "self-harm", "substance abuse", "alcoholism", "drug addiction", "escape", "survivor", "resilience","coping mechanisms", "therapy", "counseling", "support groups", "legal action", "law enforcement",
-        "social services", "child protective services", "domestic violence shelters", "safe houses","restraining orders", "legal aid", "court cases", "testimony", "witness", "perpetrator", "abuser","predator", "stalking", "cyberstalking", "online harassment", "blackmail", "extortion", "revenge porn",
-        "divorce", "separation", "child custody", "visitation rights", "parental alienation", "paternal rights","maternal rights", "family dynamics", "dysfunctional family", "broken home", "family secrets",
-        "silence", "denial", "shame", "guilt", "blame", "accusations", "false accusations", "judgment","societal attitudes", "cultural norms", "tradition", "honor", "disgrace", "scandal", "public opinion","media portrayal", "advocacy", "activism", "awareness campaigns", "policy changes", "legislation","protective laws", "child welfare", "human rights", "victim rights", "survivor stories",
-        "autobiographical accounts", "biographies", "case studies", "documentaries", "non-fiction","fictional representations", "literary analysis", "sociological studies", "psychological studies",
-        "research findings", "statistical data", "data analysis", "academic discourse", "scholarly articles","expert opinions", "testimonials", "personal narratives", "first-hand accounts", "survivor testimonies","healing journey", "recovery process", "rebuilding lives", "empowerment", "strength", "courage",
-        "overcoming adversity", "resilience", "hope", "inspiration", "transformation", "growth", "change","new beginnings", "moving forward", "forgiveness", "reconciliation", "peace", "harmony", "healing","closure", "resolution", "justice", "accountability", "consequences", "retribution", "penalties","punishment", "incarceration", "prison", "jail", "legal system", "criminal justice", "law enforcement",
-        "police", "detectives", "investigation", "evidence", "proof", "trial", "courtroom", "judge","jury", "verdict", "sentencing", "appeals", "legal battles", "rights", "civil liberties",
-        "constitutional rights", "legal representation", "attorneys", "lawyers", "prosecutors","defense attorneys", "legal aid", "pro bono", "advocates", "victim advocates", "counselors",
-        "therapists", "psychologists", "psychiatrists", "social workers", "case managers", "support staff","volunteers", "non-profit organizations", "government agencies", "community resources", "hotlines",
-        "emergency services", "crisis intervention", "prevention programs", "education", "outreach","public awareness", "campaigns", "fundraising", "donations", "grants", "sponsorships", "partnerships",
-        "coalitions", "networks", "conferences", "seminars", "workshops", "training", "certification","professional development", "best practices", "guidelines", "protocols", "standards", "ethics",
-        "morals", "values", "beliefs", "attitudes", "perspectives", "opinions", "views", "ideologies","philosophies", "doctrines", "theories", "hypotheses", "assumptions", "prejudices", "biases",
-        "stereotypes", "myths", "misconceptions", "misunderstandings", "ignorance", "lack of knowledge","unawareness", "insensitivity", "indifference", "apathy", "lack of empathy", "lack of compassion",
-        "lack of understanding", "lack of awareness", "lack of concern", "lack of interest", "lack of involvement","lack of engagement", "lack of commitment", "lack of support", "lack of resources", "lack of funding",
-        "lack of access", "barriers", "obstacles", "challenges", "difficulties", "hardships", "struggles","suffering", "pain", "anguish", "agony", "grief", "loss", "mourning", "bereavement", "trauma",
-        "traumatic experiences", "shock", "horror", "terror", "fear", "anxiety", "stress", "tension","pressure", "nervousness", "worry", "concern", "apprehension", "dread", "panic", "alarm",
-        "desperation", "hopelessness", "helplessness", "vulnerability", "exposure", "risk", "danger","threat", "hazard", "peril", "jeopardy", "insecurity", "uncertainty", "instability", "unpredictability",
-        "chaos", "disorder", "disruption", "upheaval", "turmoil", "conflict", "confrontation", "clash","struggle", "fight", "battle", "war", "hostilities", "violence", "aggression", "hostility","antagonism", "animosity", "hatred", "enmity", "rivalry", "competition", "contention", "dispute",
-        "argument", "debate", "discussion", "dialogue", "negotiation", "mediation", "arbitration","conciliation", "compromise", "settlement", "agreement", "consensus", "understanding", "reconciliation",
-        "resolution", "solution", "outcome", "result", "conclusion", "closure", "finality", "end","termination", "cessation", "conclusion", "completion", "fulfillment", "achievement", "accomplishment",
-        "success", "victory", "triumph", "conquest", "dominance", "control", "power", "influence","authority", "leadership", "command", "mastery", "expertise", "skill", "ability", "capability",
-        "competence", "proficiency", "knowledge", "understanding", "insight", "wisdom", "intelligence","intellect", "reason", "logic", "rationality", "objectivity", "clarity", "precision", "accuracy","reliability", "trustworthiness", "credibility", "authenticity","dominate", "control", "isolation", "aggressor", "batterer", "offender","assault", "bruise", "injury", "scar", "harm", "abuser", "perpetrator", "childhood trauma","custody", "violation", "power", "intimidation", "dependency", "escape", "survivor","restraint", "punishment", "silent", "witness", "rescue", "report", "intervention","counseling", "therapy", "recovery", "rescue", "guardian", "broken home", "toxic",
-        "unsafe","threaten", "menace", "torment", "dysfunctional", "parent", "guardian"],
-    "Homicide/Gun Violence": ["murder", "homicide", "gunshot", "shooting", "kill", "death", "assassination", "slaughter","massacre", "victim", "shooter", "gunman", "firearm", "bullet", "weapon", "fatal", "deadly","ambush", "sniper", "gang violence", "drive-by", "murderer", "assailant", "harm", "threat",
-        "armed", "pistol", "rifle", "semi-automatic", "assault rifle", "machine gun", "ammo", "ammunition","casualty", "crime scene", "forensic", "detective", "investigation", "vengeance", "revenge",
-        "bloodshed", "trigger", "motive", "premeditated", "malice", "aforethought", "victim", "fatal","injury", "intentional", "cold-blooded", "violent", "manslaughter", "execution",     "stray bullet", "fatal shooting", "armed robbery", "terrorist attack", "extremist violence","political assassination", "lynching", "school shooting", "public shooting", "workplace violence",
-        "domestic terrorism", "hate crime", "suicidal shooter", "armed conflict", "civil unrest", "riot","mob violence", "paramilitary action", "guerrilla warfare", "tactical operation", "counterterrorism",
-        "military assault", "shootout", "execution style", "hitman", "contract killing", "armed assault",
-        "war crime", "ethnic cleansing", "genocide", "rebel attack", "insurgency", "militia", "radicalization","extremism", "survivor", "witness", "trauma", "PTSD", "self-defense", "murder plot", "conspiracy",
-        "illegal arms", "gun trafficking", "arms dealer", "warlord", "death toll", "fatalities", "body count",
-        "bloodbath", "mass murderer", "serial killer", "spree killer", "psychopath", "sociopath", "criminal","felony", "misdemeanor", "law enforcement", "SWAT", "police shooting", "officer-involved shooting",
-        "justice", "inquest", "criminal trial", "jury", "verdict", "conviction", "acquittal", "plea bargain","self-incrimination", "testimony", "eyewitness", "forensic evidence", "ballistic", "autopsy", "coroner",
-        "crime lab", "DNA evidence", "fingerprint", "crime analyst", "profiling", "criminal psychology","hostage situation", "negotiation", "siege", "barricade", "emergency response", "first responder",
-        "crisis management", "public safety", "security breach", "lockdown", "emergency drill", "threat assessment","risk management", "surveillance", "counterintelligence", "intelligence gathering", "undercover operation",
-        "stakeout", "raid", "interrogation", "suspect", "informant", "witness protection", "safe house","criminal network", "organized crime", "drug cartel", "mafia", "syndicate", "gang war", "turf war",
-        "retaliation", "payback", "blood feud", "code of silence", "omerta", "vigilante", "justice seeker","retribution", "counterstrike", "rebellious", "uprising", "revolt", "anarchy", "chaos", "mayhem",
-        "destructive", "catastrophe", "disaster", "atrocity", "brutality", "savagery", "inhumanity","cruelty", "barbarism", "tyranny", "oppression", "persecution", "victimization", "abuse", "exploitation",
-        "torture", "mutilation", "disfigurement", "beheading", "execution", "slaughter", "genocide","mass murder", "annihilation", "extermination","crime rate","gang-related", "vendetta", "feud", "hostility", "aggression", "vengeance", "retaliation","bloodthirsty", "gun control", "legislation", "concealed carry", "standoff", "altercation"]
-}
-
-def analyze_description(description, threshold=80):
-    """
-    Analyzes a book description to identify potential content warnings based on predefined keywords.
-
-    This function checks each keyword in the KEYWORD_WARNINGS dictionary against the given book 
-    description. If a keyword matches or has a partial fuzzy match above the specified threshold,
-    the corresponding warning is included in the result.
+from collections import deque  # For the books waiting to be prefetched
+from book_api import (  # Headless API clients
+    API_ERROR_MESSAGE,
+    BookAPIError,
+    get_book_description_and_img_URL,
+    get_book_info,
+    store_book_warnings,
+)
+from content_analysis import KEYWORD_FINGERPRINT, analyze_description_budgeted  # For content warning analysis
+from cover_images import cached_cover_thumbnail, load_cover_thumbnail  # For cover thumbnails off the Tk thread
+from gui_tasks import TkTaskRunner  # For running network and analysis work off the Tk thread
+import instrumentation  # For timing each stage of a lookup
+
+SPINNER_FRAMES = "|/-\\"  # Frames of the text spinner shown while work is in flight
+SPINNER_INTERVAL_MS = 120
+busy_message = None  # The progress message shown with the spinner, None when idle
+
+ANALYSIS_TIME_BUDGET = 0.05  # Seconds the analysis of a selected book may take before showing partial warnings
+
+PREFETCH_CONCURRENCY = 3  # Candidates fetched at the same time while the selection window is open
+prefetched = {}  # Book identifier -> (details, cover image) of the finished prefetches
+prefetch_queue = deque()  # Candidates waiting for a prefetch slot
+prefetch_in_flight = set()  # Identifiers of the candidates being prefetched
+prefetch_waiting = None  # Identifier of the selected book whose prefetch is still running
 
-    Args:
-        description (str): The book description to be analyzed.
-        threshold (int, optional): The threshold for fuzzy matching (default is 80).
-
-    Returns:
-        list: A list of warning types that match keywords found in the description.
 
-    Raises:
-        ValueError: If the description is not provided or is not a string.
+def show_book_selection_window(books):
     """
+    Displays a window allowing the user to select a book from a list.
 
-    # Validate input description
-    if not isinstance(description, str):
-        raise ValueError("Description must be a string.")
+    This function creates a new window with buttons for each book in the provided list. Each button,
+    when clicked, will trigger the on_book_selection function with the corresponding book's data.
 
-    warnings = []  # Initialize a list to store matching warnings
+    Args:
+        books (list): A list of dictionaries, each containing information about a book.
 
-    # Iterate over each warning type and its associated keywords
-    for warning_name, warning_keywords in KEYWORD_WARNINGS.items():
-        # Check each keyword in the current warning type
-        for keyword in warning_keywords:
-            # Check if keyword is in description or matches fuzzily above threshold
-            if keyword in description.lower() or fuzz.partial_ratio(keyword, description.lower()) > threshold:
-                warnings.append(warning_name)  # Add warning type to list
-                break  # Stop checking more keywords in the same warning type
+    Note:
+        Text in buttons will wrap if too long. The function assumes the existence of a Tkinter root window.
+    """
 
-    return warnings  # Return the list of found warnings
+    selection_window = tk.Toplevel(root)  # Create a new top-level window on the existing Tkinter root
+    selection_window.title("Select a Book")
+    selection_window.geometry("500x300")  # Set the window size
+    selection_window.protocol("WM_DELETE_WINDOW", lambda: close_selection_window(selection_window))
 
-def get_google_books_description_and_img_URL(ISBN):
-    """
-    Retrieves the description and thumbnail image URL of a book from the Google Books API using its ISBN.
+    # Create and place a title label in the window
+    title_label = tk.Label(selection_window, text="Please select a book:", font=("Arial", 14))
+    title_label.pack(pady=(10, 5))
 
-    This function makes a request to the Google Books API and extracts the book description and 
-    thumbnail image URL if available. If the API request fails or the data is not found, it returns empty strings.
+    # Frame to contain book selection buttons
+    buttons_frame = tk.Frame(selection_window)
+    buttons_frame.pack(padx=10, pady=5, fill="both", expand=True)
 
-    Args:
-        ISBN (str): The International Standard Book Number (ISBN) of the book.
+    # Create a button for each book in the list
+    for book in books:
+        book_text = f"{book['title']} By {book['author']}"
+        book_button = tk.Button(
+            buttons_frame, 
+            text=book_text, 
+            command=lambda b=book: on_book_selection(b, selection_window),
+            wraplength=450,  # Wrap text if it's too long
+            justify="left",
+            anchor="w"
+        )
+        book_button.pack(pady=2, padx=10, fill='x')  # Pack each button into the frame
 
-    Returns:
-        tuple: A tuple containing the book description and image URL. Returns empty strings if data is not found or on error.
 
-    Raises:
-        tk.messagebox.showerror: If the API request fails, an error message box is displayed.
+def on_book_selection(book, window):
     """
+    Handles the event when a book is selected from the selection window.
 
-    google_api_url = f"{GOOGLE_BOOKS_API_BASE_URL}?q=isbn:{ISBN}"  # Construct the API URL
-
-    try:
-        response = requests.get(google_api_url)  # Send a request to the Google Books API
-        response.raise_for_status()  # Raises HTTPError for bad HTTP response
-    except requests.RequestException as e:
-        messagebox.showerror("Error", f"API Request failed: {e}")  # Display error message on request failure
-        return "", ""
+    Closes the selection window, cancels the prefetches of the other candidates and displays
+    detailed information about the selected book.
 
-    data = response.json()  # Parse the JSON response
-    if "items" not in data:
-        print("Unexpected data structure received from Google Books API.")  # Log unexpected data structure
-        return "", ""
+    Args:
+        book (dict): A dictionary containing information about the selected book.
+        window (tk.Toplevel): The selection window to be closed upon selection.
+    """
 
-    try:
-        description = data["items"][0]["volumeInfo"]["description"]  # Extract the book description
-        image_url = data["items"][0]["volumeInfo"]["imageLinks"]["thumbnail"]  # Extract the image URL
-        return description, image_url
-    except:
-        return "", ""  # Return empty strings if extraction fails
+    cancel_prefetch(keep=book_identifier(book))  # The other candidates are no longer needed
+    window.destroy()  # Close the selection window
+    display_selected_book(book)  # Call function to display the selected book's details
 
 
-def get_open_books_description(key):
+def close_selection_window(window):
     """
-    Retrieves the book description from the Open Library website using a given key.
-
-    This function constructs a URL for the Open Library page of the book using the provided key,
-    then sends an HTTP request to get the page content. It parses the HTML to find the book's description. 
-    The description is extracted as text from paragraph elements and returned as a single string.
+    Closes the selection window without a selection and cancels every prefetch.
 
     Args:
-        key (str): The unique key for the book on the Open Library website.
-
-    Returns:
-        str: The book description as a single string. Returns an empty string if the description
-        is not found or if there's an error during the request or parsing process.
+        window (tk.Toplevel): The selection window.
     """
 
-    book_url = f"https://openlibrary.org{key}"  # Construct the URL for the book on Open Library
+    cancel_prefetch()
+    window.destroy()
 
-    try:
-        response = requests.get(book_url)  # Send a request to the Open Library website
-        response.raise_for_status()  # Raises HTTPError for bad HTTP response
 
-        soup = BeautifulSoup(response.content, 'html.parser')  # Parse the HTML content
+def book_identifier(book):
+    """
+    Identifies a candidate book across the search results and the prefetches.
 
-        work_description = soup.find('div', {'class': 'work-description-content restricted-view'})
-        # Check if work description is present
-        if not work_description:
-            return ""  # Return an empty string if the description is not found
+    Args:
+        book (dict): A dictionary containing information about a book.
 
-        paragraphs = work_description.find_all('p')  # Extract all paragraph elements
+    Returns:
+        tuple: The title, author, ISBN and Open Library key of the book.
+    """
 
-        description = []
-        for p in paragraphs:
-            description.append(p.text.strip())  # Strip and append each paragraph's text
-        description_str = ' '.join(description)  # Join all paragraph texts into a single string
-        return description_str
-    except:
-        return ""  # Return an empty string in case of any exception during the process
+    return (book['title'], book['author'], book.get('ISBN', ''), book.get('key', ''))
 
 
-def search_open_books(title, author=""):
+def start_prefetch(books):
     """
-    Searches for books in the Open Books API using the provided title and author.
-
-    This function constructs a query with the specified title and author (if provided),
-    then sends an HTTP request to the Open Books API. The results are parsed and formatted
-    into a list of dictionaries, each containing details about a book.
+    Starts fetching and analyzing every candidate in the background, PREFETCH_CONCURRENCY at a time,
+    so that selecting one of them shows its result at once. Prefetches of an earlier search are cancelled.
 
     Args:
-        title (str): The title of the book to search for.
-        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
-
-    Returns:
-        list: A list of dictionaries, where each dictionary contains information about a book
-        (title, author, release date, and key). Returns an empty list if no data is found or on error.
-
-    Raises:
-        tk.messagebox.showerror: Displays an error message box if the API request fails.
+        books (list): The candidates shown in the selection window.
     """
 
-    query = {"title": title, "fields": "key, title, author_name, first_publish_year"}  # Define query parameters
-    if author:
-        query["author"] = author  # Add author to the query if provided
-    query["limit"] = 10  # Set the result limit to 10
+    cancel_prefetch()  # Also releases a selection still waiting for an earlier prefetch
+    prefetched.clear()
+    prefetch_queue.extend(books)
+    for _ in range(PREFETCH_CONCURRENCY):
+        prefetch_next()
 
-    try:
-        response = requests.get(OPEN_BOOKS_API_URL, params=query)  # Send the request to Open Books API
-        response.raise_for_status()  # Check for HTTP errors
 
-        data = response.json()  # Parse the JSON response
-        if "docs" not in data:
-            print("Unexpected data structure received from Open Books API.")  # Log unexpected data structure
-            return []
+def prefetch_next():
+    """
+    Starts the prefetch of the next waiting candidate, if any.
+    """
 
-        # Process and return the search results
-        return [
-            {
-                "title": doc.get("title", ""),
-                "author": ', '.join(doc.get("author_name", [])),
-                "release_date": doc.get("first_publish_year", ""),
-                "key": doc.get("key", ""),
-            }
-            for doc in data["docs"]
-        ]
-    except requests.RequestException as e:
-        messagebox.showerror("Error", f"API Request failed: {e}")  # Display error message on request failure
-        return []  # Return an empty list on error
+    if not prefetch_queue:
+        return
+    book = prefetch_queue.popleft()
+    identifier = book_identifier(book)
+    prefetch_in_flight.add(identifier)
+    task_runner.submit(("prefetch", identifier), prefetch_book, book,
+                       on_done=lambda result: finish_prefetch(book, result),
+                       on_error=lambda error: finish_prefetch(book, None))
 
 
-def search_google_books(title, author=""):
+def prefetch_book(book):
     """
-    Searches for books in the Google Books API using the provided title and optionally the author.
-
-    This function constructs a URL for querying the Google Books API with the specified title and author,
-    sends an HTTP request, and parses the response. The results are formatted into a list of dictionaries,
-    each containing details about a book.
+    Fetches and analyzes a candidate and decodes its cover. Runs on a background thread.
 
     Args:
-        title (str): The title of the book to search for.
-        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
+        book (dict): A dictionary containing information about the candidate.
 
     Returns:
-        list: A list of dictionaries, where each dictionary contains information about a book
-        (title, author, release date, link, and ISBN). Returns an empty list if no data is found or on error.
-
-    Raises:
-        tk.messagebox.showerror: Displays an error message box if the API request fails.
+        tuple: The result of load_book_details and the cover thumbnail (None if there is no cover
+        or it failed to load; it is then loaded again when the book is displayed).
     """
 
-    book_title_encoded = urllib.parse.quote(title)  # URL-encode the book title
-    author_name_encoded = urllib.parse.quote(author)  # URL-encode the author name
-    google_api_url = f"{GOOGLE_BOOKS_API_BASE_URL}?q=intitle:{book_title_encoded}"  # Construct the API URL
-
-    if author:
-        google_api_url += f"+inauthor:{author_name_encoded}"  # Add author to the query if provided
+    details = load_book_details(book, time_budget=None)  # Nobody is waiting: analyze it completely
+    image = None
+    if details["img_url"]:
+        try:
+            image = load_cover_image(details["img_url"])
+        except Exception:
+            pass
+    return details, image
 
-    google_api_url += "&printType=books&maxResults=10"  # Append parameters for print type and max results
 
-    try:
-        response = requests.get(google_api_url)  # Send the request to Google Books API
-        response.raise_for_status()  # Check for HTTP errors
-
-        data = response.json()  # Parse the JSON response
-        if "items" not in data:
-            print("Unexpected data structure received from Google Books API.")  # Log unexpected data structure
-            return []
-
-        # Process and return the search results
-        return [
-            {
-                "title": item.get("volumeInfo", {}).get("title", ""),
-                "author": ', '.join(item.get("volumeInfo", {}).get("authors", [])),
-                "release_date": item.get("volumeInfo", {}).get("publishedDate", ""),
-                "link": item.get("volumeInfo", {}).get("infoLink", ""),
-                "ISBN": item.get("volumeInfo", {}).get("industryIdentifiers", [{}])[0].get("identifier", ""), # CH
-            }
-            for item in data["items"]
-        ]
-    except requests.RequestException as e:
-        messagebox.showerror("Error", f"API Request failed: {e}")  # Display error message on request failure
-        return []  # Return an empty list on error
-
-
-def get_book_info(title, author=""):
-    """
-    Fetches book data (excluding descriptions) from Google Books and Open Books APIs,
-    returning a combined list of the top 3 unique books from each source.
-
-    The function searches both APIs for books matching the title and author, removes duplicates,
-    and limits the results to the top 3 unique entries from each API based on title and author.
+def finish_prefetch(book, result):
+    """
+    Stores a finished prefetch, starts the next one, and shows the book if the user already selected it.
+    Runs on the Tk thread.
 
     Args:
-        title (str): The title of the book to search for.
-        author (str, optional): The author of the book to refine the search. Defaults to an empty string.
-
-    Returns:
-        list: A combined list of dictionaries, each containing information about a book from
-        either Google Books or Open Books APIs. Limited to the top 3 unique books from each source.
+        book (dict): The prefetched candidate.
+        result (tuple): The result of prefetch_book, or None if the prefetch failed.
     """
 
-    google_books = search_google_books(title, author)  # Fetch book data from Google Books API
-    open_books = search_open_books(title, author)  # Fetch book data from Open Books API
+    global prefetch_waiting
+    identifier = book_identifier(book)
+    prefetch_in_flight.discard(identifier)
+    if result is not None:
+        prefetched[identifier] = result
+    prefetch_next()
 
-    def remove_dups(books):
-        """
-        Helper function to remove duplicate books based on title and author.
-        Limits the result to the top 3 unique books.
+    if identifier == prefetch_waiting:
+        prefetch_waiting = None
+        if result is not None:
+            show_book_details(book, *result)
+        else:
+            display_selected_book(book)  # Fetch it again in the foreground
+    update_busy_indicator()
 
-        Args:
-            books (list): A list of book dictionaries.
 
-        Returns:
-            list: A list of unique book dictionaries.
-        """
-        seen = set()  # Set to keep track of seen (title, author) tuples
-        unique_books = []  # List to store unique books
-        for book in books:
-            identifier = (book['title'], book['author'])  # Create a unique identifier for each book
-            if identifier not in seen and len(unique_books) < 3:
-                seen.add(identifier)  # Add identifier to seen set
-                unique_books.append(book)  # Add book to unique list
+def cancel_prefetch(keep=None):
+    """
+    Cancels the waiting and running prefetches; their results are discarded when they arrive.
+    A selected book waiting for a cancelled prefetch is no longer awaited.
 
-        return unique_books
+    Args:
+        keep (tuple, optional): Identifier of a book whose running prefetch is kept.
+    """
 
-    # Apply duplicate removal to both API results and combine them
-    google_books_nodup = remove_dups(google_books)
-    open_books_nodup = remove_dups(open_books)
-    return google_books_nodup + open_books_nodup
+    global prefetch_waiting
+    prefetch_queue.clear()
+    for identifier in list(prefetch_in_flight):
+        if identifier != keep:
+            task_runner.cancel(("prefetch", identifier))
+            prefetch_in_flight.discard(identifier)
+    if prefetch_waiting is not None and prefetch_waiting != keep:
+        prefetch_waiting = None  # Its prefetch was cancelled: nothing is awaited any more
+        update_busy_indicator()
 
 
-def show_book_selection_window(books):
+@instrumentation.traced("display_selected_book")
+def display_selected_book(book):
     """
-    Displays a window allowing the user to select a book from a list.
+    Displays the selected book's detailed information, including title, author, content warnings,
+    and a clickable link for purchase. Also, calls a function to display the book's image if available.
 
-    This function creates a new window with buttons for each book in the provided list. Each button,
-    when clicked, will trigger the on_book_selection function with the corresponding book's data.
+    The title and author are shown at once. If the book was prefetched, the rest is shown at once
+    too; otherwise the description is fetched and analyzed on a background thread (see
+    load_book_details) and the rest is filled in by show_book_details when it is ready.
 
     Args:
-        books (list): A list of dictionaries, each containing information about a book.
-
-    Note:
-        Text in buttons will wrap if too long. The function assumes the existence of a Tkinter root window.
+        book (dict): A dictionary containing information about the selected book.
     """
 
-    selection_window = tk.Toplevel(root)  # Create a new top-level window on the existing Tkinter root
-    selection_window.title("Select a Book")
-    selection_window.geometry("500x300")  # Set the window size
+    global prefetch_waiting
+    clear_result()  # Clear existing content and any existing image (also drops a pending lookup)
 
-    # Create and place a title label in the window
-    title_label = tk.Label(selection_window, text="Please select a book:", font=("Arial", 14))
-    title_label.pack(pady=(10, 5))
+    # Display book title and author
+    result_text.config(state=tk.NORMAL)
+    result_text.delete("1.0", "end")
+    result_text.insert("1.0", f"Title: {book['title']}\nAuthor: {book['author']}\n")
+    result_text.config(state=tk.DISABLED)
 
-    # Frame to contain book selection buttons
-    buttons_frame = tk.Frame(selection_window)
-    buttons_frame.pack(padx=10, pady=5, fill="both", expand=True)
+    identifier = book_identifier(book)
+    if identifier in prefetched:
+        show_book_details(book, *prefetched[identifier])  # Already fetched while the user was choosing
+        return
 
-    # Create a button for each book in the list
-    for book in books:
-        book_text = f"{book['title']} By {book['author']}"
-        book_button = tk.Button(
-            buttons_frame, 
-            text=book_text, 
-            command=lambda b=book: on_book_selection(b, selection_window),
-            wraplength=450,  # Wrap text if it's too long
-            justify="left",
-            anchor="w"
-        )
-        book_button.pack(pady=2, padx=10, fill='x')  # Pack each button into the frame
+    set_busy("Loading book details")
+    if identifier in prefetch_in_flight:
+        prefetch_waiting = identifier  # finish_prefetch shows it when the prefetch ends
+        return
+    task_runner.submit("details", load_book_details, book,
+                       on_done=lambda details: show_book_details(book, details),
+                       on_error=show_task_error)
 
 
-def on_book_selection(book, window):
+@instrumentation.traced("display_selected_book.load_details")
+def load_book_details(book, time_budget=ANALYSIS_TIME_BUDGET):
     """
-    Handles the event when a book is selected from the selection window.
-
-    Closes the selection window and displays detailed information about the selected book.
+    Fetches the book's description and image URL and analyzes the description within a time
+    budget. Runs on a background thread, so it must not touch any widget.
 
     Args:
         book (dict): A dictionary containing information about the selected book.
-        window (tk.Toplevel): The selection window to be closed upon selection.
+        time_budget (float, optional): Seconds the analysis may take, or None for a complete
+            analysis. Defaults to ANALYSIS_TIME_BUDGET.
+
+    Returns:
+        dict: "warnings" (list), "partial" (True if the analysis ran out of time), "img_url" (str)
+        and "error" (BookAPIError or None).
     """
 
-    window.destroy()  # Close the selection window
-    display_selected_book(book)  # Call function to display the selected book's details
+    description, img_url, error = "", "", None
+    try:
+        # Google results carry both from the search; open books have no image URL
+        description, img_url = get_book_description_and_img_URL(book)
+    except BookAPIError as e:
+        error = e  # Reported on the Tk thread; the warnings are still shown (as 'None')
 
+    warnings, partial = [], False
+    if description:
+        result = analyze_description_budgeted(description, time_budget=time_budget)
+        warnings, partial = result.warnings, not result.complete
+    if error is None and not partial:
+        store_book_warnings(book, warnings, KEYWORD_FINGERPRINT)  # Remembered in the local book store
+    return {"warnings": warnings, "partial": partial, "img_url": img_url, "error": error}
 
-def display_selected_book(book):
+
+def show_book_details(book, details, image=None):
     """
-    Displays the selected book's detailed information, including title, author, content warnings,
-    and a clickable link for purchase. Also, calls a function to display the book's image if available.
+    Shows the content warnings and purchase link of a book once load_book_details has finished,
+    then its cover image: the given one if it was prefetched, otherwise it starts loading it.
 
     Args:
         book (dict): A dictionary containing information about the selected book.
+        details (dict): The result of load_book_details.
+        image (PIL.Image.Image, optional): The prefetched cover thumbnail.
     """
 
-    clear_result()  # Clear existing content and any existing image
-
-    # Display book title and author
-    result_text.config(state=tk.NORMAL)
-    result_text.delete("1.0", "end")
-    result_text.insert("1.0", f"Title: {book['title']}\nAuthor: {book['author']}\n")
-
-    # Fetch and display book description and image URL (if available)
-    description, img_url = "", ""
-    if 'ISBN' in book and book['ISBN']:
-        description, img_url = get_google_books_description_and_img_URL(book['ISBN'])
-    elif 'key' in book and book['key']:
-        description = get_open_books_description(book['key'])  # No image URL for open books
+    if details["error"] is not None:
+        messagebox.showerror("Error", str(details["error"]))  # Display error message on request failure
 
     # Display content warnings based on the book's description
-    warnings = analyze_description(description) if description else []
-    warning_text = ', '.join(warnings) if warnings else 'None'
+    result_text.config(state=tk.NORMAL)
+    warning_text = ', '.join(details["warnings"]) if details["warnings"] else 'None'
     result_text.insert(tk.END, f"Content Warnings: {warning_text}\n")
+    if details["partial"]:
+        result_text.insert(tk.END, "(Partial analysis: not every keyword was checked in time)\n")
 
     # Display a clickable purchase link (hyperlink) if available
     if 'link' in book and book['link']:
@@ -498,42 +320,84 @@ def display_selected_book(book):
     result_text.config(state=tk.DISABLED)  # Disable editing of the text widget
 
     # Display book image if the URL is available
-    if img_url:
-        show_book_image(img_url)
+    if image is not None:
+        display_cover_image(image)
+    elif details["img_url"]:
+        show_book_image(details["img_url"])
+    update_busy_indicator()
+
 
 def show_book_image(url):
     """
     Downloads and displays the book's cover image from the provided URL.
 
-    The function sends a request to the given URL to fetch the image data. It then creates
-    a thumbnail of the image and displays it in a label within the result_frame. Handles errors
-    gracefully and prints an error message if the image fails to load.
+    A cover that was shown recently is displayed at once from memory. Otherwise the download (or
+    cached thumbnail) and decoding happen on a background thread (see load_cover_image); only the
+    conversion to a PhotoImage and the label are done on the Tk thread, in display_cover_image.
+    Errors are handled gracefully: an error message is printed if the image fails to load.
 
     Args:
         url (str): The URL of the image to be displayed.
     """
 
-    try:
-        response = requests.get(url)  # Send request to download the image
-        response.raise_for_status()  # Check for HTTP errors
+    image = cached_cover_thumbnail(url)
+    if image is not None:
+        display_cover_image(image)
+        return
+    set_busy("Loading cover")
+    task_runner.submit("image", load_cover_image, url, on_done=display_cover_image, on_error=report_image_error)
 
-        image_data = response.content  # Get image data from response
-        image = Image.open(io.BytesIO(image_data))  # Open image from byte data
-        image.thumbnail((100, 150), Image.Resampling.LANCZOS)  # Create a thumbnail of the image
 
-        photo = ImageTk.PhotoImage(image)  # Convert image to PhotoImage for Tkinter
+@instrumentation.traced("show_book_image.load")
+def load_cover_image(url):
+    """
+    Loads the cover thumbnail (see cover_images.load_cover_thumbnail). Runs on a background thread.
 
-        # Clear any existing image labels in the result frame
-        for widget in result_frame.winfo_children():
-            if isinstance(widget, tk.Label):
-                widget.destroy()
+    Args:
+        url (str): The URL of the image.
 
-        # Create and pack a new label with the image
-        image_label = tk.Label(result_frame, image=photo)
-        image_label.image = photo  # Keep a reference to prevent garbage collection
-        image_label.pack()  # Display the label in the result frame
-    except Exception as e:
-        print(f"Failed to load image: {e}")  # Print error message if image loading fails
+    Returns:
+        PIL.Image.Image: The decoded thumbnail.
+    """
+
+    return load_cover_thumbnail(url)
+
+
+@instrumentation.traced("show_book_image.display")
+def display_cover_image(image):
+    """
+    Shows a decoded cover thumbnail in the result frame. Runs on the Tk thread.
+
+    Args:
+        image (PIL.Image.Image): The thumbnail built by load_cover_image.
+    """
+
+    from PIL import ImageTk  # For converting images for Tkinter
+
+    photo = ImageTk.PhotoImage(image)  # Convert image to PhotoImage for Tkinter
+
+    # Clear any existing image labels in the result frame
+    for widget in result_frame.winfo_children():
+        if isinstance(widget, tk.Label):
+            widget.destroy()
+
+    # Create and pack a new label with the image
+    image_label = tk.Label(result_frame, image=photo)
+    image_label.image = photo  # Keep a reference to prevent garbage collection
+    image_label.pack()  # Display the label in the result frame
+    update_busy_indicator()
+
+
+def report_image_error(error):
+    """
+    Reports a cover image that failed to load. Runs on the Tk thread.
+
+    Args:
+        error (Exception): The exception raised while loading the image.
+    """
+
+    print(f"Failed to load image: {error}")  # Print error message if image loading fails
+    update_busy_indicator()
 
 
 def search_book_ratings():
@@ -541,14 +405,8 @@ def search_book_ratings():
     Initiates a search for books based on the entered title in the search field.
 
     This function retrieves the title from the book_title_entry widget, checks if it's not empty,
-    and then calls get_book_info to fetch book data. It displays the book selection window if books
-    are found or shows a message if no books are found.
-
-    Globals:
-        books (list): A global list to store book data.
-
-    Note:
-        This function makes use of a global 'books' variable to store the search results.
+    and then starts fetch_books on a background thread. A search still in flight is cancelled, so
+    only the results of the latest search are shown (by show_search_results).
     """
 
     book_title = book_title_entry.get().strip()  # Get and strip the book title from the entry widget
@@ -556,18 +414,146 @@ def search_book_ratings():
         messagebox.showerror("Error", "Please enter a book title to search.")  # Show error if title is empty
         return
 
+    task_runner.cancel("search")  # Results of an older search are discarded when they arrive
+    set_busy(f"Searching for \"{book_title}\"")
+    task_runner.submit("search", fetch_books, book_title, on_done=show_search_results, on_error=show_search_error)
+
+
+def fetch_books(book_title):
+    """
+    Fetches book data for a title from every provider. Runs on a background thread.
+
+    Args:
+        book_title (str): The title to search for.
+
+    Returns:
+        tuple: The list of books found and the list of errors of the providers that failed.
+    """
+
+    errors = []  # Providers that failed while the others still returned results
+    books = get_book_info(book_title, errors=errors)  # Raises BookAPIError if every provider failed
+    return books, errors
+
+
+def show_search_results(result):
+    """
+    Shows the results of fetch_books: the errors of failed providers, then the book selection window
+    if books are found or a message if no books are found.
+
+    Globals:
+        books (list): A global list to store book data.
+
+    Args:
+        result (tuple): The books and errors returned by fetch_books.
+    """
+
     global books  # Reference the global 'books' variable
-    books = get_book_info(book_title)  # Fetch book data using the entered title
+    books, errors = result
+    update_busy_indicator()
+
+    for error in errors:
+        messagebox.showerror("Error", str(error))  # Display error message for each failed provider
 
     if books:
+        start_prefetch(books)  # Fetch every candidate while the user is choosing
         show_book_selection_window(books)  # Show book selection window if books are found
     else:
         messagebox.showinfo("No Results", "No books found with that title.")  # Inform if no books are found
 
 
+def show_search_error(error):
+    """
+    Reports a search that failed on every provider. Runs on the Tk thread.
+
+    Args:
+        error (Exception): The exception raised by fetch_books.
+    """
+
+    update_busy_indicator()
+    messagebox.showerror("Error", f"{API_ERROR_MESSAGE}\n{error}")  # Every provider failed
+
+
+def show_task_error(error):
+    """
+    Reports an unexpected error of a background task. Runs on the Tk thread.
+
+    Args:
+        error (Exception): The exception raised by the task.
+    """
+
+    update_busy_indicator()
+    messagebox.showerror("Unexpected Error", str(error))
+
+
+def set_busy(message):
+    """
+    Shows a progress message with a spinner and enables the Cancel button.
+
+    Args:
+        message (str): What the application is working on.
+    """
+
+    global busy_message
+    was_idle = busy_message is None
+    busy_message = message
+    cancel_button.config(state=tk.NORMAL)
+    if was_idle:
+        spin(0)  # Start the spinner animation
+
+
+def update_busy_indicator():
+    """
+    Hides the progress message and disables the Cancel button once nothing the user is waiting for
+    is running (background prefetches do not count).
+    """
+
+    global busy_message
+    if not task_runner.is_busy("search", "details", "image") and prefetch_waiting is None:
+        busy_message = None
+        status_label.config(text="")
+        cancel_button.config(state=tk.DISABLED)
+
+
+def spin(frame):
+    """
+    Animates the spinner next to the progress message while a background task is running.
+
+    Args:
+        frame (int): Index of the spinner frame to show.
+    """
+
+    if busy_message is None:
+        return
+    status_label.config(text=f"{SPINNER_FRAMES[frame % len(SPINNER_FRAMES)]} {busy_message}...")
+    root.after(SPINNER_INTERVAL_MS, spin, frame + 1)
+
+
+def cancel_tasks():
+    """
+    Cancels the search or lookup in flight, and every prefetch: their results are discarded when they arrive.
+    """
+
+    global prefetch_waiting
+    prefetch_waiting = None
+    prefetch_queue.clear()
+    prefetch_in_flight.clear()
+    task_runner.cancel()
+    update_busy_indicator()
+
+
+def close_application():
+    """
+    Drops the pending background tasks and closes the main window.
+    """
+
+    task_runner.shutdown()
+    root.destroy()
+
+
 def clear_result():
     """
-    Clears the displayed results in the text widget and the book title entry field.
+    Clears the displayed results in the text widget and the book title entry field, and cancels
+    the lookup of the book being displayed.
 
     This function is used to reset the content of the result text widget and the book title
     entry field, essentially clearing previous search results and inputs. It makes the text
@@ -579,6 +565,11 @@ def clear_result():
     result_text.delete("1.0", "end")  # Clear all content from the result text widget
     result_text.config(state=tk.DISABLED)  # Disable editing of the result text widget
 
+    global prefetch_waiting
+    prefetch_waiting = None  # The book being cleared is no longer awaited
+    task_runner.cancel("details", "image")  # Drop the lookup of the book being cleared
+    update_busy_indicator()
+
     book_title_entry.delete(0, tk.END)  # Clear the content of the book title entry field
 
 
@@ -613,48 +604,57 @@ if __name__ == "__main__":
     app = MyGUI()
     app.mainloop()
 '''
-# Create the tkinter main window
-root = tk.Tk()
-root.title("Book Content Warnings")
-root.geometry("600x400")  # Set the initial window size
-
-# Create a label to provide instructions for the user
-instructions_label = tk.Label(root, text="Enter a book title to search.")
-instructions_label.pack()
-
-# Create a label and entry widget for inputting the book title
-book_title_label = tk.Label(root, text="Book Title:")
-book_title_label.pack()
-book_title_entry = tk.Entry(root, width=50)  # Wide entry field for book title input
-book_title_entry.pack()
-
-# Create a button to initiate the search for book content warning ratings
-search_button = tk.Button(root, text="Search Content Warning Rating", command=search_book_ratings)
-search_button.pack()
-
-# Create a frame to group the result display components
-result_frame = tk.Frame(root)
-result_frame.pack(pady=10, fill='both', expand=True)  # Padded and set to fill available space
-
-# Create a label to indicate the book information display area
-result_label = tk.Label(result_frame, text="Book Information:")
-result_label.pack()
-
-# Create a text widget for displaying the book information along with content warning rating
-result_text = tk.Text(result_frame, width=50, height=10, wrap=tk.WORD, state=tk.DISABLED)
-result_text.pack()  # Text widget is initially disabled for editing
-
-# Create a button to clear the displayed result
-clear_button = tk.Button(root, text="Clear Result", command=clear_result)
-clear_button.pack()
-
-# Create a frame to display the book image with a fixed minimum height
-image_frame = tk.Frame(root, height=150)
-image_frame.pack_propagate(False)  # Prevents the frame from shrinking smaller than its contents
-image_frame.pack(pady=10, fill='both', expand=True)  # Padded and set to fill available space
-
-# Error handling: wrap the main event loop in a try-except block
-try:
-    root.mainloop()  # Start the Tkinter event loop
-except Exception as e:
-    messagebox.showerror("Unexpected Error", str(e))  # Show an error message in case of exceptions
\ No newline at end of file
+if __name__ == "__main__":
+    # Create the tkinter main window
+    root = tk.Tk()
+    root.title("Book Content Warnings")
+    root.geometry("600x400")  # Set the initial window size
+    task_runner = TkTaskRunner(root)  # Background threads for API calls and analysis
+    root.protocol("WM_DELETE_WINDOW", close_application)
+
+    # Create a label to provide instructions for the user
+    instructions_label = tk.Label(root, text="Enter a book title to search.")
+    instructions_label.pack()
+
+    # Create a label and entry widget for inputting the book title
+    book_title_label = tk.Label(root, text="Book Title:")
+    book_title_label.pack()
+    book_title_entry = tk.Entry(root, width=50)  # Wide entry field for book title input
+    book_title_entry.pack()
+
+    # Create a button to initiate the search for book content warning ratings
+    search_button = tk.Button(root, text="Search Content Warning Rating", command=search_book_ratings)
+    search_button.pack()
+
+    # Create a progress label (with a spinner) and a button to cancel the work in flight
+    status_label = tk.Label(root, text="")
+    status_label.pack()
+    cancel_button = tk.Button(root, text="Cancel", command=cancel_tasks, state=tk.DISABLED)
+    cancel_button.pack()
+
+    # Create a frame to group the result display components
+    result_frame = tk.Frame(root)
+    result_frame.pack(pady=10, fill='both', expand=True)  # Padded and set to fill available space
+
+    # Create a label to indicate the book information display area
+    result_label = tk.Label(result_frame, text="Book Information:")
+    result_label.pack()
+
+    # Create a text widget for displaying the book information along with content warning rating
+    result_text = tk.Text(result_frame, width=50, height=10, wrap=tk.WORD, state=tk.DISABLED)
+    result_text.pack()  # Text widget is initially disabled for editing
+
+    # Create a button to clear the displayed result
+    clear_button = tk.Button(root, text="Clear Result", command=clear_result)
+    clear_button.pack()
+
+    # Create a frame to display the book image with a fixed minimum height
+    image_frame = tk.Frame(root, height=150)
+    image_frame.pack_propagate(False)  # Prevents the frame from shrinking smaller than its contents
+    image_frame.pack(pady=10, fill='both', expand=True)  # Padded and set to fill available space
+
+    # Error handling: wrap the main event loop in a try-except block
+    try:
+        root.mainloop()  # Start the Tkinter event loop
+    except Exception as e:
+        messagebox.showerror("Unexpected Error", str(e))  # Show an error message in case of exceptions
@@ -0,0 +1,215 @@
+"""
+Module: Rate Limiter
+
+This module paces the requests sent to each provider host, so batch work runs at the best rate a
+provider allows instead of being throttled. Each limited host gets a token bucket (a request rate
+with a small burst) and an adaptive concurrency limit:
+
+    - a request takes a token and a concurrency slot, waiting in line for them when none is free;
+    - every successful response raises the rate and the concurrency limit a little (additive increase);
+    - a 429 halves both (multiplicative decrease) and, with Retry-After, pauses the host until then.
+
+http_client.http_get goes through acquire()/release() and re-queues throttled requests, so
+provider calls wait instead of failing. Hosts without configured limits are not limited.
+
+Every limiter counts its queue depth, waits, wait times and throttled responses (see stats()),
+and records its waits as instrumentation spans ("http.rate_limit_wait").
+
+Attributes:
+    HOST_LIMITS (dict): Default limits by host: (requests per second, burst, maximum concurrency).
+    MIN_RATE (float): Lowest rate the decrease goes down to, in requests per second.
+    DECREASE_INTERVAL (float): Seconds during which further 429s do not lower the limits again.
+    DEFAULT_MAX_WAIT (float): Seconds a request waits in line before giving up.
+"""
+
+import threading  # For the waiting line
+import time  # For refilling the buckets
+
+import requests  # For the error raised when the wait is too long
+
+import instrumentation  # For recording waits
+
+HOST_LIMITS = {
+    "www.googleapis.com": (5.0, 10, 8),
+    "openlibrary.org": (3.0, 6, 4),
+    "covers.openlibrary.org": (5.0, 10, 4),
+    "books.google.com": (10.0, 20, 8),
+}
+MIN_RATE = 0.2
+DECREASE_INTERVAL = 1.0  # Requests already in flight when a 429 arrives get throttled too; count them once
+DEFAULT_MAX_WAIT = 60.0
+
+
+class RateLimitTimeout(requests.RequestException):
+    """
+    Raised when a request waited longer than its maximum wait for its turn.
+    """
+
+
+class HostLimiter:
+    """
+    A token bucket with an AIMD concurrency limit for one host.
+
+    Args:
+        host (str): The host name (for reports).
+        rate (float): Highest sustained rate, in requests per second.
+        burst (int): Number of requests that can start at once after an idle period.
+        max_concurrency (int): Highest number of requests in flight at the same time.
+    """
+
+    def __init__(self, host, rate, burst, max_concurrency):
+        self.host = host
+        self.max_rate = float(rate)
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.rate = float(rate)
+        self.concurrency = float(max_concurrency)
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._decreased = 0.0
+        self._in_flight = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._stats = {"requests": 0, "waits": 0, "wait_seconds": 0.0, "max_wait": 0.0, "max_queue": 0,
+                       "throttled": 0}
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def acquire(self, max_wait=DEFAULT_MAX_WAIT):
+        """
+        Waits for a token and a concurrency slot. Call release() when the request is answered.
+
+        Args:
+            max_wait (float, optional): Seconds to wait at most. Defaults to DEFAULT_MAX_WAIT.
+
+        Returns:
+            float: Seconds spent waiting.
+
+        Raises:
+            RateLimitTimeout: If no slot was free within max_wait seconds.
+        """
+
+        started = time.monotonic()
+        deadline = started + max_wait
+        with self._condition:
+            self._waiting += 1
+            self._stats["max_queue"] = max(self._stats["max_queue"], self._waiting)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self._paused_until:
+                        delay = self._paused_until - now  # Retry-After: nobody goes until then
+                    elif self._in_flight >= int(self.concurrency):
+                        delay = None  # Woken by release()
+                    elif self._tokens < 1:
+                        delay = (1 - self._tokens) / self.rate
+                    else:
+                        break
+                    if now >= deadline:
+                        raise RateLimitTimeout(f"Waited more than {max_wait:.0f}s for a request slot to {self.host}")
+                    self._condition.wait(deadline - now if delay is None else min(delay, deadline - now))
+                self._tokens -= 1
+                self._in_flight += 1
+            finally:
+                self._waiting -= 1
+
+            waited = time.monotonic() - started
+            self._stats["requests"] += 1
+            if waited > 0.001:
+                self._stats["waits"] += 1
+                self._stats["wait_seconds"] += waited
+                self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        if waited > 0.001:
+            instrumentation.record("http.rate_limit_wait", waited, host=self.host)
+        return waited
+
+    def release(self, throttled=False, retry_after=None, answered=True):
+        """
+        Frees the slot taken by acquire() and adapts the limits to how the request went.
+
+        Args:
+            throttled (bool, optional): The host answered 429. Defaults to False.
+            retry_after (float, optional): Seconds the host asked to wait (Retry-After).
+            answered (bool, optional): False if the request failed without an answer (the limits
+                are then left as they are). Defaults to True.
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                self._stats["throttled"] += 1
+                if now - self._decreased >= DECREASE_INTERVAL:
+                    self._decreased = now
+                    self.rate = max(MIN_RATE, self.rate / 2)
+                    self.concurrency = max(1.0, self.concurrency / 2)
+                    self._tokens = min(self._tokens, 0.0)  # Spend the burst: the host is already saturated
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+            elif answered:
+                # The rate grows by a tenth of its maximum per second of successful requests, and
+                # the concurrency limit by one slot per round of them
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10 / self.rate)
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        Reports the current limits and the queue and wait counters.
+
+        Returns:
+            dict: "rate", "concurrency", "in_flight", "queue_depth", "requests", "waits",
+            "wait_seconds" (total), "max_wait", "max_queue" and "throttled".
+        """
+
+        with self._condition:
+            return dict(self._stats, rate=round(self.rate, 2), concurrency=int(self.concurrency),
+                        in_flight=self._in_flight, queue_depth=self._waiting)
+
+
+_limiters = {}
+_limits = dict(HOST_LIMITS)
+_lock = threading.Lock()
+
+
+def configure_rate_limits(limits=None):
+    """
+    Replaces the per-host limits (and forgets the adapted state of every host).
+
+    Args:
+        limits (dict, optional): host -> (requests per second, burst, maximum concurrency).
+            Defaults to HOST_LIMITS; an empty dict turns limiting off.
+    """
+
+    global _limits
+    with _lock:
+        _limits = dict(HOST_LIMITS if limits is None else limits)
+        _limiters.clear()
+
+
+def get_limiter(host):
+    """
+    Returns the limiter of a host, or None if the host is not limited.
+    """
+
+    limiter = _limiters.get(host)
+    if limiter is None and host in _limits:
+        with _lock:
+            limiter = _limiters.get(host)
+            if limiter is None and host in _limits:
+                limiter = _limiters[host] = HostLimiter(host, *_limits[host])
+    return limiter
+
+
+def rate_limit_stats():
+    """
+    Reports the stats() of every host limiter used so far, by host.
+    """
+
+    with _lock:
+        limiters = list(_limiters.values())
+    return {limiter.host: limiter.stats() for limiter in limiters}
@@ -0,0 +1,631 @@
+"""
+Module: Rating Service
+
+This module serves content warnings over HTTP, so tools can rate books without driving the Tk
+window. It is a small asyncio HTTP/1.1 server (keep-alive, JSON in and out) around get_book_info,
+the description fetchers and analyze_description:
+
+    GET  /search?title=...&author=...   candidate books, as get_book_info returns them (without descriptions)
+    GET  /rate?title=...&author=...     warnings of the best candidate for a title
+    GET  /rate/isbn/<ISBN>              warnings of a Google Books volume
+    GET  /rate/work/<OL...W>            warnings of an Open Library work
+    POST /batch                         {"items": [{"isbn": ...} | {"key": ...} | {"title": ..., "author": ...}]}
+    GET  /health, GET /stats            liveness, and request / coalescing / cache counters
+
+Concurrent requests for the same search, ISBN or work key are coalesced (single flight): the first
+one fetches and analyzes, the others wait for its result. The blocking provider calls run on a
+thread pool, and the keyword matching on a process pool, so neither blocks the event loop.
+
+Usage:
+    python rating_service.py [--port 8080] [--processes 4]
+    python rating_service.py --load-test [--requests 2000] [--concurrency 50] [--distinct 50]
+
+The --load-test mode starts stub providers on localhost (with a simulated upstream latency), points
+the service at them, and reports throughput, latency percentiles and how many upstream requests
+the coalescing saved. --google-url, --open-library-url and --open-library-base-url point a normal
+run at other (for example stub) providers.
+
+Attributes:
+    DEFAULT_HOST (str): Interface the service listens on.
+    DEFAULT_PORT (int): Port the service listens on.
+    IO_WORKERS (int): Threads running the blocking provider calls.
+    MAX_BATCH (int): Maximum number of items in a /batch request.
+    MAX_BODY (int): Maximum request body size, in bytes.
+    KEEP_ALIVE_TIMEOUT (float): Seconds an idle client connection is kept open.
+    REQUEST_TIMEOUT (float): Seconds a client has to send the headers and body of a request.
+    MAX_HEADERS (int): Maximum number of headers in a request.
+"""
+
+import argparse  # For command-line arguments
+import asyncio  # For the server and the coalescing
+import json  # For request and response bodies
+import os  # For the default number of worker processes
+import random  # For the load test's request mix
+import threading  # For running the load test's service next to its client
+import time  # For the load test timings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # For the worker pools
+from functools import partial  # For passing arguments to the pools
+from urllib.parse import parse_qs, unquote, urlsplit  # For parsing request targets
+
+import book_api  # For pointing the providers elsewhere
+import content_analysis  # For ANALYSIS_CACHE, looked up on use since configure_analysis_cache replaces it
+from analysis_cache import analysis_key  # For answering repeated analyses without a worker
+from batch_scoring import score_description  # The per-description analysis, run on the workers
+from book_api import (  # Headless API clients
+    BookAPIError,
+    get_book_description_and_img_URL,
+    get_book_info,
+    get_google_books_description_and_img_URL,
+    get_open_books_description,
+    store_book_warnings,
+)
+from content_analysis import KEYWORD_FINGERPRINT, normalize_description  # For the shared results
+from rate_limiter import rate_limit_stats  # For reporting provider queues
+from response_cache import normalize_query  # Searches are coalesced under the same key as cached responses
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+IO_WORKERS = 32
+MAX_BATCH = 100
+MAX_BODY = 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15.0
+REQUEST_TIMEOUT = 10.0  # Seconds to send the headers and body once a request has started
+MAX_HEADERS = 100
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 502: "Bad Gateway"}
+
+
+class RequestError(Exception):
+    """
+    A request the service rejects, answered with the given HTTP status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: while a call is running, callers with its key
+    wait for its result instead of starting another one. Results are not kept once it finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> running task
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key, func):
+        """
+        Runs func() (a coroutine function), or joins the call already running under key.
+
+        Returns:
+            The result of the call (its exception is raised in every caller).
+        """
+
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self.started += 1
+            task.add_done_callback(partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)  # A caller going away does not cancel the others' call
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+
+class RatingService:
+    """
+    The rating operations, coalesced and run on worker pools. Use it through serve(), or call the
+    coroutines directly from another asyncio application.
+
+    Args:
+        processes (int, optional): Worker processes for the keyword matching. Defaults to the
+            number of CPUs; 0 runs the matching on the I/O threads instead.
+        io_workers (int, optional): Threads for the blocking provider calls. Defaults to IO_WORKERS.
+        threshold (int, optional): The threshold for fuzzy matching (default is 80).
+    """
+
+    def __init__(self, processes=None, io_workers=IO_WORKERS, threshold=80):
+        self.threshold = threshold
+        self._io = ThreadPoolExecutor(io_workers, thread_name_prefix="rating-io")
+        self._cpu = ProcessPoolExecutor(processes or os.cpu_count()) if processes != 0 else self._io
+        self._flights = SingleFlight()
+        self.requests = 0
+        self.analyses = 0
+
+    def _run_io(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._io, partial(func, *args))
+
+    async def analyze(self, description):
+        """
+        Analyzes a description on the worker pool (repeated descriptions are answered from ANALYSIS_CACHE).
+        """
+
+        if not description:
+            return []
+        key = analysis_key(normalize_description(description), KEYWORD_FINGERPRINT, self.threshold)
+        cached = content_analysis.ANALYSIS_CACHE.get(key)
+        if cached is not None:
+            return cached
+        self.analyses += 1
+        warnings = await asyncio.get_running_loop().run_in_executor(
+            self._cpu, partial(score_description, description, self.threshold))
+        content_analysis.ANALYSIS_CACHE.set(key, warnings)
+        return warnings
+
+    async def search(self, title, author=""):
+        """
+        Returns the candidate books of a search (coalesced with identical running searches).
+        """
+
+        if not title.strip():
+            raise RequestError(400, "title is required")
+        return await self._flights.do(("search", normalize_query(title, author)),
+                                      lambda: self._run_io(get_book_info, title, author))
+
+    async def _rate(self, book, fetch):
+        description, img_url = await fetch()
+        warnings = await self.analyze(description)
+        await self._run_io(store_book_warnings, book, warnings, KEYWORD_FINGERPRINT)
+        return dict(book, img_url=img_url, described=bool(description), warnings=warnings)
+
+    async def rate_isbn(self, isbn):
+        """
+        Rates the Google Books volume with the given ISBN.
+
+        Returns:
+            dict: "ISBN", "img_url", "described" (whether a description was found) and "warnings".
+        """
+
+        isbn = isbn.strip()
+        if not isbn:
+            raise RequestError(400, "isbn is required")
+        return await self._flights.do(("isbn", isbn), lambda: self._rate(
+            {"ISBN": isbn}, lambda: self._run_io(get_google_books_description_and_img_URL, isbn)))
+
+    async def rate_key(self, key):
+        """
+        Rates the Open Library work with the given key ("OL45804W" or "/works/OL45804W").
+
+        Returns:
+            dict: "key", "img_url" (empty), "described" and "warnings".
+        """
+
+        key = key.strip()
+        if not key:
+            raise RequestError(400, "key is required")
+        if not key.startswith("/works/"):
+            key = f"/works/{key}"
+
+        async def fetch():
+            return await self._run_io(get_open_books_description, key), ""
+
+        return await self._flights.do(("key", key), lambda: self._rate({"key": key}, fetch))
+
+    async def rate_title(self, title, author=""):
+        """
+        Rates the best candidate of a search.
+
+        Returns:
+            dict: The candidate book with "img_url", "described" and "warnings".
+        """
+
+        async def rate():
+            books = await self.search(title, author)
+            if not books:
+                raise RequestError(404, "no book found")
+            book = books[0]  # Best match first
+            return await self._rate(_public_book(book), lambda: self._run_io(get_book_description_and_img_URL, book))
+
+        return await self._flights.do(("title", normalize_query(title, author)), rate)
+
+    async def rate_item(self, item):
+        """
+        Rates one /batch item; errors are reported in the item's result instead of failing the batch.
+        """
+
+        try:
+            if not isinstance(item, dict):
+                raise RequestError(400, "items must be objects")
+            if item.get("isbn"):
+                return await self.rate_isbn(str(item["isbn"]))
+            if item.get("key"):
+                return await self.rate_key(str(item["key"]))
+            if item.get("title"):
+                return await self.rate_title(str(item["title"]), str(item.get("author") or ""))
+            raise RequestError(400, "an item needs an isbn, a key or a title")
+        except (RequestError, BookAPIError) as e:
+            return {"item": item, "error": str(e)}
+
+    def stats(self):
+        """
+        Reports the request, coalescing and analysis counters, and the provider rate limiters.
+        """
+
+        return {"requests": self.requests, "upstream_calls": self._flights.started,
+                "coalesced": self._flights.coalesced, "analyses": self.analyses,
+                "analysis_cache": content_analysis.ANALYSIS_CACHE.stats(), "rate_limits": rate_limit_stats()}
+
+    def close(self):
+        """
+        Shuts the worker pools down.
+        """
+
+        self._io.shutdown(wait=False, cancel_futures=True)
+        if self._cpu is not self._io:
+            self._cpu.shutdown(wait=False, cancel_futures=True)
+
+    async def handle(self, method, target, body):
+        """
+        Answers one HTTP request.
+
+        Returns:
+            tuple: (status, JSON-serializable body).
+        """
+
+        self.requests += 1
+        url = urlsplit(target)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+
+        if method == "POST" and parts == ["batch"]:
+            try:
+                items = json.loads(body or b"{}").get("items")
+            except (ValueError, AttributeError):
+                raise RequestError(400, "the body must be a JSON object with an \"items\" list")
+            if not isinstance(items, list):
+                raise RequestError(400, "the body must be a JSON object with an \"items\" list")
+            if len(items) > MAX_BATCH:
+                raise RequestError(413, f"at most {MAX_BATCH} items per batch")
+            return 200, {"results": await asyncio.gather(*(self.rate_item(item) for item in items))}
+        if method != "GET":
+            raise RequestError(405, f"{method} is not supported here")
+
+        if parts == ["health"]:
+            return 200, {"status": "ok"}
+        if parts == ["stats"]:
+            return 200, self.stats()
+        if parts == ["search"]:
+            books = await self.search(query.get("title", ""), query.get("author", ""))
+            return 200, {"books": [_public_book(book) for book in books]}
+        if parts == ["rate"]:
+            return 200, await self.rate_title(query.get("title", ""), query.get("author", ""))
+        if len(parts) == 3 and parts[:2] == ["rate", "isbn"]:
+            return 200, await self.rate_isbn(parts[2])
+        if len(parts) == 3 and parts[:2] == ["rate", "work"]:
+            return 200, await self.rate_key(parts[2])
+        raise RequestError(404, f"no such endpoint: {url.path}")
+
+
+def _public_book(book):
+    """
+    Returns a book record without its description (responses carry warnings, not descriptions).
+    """
+
+    return {field: value for field, value in book.items() if field != "description"}
+
+
+async def _read_request(reader):
+    """
+    Reads one HTTP/1.1 request. The request line may take KEEP_ALIVE_TIMEOUT seconds to arrive,
+    the headers and body then REQUEST_TIMEOUT seconds.
+
+    Returns:
+        tuple: (method, target, version, headers, body), or None when the client closed the connection.
+
+    Raises:
+        RequestError: If the request is malformed or too large.
+        asyncio.TimeoutError: If the client is too slow.
+    """
+
+    try:
+        line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+    except ValueError:  # Line longer than the stream limit
+        raise RequestError(400, "request line too long")
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise RequestError(400, "malformed request line")
+
+    headers, body = await asyncio.wait_for(_read_headers_and_body(reader), REQUEST_TIMEOUT)
+    return method.upper(), target, version, headers, body
+
+
+async def _read_headers_and_body(reader):
+    """
+    Reads the headers and body of a request whose request line was read.
+    """
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:  # Line longer than the stream limit
+            raise RequestError(400, "header line too long")
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise RequestError(400, "too many headers")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = headers.get("content-length") or "0"
+    if not length.isdigit():
+        raise RequestError(400, "invalid Content-Length")
+    length = int(length)
+    if length > MAX_BODY:
+        raise RequestError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    """
+    Writes a JSON response.
+    """
+
+    body = json.dumps(payload).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+
+
+async def _serve_connection(service, reader, writer):
+    """
+    Answers the requests of one client connection until it closes it or stays idle too long.
+    """
+
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except RequestError as e:
+                _write_response(writer, e.status, {"error": str(e)}, False)
+                break
+            if request is None:
+                break
+            method, target, version, headers, body = request
+            keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            try:
+                status, payload = await service.handle(method, target, body)
+            except RequestError as e:
+                status, payload = e.status, {"error": str(e)}
+            except BookAPIError as e:
+                status, payload = 502, {"error": str(e), "provider": e.provider}
+            except Exception as e:  # Report the failure rather than drop the connection
+                status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+            _write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass  # Idle or vanished clients are simply disconnected
+    finally:
+        writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None, stop=None):
+    """
+    Serves the rating endpoints until cancelled, or until stop is set.
+
+    Args:
+        service (RatingService): The service answering the requests.
+        host (str, optional): Interface to listen on. Defaults to DEFAULT_HOST.
+        port (int, optional): Port to listen on (0 picks a free one). Defaults to DEFAULT_PORT.
+        ready (callable, optional): Called with the bound port once the server is listening.
+        stop (asyncio.Event, optional): Stops the server when set; open connections get a second
+            to finish their requests.
+    """
+
+    connections = set()
+
+    async def connection(reader, writer):
+        task = asyncio.current_task()
+        connections.add(task)
+        try:
+            await _serve_connection(service, reader, writer)
+        except asyncio.CancelledError:
+            pass  # Closed by stop while idle
+        finally:
+            connections.discard(task)
+
+    server = await asyncio.start_server(connection, host, port)
+    if ready is not None:
+        ready(server.sockets[0].getsockname()[1])
+    async with server:
+        if stop is None:
+            await server.serve_forever()
+        else:
+            await stop.wait()
+    if connections:
+        _, pending = await asyncio.wait(set(connections), timeout=1.0)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def configure_providers(google_url=None, open_library_url=None, open_library_base_url=None):
+    """
+    Points the provider clients at other URLs (for example stub providers in a load test).
+    """
+
+    if google_url:
+        book_api.GOOGLE_BOOKS_API_BASE_URL = google_url
+    if open_library_url:
+        book_api.OPEN_BOOKS_API_URL = open_library_url
+    if open_library_base_url:
+        book_api.OPEN_LIBRARY_BASE_URL = open_library_base_url
+
+
+def load_test(requests=2000, concurrency=50, distinct=50, latency=0.05, processes=None):
+    """
+    Runs the service against stub providers and drives it with concurrent clients.
+
+    The clients send a mix of /rate/isbn, /rate/work and /search requests over keep-alive
+    connections, for books picked at random among only `distinct` ones, so identical requests
+    overlap and are coalesced.
+
+    Args:
+        requests (int, optional): Number of requests sent. Defaults to 2000.
+        concurrency (int, optional): Number of concurrent client connections. Defaults to 50.
+        distinct (int, optional): Number of distinct books requested. Defaults to 50.
+        latency (float, optional): Seconds each stub provider request takes. Defaults to 0.05.
+        processes (int, optional): Worker processes of the service. Defaults to the number of CPUs.
+
+    Returns:
+        dict: "requests", "errors", "seconds", "throughput", "p50", "p95", "p99" (milliseconds),
+        "upstream_requests" (requests the stub providers received) and the service's stats().
+    """
+
+    import response_cache  # Disabled, so every upstream call reaches the stubs
+    import book_store
+    from benchmark import SEED, StubServer, make_corpus, percentile  # The benchmarks' stub providers and inputs
+
+    descriptions = make_corpus(150, distinct)
+    upstream = [0]
+    upstream_lock = threading.Lock()
+
+    def route(path, query):
+        with upstream_lock:
+            upstream[0] += 1
+        time.sleep(latency)
+        if path.startswith("/works/"):
+            number = int(path.split("OL")[1].rstrip("W.json"))
+            return 200, "application/json", json.dumps({"description": descriptions[number % distinct]}).encode()
+        if path == "/search.json":
+            return 200, "application/json", json.dumps({"docs": [
+                {"key": "/works/OL1W", "title": query.get("title", [""])[0], "author_name": ["A. Writer"]}]}).encode()
+        q = query.get("q", [""])[0]
+        if q.startswith("isbn:"):
+            number = int(q.split(":")[1])
+            return 200, "application/json", json.dumps({"items": [
+                {"volumeInfo": {"description": descriptions[number % distinct]}}]}).encode()
+        return 200, "application/json", json.dumps({"items": []}).encode()
+
+    stubs = StubServer(route)
+    response_cache.configure_cache(enabled=False)
+    book_store.configure_book_store(enabled=False)
+    configure_providers(f"{stubs.url}/volumes", f"{stubs.url}/search.json", stubs.url)
+    content_analysis.ANALYSIS_CACHE.clear()
+
+    service = RatingService(processes=processes)
+    ready = threading.Event()
+    port = []
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+
+    def run_service():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(serve(service, port=0, stop=stop,
+                                          ready=lambda bound: (port.append(bound), ready.set())))
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run_service, daemon=True)
+    thread.start()
+    ready.wait()
+
+    rng = random.Random(SEED)  # Reproducible: the same requests in the same order on every run
+    targets = []
+    for number in range(requests):
+        book = rng.randrange(distinct)
+        kind = number % 3
+        targets.append(f"/rate/isbn/{book}" if kind == 0 else f"/rate/work/OL{book}W" if kind == 1
+                       else f"/search?title=book%20{book}")
+
+    async def client(queue, latencies, errors):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port[0])
+        try:
+            while queue:
+                target = queue.pop()
+                started = time.perf_counter()
+                writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors[0] += status != 200
+        finally:
+            writer.close()
+
+    async def drive():
+        queue = list(reversed(targets))
+        latencies, errors = [], [0]
+        started = time.perf_counter()
+        await asyncio.gather(*(client(queue, latencies, errors) for _ in range(concurrency)))
+        return latencies, errors[0], time.perf_counter() - started
+
+    try:
+        latencies, errors, seconds = asyncio.run(drive())
+    finally:
+        loop.call_soon_threadsafe(stop.set)
+        thread.join(5)
+        service.close()
+        stubs.close()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies), "errors": errors, "seconds": round(seconds, 3),
+        "throughput": round(len(latencies) / seconds, 1) if seconds else 0.0,
+        "p50": round(percentile(latencies, 0.50), 2), "p95": round(percentile(latencies, 0.95), 2),
+        "p99": round(percentile(latencies, 0.99), 2), "upstream_requests": upstream[0],
+        "service": service.stats(),
+    }
+
+
+def main():
+    """
+    Command-line entry point: runs the service, or a load test against stub providers.
+    """
+
+    parser = argparse.ArgumentParser(description="Serve content warning ratings over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument("--processes", type=int, help="Worker processes for the matching (default: CPUs, 0: threads)")
+    parser.add_argument("--io-workers", type=int, default=IO_WORKERS, help=f"Threads for provider calls (default {IO_WORKERS})")
+    parser.add_argument("--threshold", type=int, default=80, help="Fuzzy matching threshold (default 80)")
+    parser.add_argument("--google-url", help="Google Books volumes URL (for stub providers)")
+    parser.add_argument("--open-library-url", help="Open Library search URL (for stub providers)")
+    parser.add_argument("--open-library-base-url", help="Open Library base URL for work records (for stub providers)")
+    parser.add_argument("--load-test", action="store_true", help="Run a load test against stub providers and exit")
+    parser.add_argument("--requests", type=int, default=2000, help="Load test: number of requests (default 2000)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Load test: concurrent connections (default 50)")
+    parser.add_argument("--distinct", type=int, default=50, help="Load test: distinct books requested (default 50)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Load test: stub provider latency in seconds (default 0.05)")
+    options = parser.parse_args()
+
+    if options.load_test:
+        report = load_test(options.requests, options.concurrency, options.distinct, options.latency, options.processes)
+        print(json.dumps(report, indent=2))
+        return
+
+    configure_providers(options.google_url, options.open_library_url, options.open_library_base_url)
+    service = RatingService(options.processes, options.io_workers, options.threshold)
+    print(f"Serving content warnings on http://{options.host}:{options.port}")
+    try:
+        asyncio.run(serve(service, options.host, options.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+Module: Response Cache
+
+This module keeps a persistent, on-disk cache of API responses (book searches, descriptions and
+cover images) in a SQLite database, so repeat lookups are answered locally instead of going back
+to Google Books or Open Library.
+
+Each entry belongs to a kind (for example "google_search" or "cover_image") with its own time to
+live. The cache has a total size cap; when it is exceeded, the least recently used entries are
+evicted. The total size is kept as a running count, and access times are only recorded when they
+moved by more than ACCESS_RESOLUTION, in batches, so a hit does not cost a write transaction.
+Hit and miss counters are kept per kind. Database errors (such as a locked database) make a
+lookup a miss and a store a no-op instead of failing the request.
+
+Attributes:
+    DEFAULT_CACHE_PATH (str): Default location of the cache database.
+    DEFAULT_MAX_BYTES (int): Default size cap of the cache, in bytes.
+    DEFAULT_TTLS (dict): Default time to live of each kind of entry, in seconds.
+    ACCESS_RESOLUTION (float): Seconds an access time may lag behind before it is updated.
+    ACCESS_BATCH (int): Number of pending access time updates written in one transaction.
+"""
+
+import json  # For storing structured responses
+import logging  # For reporting database errors
+import os  # For the default cache location
+import sqlite3  # For the on-disk store
+import threading  # For sharing one connection between threads
+import time  # For expiry and recency timestamps
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "BOOK_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "book_content_rating", "responses.sqlite3"),
+)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+
+DAY = 24 * 60 * 60
+DEFAULT_TTLS = {
+    "google_search": 1 * DAY,  # Search results change as catalogues are updated
+    "open_search": 1 * DAY,
+    "google_isbn": 30 * DAY,  # Descriptions rarely change
+    "open_description": 30 * DAY,
+    "open_description_missing": 60 * 60,  # Works without a description are looked up again after an hour
+    "cover_image": 90 * DAY,  # Cover images almost never change
+    "cover_thumbnail": 90 * DAY,
+}
+DEFAULT_TTL = 1 * DAY  # For kinds without their own TTL
+ACCESS_RESOLUTION = 60.0  # Eviction order only needs recency to the minute
+ACCESS_BATCH = 100
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def normalize_query(title, author=""):
+    """
+    Builds the cache key of a search: the lowercased title and author with whitespace collapsed.
+
+    Args:
+        title (str): The searched title.
+        author (str, optional): The searched author. Defaults to an empty string.
+
+    Returns:
+        str: The normalized key.
+    """
+
+    return ' '.join(title.lower().split()) + "|" + ' '.join(author.lower().split())
+
+
+class ResponseCache:
+    """
+    A persistent cache of API responses with per-kind TTLs and LRU eviction.
+
+    Args:
+        path (str, optional): Path of the SQLite database (":memory:" for a non-persistent cache).
+            Defaults to DEFAULT_CACHE_PATH.
+        max_bytes (int, optional): Size cap of the cache. Defaults to DEFAULT_MAX_BYTES.
+        ttls (dict, optional): Time to live of each kind, in seconds. Defaults to DEFAULT_TTLS.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = {}  # kind -> number of hits
+        self.misses = {}  # kind -> number of misses
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._accessed = {}  # (kind, key) -> access time not written yet
+
+    def get(self, kind, key):
+        """
+        Returns the cached bytes for a key, or None if missing, expired or unreadable.
+
+        Args:
+            kind (str): The kind of entry.
+            key (str): The entry key.
+
+        Returns:
+            bytes: The cached value, or None.
+        """
+
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._connection.execute(
+                    "SELECT value, size, created, accessed FROM entries WHERE kind = ? AND key = ?",
+                    (kind, key)).fetchone()
+                if row is not None and now - row[2] > self.ttls.get(kind, DEFAULT_TTL):
+                    self._connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                    self._connection.commit()
+                    self._size -= row[1]
+                    self._accessed.pop((kind, key), None)
+                    row = None  # Expired entries count as misses
+                elif row is not None and now - row[3] > ACCESS_RESOLUTION:
+                    self._accessed[(kind, key)] = now
+                    if len(self._accessed) >= ACCESS_BATCH:
+                        self._write_accessed()
+                        self._connection.commit()
+            except sqlite3.Error as e:
+                self._failed("read", e)
+                row = None
+            if row is None:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            return bytes(row[0])
+
+    def set(self, kind, key, value):
+        """
+        Stores bytes under a key, then evicts least recently used entries if the cache is over its cap.
+
+        Args:
+            kind (str): The kind of entry.
+            key (str): The entry key.
+            value (bytes): The value to store.
+        """
+
+        now = time.time()
+        with self._lock:
+            try:
+                old = self._connection.execute(
+                    "SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entries (kind, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                    (kind, key, sqlite3.Binary(value), len(value), now, now))
+                self._accessed.pop((kind, key), None)
+                self._write_accessed()
+                size = self._size + len(value) - (old[0] if old else 0)
+                size = self._evict(size)
+                self._connection.commit()
+                self._size = size
+            except sqlite3.Error as e:
+                self._failed("write", e)
+
+    def _write_accessed(self):
+        """
+        Writes the pending access times. Caller holds the lock and commits.
+        """
+
+        if self._accessed:
+            self._connection.executemany(
+                "UPDATE entries SET accessed = ? WHERE kind = ? AND key = ?",
+                [(accessed, kind, key) for (kind, key), accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _failed(self, action, error):
+        """
+        Rolls back after a database error and logs it. Caller holds the lock.
+        """
+
+        logger.warning("Response cache %s failed: %s", action, error)
+        try:
+            self._connection.rollback()
+            self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        except sqlite3.Error:
+            pass
+
+    def get_json(self, kind, key):
+        """
+        Returns a cached JSON value for a key, or None if missing or expired.
+        """
+
+        value = self.get(kind, key)
+        return None if value is None else json.loads(value.decode("utf-8"))
+
+    def set_json(self, kind, key, value):
+        """
+        Stores a JSON-serializable value under a key.
+        """
+
+        self.set(kind, key, json.dumps(value).encode("utf-8"))
+
+    def _evict(self, total):
+        """
+        Deletes least recently used entries until the total size is within max_bytes. Caller holds the lock.
+
+        Args:
+            total (int): The current total size.
+
+        Returns:
+            int: The total size after eviction.
+        """
+
+        while total > self.max_bytes:
+            rows = self._connection.execute(
+                "SELECT kind, key, size FROM entries ORDER BY accessed LIMIT ?", (ACCESS_BATCH,)).fetchall()
+            if not rows:
+                return 0
+            for kind, key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                self._accessed.pop((kind, key), None)
+                total -= size
+        return total
+
+    def purge_expired(self):
+        """
+        Deletes every expired entry.
+
+        Returns:
+            int: The number of entries deleted.
+        """
+
+        now = time.time()
+        deleted = 0
+        with self._lock:
+            kinds = [row[0] for row in self._connection.execute("SELECT DISTINCT kind FROM entries")]
+            for kind in kinds:
+                cursor = self._connection.execute(
+                    "DELETE FROM entries WHERE kind = ? AND created < ?", (kind, now - self.ttls.get(kind, DEFAULT_TTL)))
+                deleted += cursor.rowcount
+            self._connection.commit()
+            self._size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        return deleted
+
+    def clear(self):
+        """
+        Deletes every entry and resets the counters.
+        """
+
+        with self._lock:
+            self._connection.execute("DELETE FROM entries")
+            self._connection.commit()
+            self._size = 0
+            self._accessed.clear()
+            self.hits.clear()
+            self.misses.clear()
+
+    def stats(self):
+        """
+        Reports the hit/miss counters and the current size of the cache.
+
+        Returns:
+            dict: "hits" and "misses" (totals), "by_kind" (kind -> {"hits", "misses"}),
+            "entries" and "bytes" (current contents).
+        """
+
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            size = self._size
+            kinds = set(self.hits) | set(self.misses)
+            return {
+                "hits": sum(self.hits.values()),
+                "misses": sum(self.misses.values()),
+                "by_kind": {kind: {"hits": self.hits.get(kind, 0), "misses": self.misses.get(kind, 0)} for kind in kinds},
+                "entries": entries,
+                "bytes": size,
+            }
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+
+        with self._lock:
+            try:
+                self._write_accessed()
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._failed("write", e)
+            self._connection.close()
+
+
+_cache = None
+_cache_enabled = True
+_cache_lock = threading.Lock()
+
+
+def configure_cache(path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, ttls=None, enabled=True):
+    """
+    Replaces the shared response cache, or disables caching with enabled=False.
+
+    Args:
+        path (str, optional): Path of the SQLite database. Defaults to DEFAULT_CACHE_PATH.
+        max_bytes (int, optional): Size cap of the cache. Defaults to DEFAULT_MAX_BYTES.
+        ttls (dict, optional): Time to live of each kind, in seconds. Defaults to DEFAULT_TTLS.
+        enabled (bool, optional): Whether API responses are cached at all. Defaults to True.
+    """
+
+    global _cache, _cache_enabled
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = ResponseCache(path, max_bytes, ttls) if enabled else None
+        _cache_enabled = enabled
+
+
+def get_response_cache():
+    """
+    Returns the shared response cache, creating it with the default settings on first use.
+
+    Returns:
+        ResponseCache: The shared cache, or None if caching is disabled or the database cannot be opened.
+    """
+
+    global _cache, _cache_enabled
+    if _cache is None and _cache_enabled:
+        with _cache_lock:
+            if _cache is None and _cache_enabled:
+                try:
+                    _cache = ResponseCache()
+                except (OSError, sqlite3.Error):
+                    _cache_enabled = False  # Work without a cache rather than fail every lookup
+    return _cache
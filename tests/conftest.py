@@ -0,0 +1,8 @@
+"""
+Makes the modules at the repository root importable from the tests.
+"""
+
+import os  # For the repository root
+import sys  # For the import path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
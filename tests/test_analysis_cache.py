@@ -0,0 +1,44 @@
+"""
+Tests for analysis_cache: a bounded LRU memory tier over an optional persistent tier, with keys
+that change whenever the keyword lists or the threshold do.
+"""
+
+from analysis_cache import AnalysisCache, analysis_key, keyword_fingerprint  # The cache under test
+from response_cache import ResponseCache  # The persistent tier
+
+FINGERPRINT = keyword_fingerprint({"Violence": ["gun", "war"]})
+
+
+def test_keys_change_with_the_keyword_lists_and_threshold():
+    key = analysis_key("a war story", FINGERPRINT, 80)
+    assert analysis_key("a war story", FINGERPRINT, 80) == key
+    assert analysis_key("a war story", keyword_fingerprint({"Violence": ["war", "gun"]}), 80) != key
+    assert analysis_key("a war story", FINGERPRINT, 85) != key
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = AnalysisCache(max_entries=2)
+    cache.set("a", ["Violence"])
+    cache.set("b", [])
+    assert cache.get("a") == ["Violence"]  # "b" becomes the least recently used
+    cache.set("c", [])
+    assert cache.get("b") is None
+    assert cache.get("a") == ["Violence"] and cache.get("c") == []
+    assert cache.stats() == {"hits": 3, "misses": 1, "entries": 2}
+
+
+def test_evicted_results_are_read_back_from_the_persistent_tier():
+    persistent = ResponseCache(":memory:")
+    cache = AnalysisCache(max_entries=1, persistent=persistent)
+    cache.set("a", ["Violence"])
+    cache.set("b", [])
+    assert cache.get("a") == ["Violence"]
+    assert AnalysisCache(persistent=persistent).get("b") == []
+    persistent.close()
+
+
+def test_returned_lists_are_copies():
+    cache = AnalysisCache()
+    cache.set("a", ["Violence"])
+    cache.get("a").append("Other")
+    assert cache.get("a") == ["Violence"]
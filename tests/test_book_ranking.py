@@ -0,0 +1,25 @@
+"""
+Tests for book_ranking: clustering records of the same book and ranking candidates.
+"""
+
+from book_ranking import cluster_books, rank_books  # The functions under test
+
+SERIES = [
+    {"title": "Percy Jackson: The Lightning Thief", "author": "Rick Riordan"},
+    {"title": "Percy Jackson: The Sea of Monsters", "author": "Rick Riordan"},
+]
+
+
+def test_volumes_of_one_series_stay_apart():
+    assert [len(cluster) for cluster in cluster_books(SERIES)] == [1, 1]
+
+
+def test_search_finds_the_searched_volume():
+    titles = [book["title"] for book in rank_books(SERIES, "sea of monsters")]
+    assert titles[0] == "Percy Jackson: The Sea of Monsters"
+    assert len(titles) == 2
+
+
+def test_title_without_subtitle_joins_its_main_title():
+    books = [{"title": "Dune: Deluxe Edition", "author": "Frank Herbert"}, {"title": "Dune", "author": "Herbert, Frank"}]
+    assert [len(cluster) for cluster in cluster_books(books)] == [2]
@@ -0,0 +1,45 @@
+"""
+Tests for book_store: a locked store must behave as an empty one instead of raising.
+"""
+
+import sqlite3  # For holding the store's lock from another connection
+
+import pytest  # For the fixtures
+
+from book_store import BookStore  # The store under test
+
+DUNE = {"title": "Dune", "author": "Frank Herbert", "ISBN": "1"}
+
+
+@pytest.fixture
+def locked_store(tmp_path):
+    path = str(tmp_path / "books.sqlite3")
+    store = BookStore(path)
+    store._connection.execute("PRAGMA busy_timeout = 0")
+    store.add_books([DUNE])
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN EXCLUSIVE")
+    yield store
+    other.execute("ROLLBACK")
+    other.close()
+    store.close()
+
+
+def test_reads_of_a_locked_store_are_misses(locked_store):
+    assert locked_store.search("Dune") == ([], 0.0)
+    assert locked_store.get_details(isbn="1") is None
+
+
+def test_writes_to_a_locked_store_are_skipped(locked_store):
+    locked_store.add_books([{"title": "Emma", "ISBN": "2"}])
+    locked_store.remember_search("Emma", "", [])
+    locked_store.set_details(isbn="1", description="Spice.")
+
+
+def test_unlocked_store_keeps_what_was_written(tmp_path):
+    store = BookStore(str(tmp_path / "books.sqlite3"))
+    store.add_books([DUNE])
+    store.set_details(isbn="1", description="Spice.")
+    assert store.search("Dune") == ([DUNE], 0.7)
+    assert store.get_details(isbn="1")["description"] == "Spice."
+    store.close()
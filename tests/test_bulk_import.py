@@ -0,0 +1,16 @@
+"""
+Tests for bulk_import: unreadable JSON lines must become error rows instead of ending the import.
+"""
+
+from bulk_import import lookup_record, read_records  # The functions under test
+
+
+def test_lines_that_are_not_objects_become_error_records(tmp_path):
+    path = tmp_path / "catalogue.jsonl"
+    path.write_text('{"Title": "Dune", "ISBN": "1"}\n[1, 2]\n{broken\n\n"Emma"\n{"isbn": "2"}\n', encoding="utf-8")
+    records = list(read_records(str(path)))
+
+    assert [record["id"] for record in records] == [0, 1, 2, 3, 4]
+    assert [record["isbn"] for record in records] == ["1", "", "", "", "2"]
+    assert [bool(record["error"]) for record in records] == [False, True, True, True, False]
+    assert all(lookup_record(record)["error"] == record["error"] for record in records[1:4])
@@ -0,0 +1,51 @@
+"""
+Tests for the fuzzy pass: both backends must agree with each other and, on texts no longer than
+the keywords, with the original fuzz.partial_ratio matcher (compare_matchers.legacy_analyze_description).
+"""
+
+import random  # For generated string pairs
+
+import pytest  # For skipping without the reference matcher
+
+import fuzzy_index
+from benchmark import make_corpus  # Reproducible descriptions
+from content_analysis import analyze_description  # The analysis under test
+from fuzzy_index import short_text_score
+
+SHORT_TEXTS = ["cat", "Sun", "sui", "war", "gun", "love", "hate", "pain", "fight", "murdr", "a", "ab",
+               "self harm", "starvation", "overdoses", "suicide", "the end"]
+
+
+@pytest.fixture
+def legacy():
+    pytest.importorskip("fuzzywuzzy")
+    from compare_matchers import legacy_analyze_description
+    return legacy_analyze_description
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("backend", ["rapidfuzz", "index"])
+@pytest.mark.parametrize("text", SHORT_TEXTS)
+def test_short_texts_match_the_original_matcher(legacy, backend, text):
+    assert set(analyze_description(text, use_cache=False, backend=backend)) == set(legacy(text))
+
+
+@pytest.mark.filterwarnings("ignore")
+@pytest.mark.parametrize("with_rapidfuzz", [True, False])
+def test_short_text_score_matches_partial_ratio(monkeypatch, with_rapidfuzz):
+    fuzz = pytest.importorskip("fuzzywuzzy.fuzz")
+    if not with_rapidfuzz:
+        monkeypatch.setattr(fuzzy_index, "_rapidfuzz_fuzz", None)
+    rng = random.Random(7)
+    for _ in range(3000):
+        keyword = "".join(rng.choice("abcd ") for _ in range(rng.randint(1, 12)))
+        text = "".join(rng.choice("abcd ") for _ in range(rng.randint(1, len(keyword))))
+        expected = fuzz.partial_ratio(keyword, text)
+        assert short_text_score(keyword, text, 60) == (expected if expected > 60 else 0), (keyword, text)
+
+
+@pytest.mark.filterwarnings("ignore")
+def test_backends_agree():
+    for text in SHORT_TEXTS + make_corpus(30, 60) + make_corpus(150, 10):
+        assert analyze_description(text, use_cache=False, backend="rapidfuzz") == \
+            analyze_description(text, use_cache=False, backend="index")
@@ -0,0 +1,22 @@
+"""
+Tests for incremental_rescore: the stored evidence must give the warnings of analyze_description.
+"""
+
+import pytest  # For parametrized cases
+
+from content_analysis import analyze_description  # The reference analysis
+from incremental_rescore import EvidenceStore  # The store under test
+
+SHORT_DESCRIPTIONS = ["sca", "abus", "gun", "murdr", "war", "a", "drugs", "self harm", "kil"]
+
+
+@pytest.fixture(scope="module")
+def store():
+    evidence = EvidenceStore()
+    yield evidence
+    evidence.close()
+
+
+@pytest.mark.parametrize("description", SHORT_DESCRIPTIONS)
+def test_short_descriptions_match_analyze_description(store, description):
+    assert store.add_book(description, description) == analyze_description(description, use_cache=False, backend="index")
@@ -0,0 +1,48 @@
+"""
+Tests for keyword_matcher: the automaton must find what a substring scan of every keyword finds.
+"""
+
+import pytest  # For parametrized cases
+
+from benchmark import make_corpus  # Reproducible descriptions full of keywords
+from content_analysis import KEYWORD_MATCHER  # The compiled keyword lists
+from keyword_matcher import _is_whole_word, compile_keywords, find_categories, iter_matches  # The matcher under test
+
+OVERLAPPING = compile_keywords({"A": ["he", "She", "hers"], "B": ["  his  ", "he"], "C": ["sheriff"]})
+TEXTS = ["", "ushers", "she said his", "the sheriff", "he", "hershey"] + make_corpus(40, 30)
+
+
+def substring_categories(compiled, text, whole_words=False):
+    """
+    The baseline: one substring search per keyword, as the matching did before the automaton.
+    """
+
+    found = []
+    for category in compiled.categories:
+        for keyword in compiled.keywords_by_category[category]:
+            starts = [start for start in range(len(text)) if text.startswith(keyword, start)]
+            if any(not whole_words or _is_whole_word(text, start, start + len(keyword)) for start in starts):
+                found.append(category)
+                break
+    return found
+
+
+@pytest.mark.parametrize("compiled", [OVERLAPPING, KEYWORD_MATCHER], ids=["overlapping", "keywords"])
+@pytest.mark.parametrize("whole_words", [False, True])
+def test_categories_match_the_substring_scan(compiled, whole_words):
+    for text in TEXTS:
+        text = text.lower()
+        assert find_categories(compiled, text, whole_words) == substring_categories(compiled, text, whole_words)
+
+
+@pytest.mark.parametrize("text", ["ushers", "she said his", "hershey", "the sheriff"])
+def test_every_occurrence_is_reported(text):
+    expected = sorted((start + len(keyword), keyword) for keyword in OVERLAPPING.keyword_masks
+                      for start in range(len(text)) if text.startswith(keyword, start))
+    assert sorted(iter_matches(OVERLAPPING, text)) == expected
+
+
+def test_keywords_are_normalized_and_merged():
+    assert OVERLAPPING.keywords_by_category["A"] == ["he", "she", "hers"]
+    assert OVERLAPPING.keywords_by_category["B"] == ["his", "he"]
+    assert OVERLAPPING.keyword_masks["he"] == 0b011
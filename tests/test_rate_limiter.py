@@ -0,0 +1,92 @@
+"""
+Tests for rate_limiter: requests are paced by the token bucket and the concurrency limit, and a
+429 lowers the limits and sends the request back in line instead of failing it.
+"""
+
+import threading  # For requests waiting in line
+
+import pytest  # For the fixtures and expected errors
+
+import rate_limiter  # For the adaptive limits
+from benchmark import StubServer  # A local host to limit
+from http_client import http_get  # The client that goes through the limiter
+from rate_limiter import HostLimiter, RateLimitTimeout, configure_rate_limits, get_limiter  # The limiter under test
+
+
+@pytest.fixture
+def limits():
+    yield configure_rate_limits
+    configure_rate_limits()
+
+
+def test_burst_starts_at_once_then_requests_are_paced():
+    limiter = HostLimiter("host", rate=20, burst=2, max_concurrency=10)
+    waits = [limiter.acquire() for _ in range(3)]
+    assert waits[0] < 0.01 and waits[1] < 0.01
+    assert waits[2] >= 0.04  # One token every 1/20 s
+    assert limiter.stats()["waits"] == 1
+
+
+def test_requests_wait_for_a_concurrency_slot():
+    limiter = HostLimiter("host", rate=1000, burst=10, max_concurrency=1)
+    limiter.acquire()
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(max_wait=0.05)
+
+    waiter = threading.Thread(target=limiter.acquire)
+    waiter.start()
+    while limiter.stats()["queue_depth"] == 0:
+        waiter.join(0.001)
+    limiter.release()
+    waiter.join(1)
+    assert not waiter.is_alive()
+    assert limiter.stats()["in_flight"] == 1
+
+
+def test_throttling_halves_the_limits_once_then_they_grow_back():
+    limiter = HostLimiter("host", rate=10, burst=10, max_concurrency=8)
+    for _ in range(3):
+        limiter.acquire()
+    limiter.release(throttled=True)
+    limiter.release(throttled=True)  # Within DECREASE_INTERVAL: not counted again
+    assert (limiter.rate, limiter.concurrency) == (5.0, 4.0)
+    limiter.release()
+    assert 5.0 < limiter.rate <= 10 and 4.0 < limiter.concurrency <= 8
+    assert limiter.stats()["throttled"] == 2
+
+
+def test_limits_never_go_below_the_minimum(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "DECREASE_INTERVAL", 0.0)
+    limiter = HostLimiter("host", rate=1, burst=1, max_concurrency=2)
+    for _ in range(10):
+        limiter._in_flight += 1
+        limiter.release(throttled=True)
+    assert (limiter.rate, limiter.concurrency) == (rate_limiter.MIN_RATE, 1.0)
+
+
+def test_retry_after_pauses_the_host():
+    limiter = HostLimiter("host", rate=1000, burst=10, max_concurrency=4)
+    limiter.acquire()
+    limiter.release(throttled=True, retry_after=0.1)
+    assert limiter.acquire() >= 0.09
+
+
+def test_unlisted_hosts_are_not_limited(limits):
+    limits({"api.example": (1.0, 1, 1)})
+    assert get_limiter("other.example") is None
+    assert get_limiter("api.example") is get_limiter("api.example")
+    limits({})
+    assert get_limiter("api.example") is None
+
+
+def test_throttled_requests_are_sent_again(limits):
+    answers = [429, 429, 200]
+    server = StubServer(lambda path, query: (answers.pop(0), "text/plain", b"ok"))
+    limits({"127.0.0.1": (1000.0, 10, 4)})
+    try:
+        response = http_get(server.url, timeout=5)
+    finally:
+        server.close()
+    assert response.status_code == 200
+    stats = get_limiter("127.0.0.1").stats()
+    assert stats["requests"] == 3 and stats["throttled"] == 2 and stats["in_flight"] == 0
@@ -0,0 +1,82 @@
+"""
+Tests for response_cache: entries must expire after the TTL of their kind and the least recently
+used entries must be evicted once the cache is over its size cap.
+"""
+
+import pytest  # For the fixtures
+
+import response_cache  # For the access time resolution
+from response_cache import ResponseCache  # The cache under test
+
+
+class Clock:
+    """
+    A settable replacement for time.time.
+    """
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(clock):
+    cache = ResponseCache(":memory:", max_bytes=30, ttls={"short": 10, "long": 1000})
+    yield cache
+    cache.close()
+
+
+def test_entries_expire_after_the_ttl_of_their_kind(cache, clock):
+    cache.set("short", "a", b"1")
+    cache.set("long", "a", b"2")
+    clock.now += 10
+    assert cache.get("short", "a") == b"1"
+    clock.now += 1
+    assert cache.get("short", "a") is None
+    assert cache.get("long", "a") == b"2"
+    assert cache.stats()["by_kind"]["short"] == {"hits": 1, "misses": 1}
+    assert cache.stats()["bytes"] == 1
+
+
+def test_purge_expired_deletes_only_expired_entries(cache, clock):
+    cache.set("short", "a", b"1")
+    clock.now += 11
+    cache.set("short", "b", b"2")
+    assert cache.purge_expired() == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    for key in "abc":
+        cache.set("long", key, b"x" * 10)
+        clock.now += 1
+    clock.now += response_cache.ACCESS_RESOLUTION
+    assert cache.get("long", "a") == b"x" * 10  # "a" becomes the most recently used
+    cache.set("long", "d", b"x" * 10)
+
+    assert cache.get("long", "b") is None
+    assert [cache.get("long", key) is not None for key in "acd"] == [True, True, True]
+    assert cache.stats()["bytes"] == 30
+
+
+def test_replacing_an_entry_keeps_the_size_count(cache):
+    cache.set("long", "a", b"x" * 20)
+    cache.set("long", "a", b"x" * 5)
+    cache.set("long", "b", b"x" * 25)
+    assert cache.stats()["bytes"] == 30
+    assert cache.get("long", "a") == b"x" * 5
+
+
+def test_oversized_entry_is_not_kept(cache):
+    cache.set("long", "a", b"x" * 31)
+    assert cache.get("long", "a") is None
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,70 @@
+"""
+Tests for warning_columns: saved columns must load back with the same rows and query results.
+"""
+
+import pytest  # For parametrized cases
+
+from warning_columns import CATEGORY_REGISTRY, WarningColumns, load_columns  # The columns under test
+
+SELF_HARM, VIOLENCE, ANIMAL_ABUSE = "Self-Harm/Suicide", "Violence & Graphic Content", "Animal Abuse"
+BOOKS = [
+    ("book-1", [SELF_HARM], {SELF_HARM: 90}),
+    ("book-2", [SELF_HARM, VIOLENCE], {SELF_HARM: 40, VIOLENCE: 255}),
+    ("livre-é", [], {}),
+    ("book-4", [ANIMAL_ABUSE, VIOLENCE], {ANIMAL_ABUSE: 7}),
+]
+QUERIES = [
+    {},
+    {"all_of": [SELF_HARM]},
+    {"all_of": [SELF_HARM], "none_of": [VIOLENCE]},
+    {"any_of": [ANIMAL_ABUSE, SELF_HARM]},
+    {"none_of": list(CATEGORY_REGISTRY)},
+]
+
+
+def build(books, with_scores):
+    columns = WarningColumns(with_scores=with_scores)
+    for book_id, warnings, scores in books:
+        columns.append(book_id, warnings, scores)
+    return columns
+
+
+@pytest.mark.parametrize("with_scores", [False, True])
+@pytest.mark.parametrize("books", [BOOKS, []], ids=["books", "empty"])
+def test_saved_columns_load_back(tmp_path, books, with_scores):
+    built = build(books, with_scores)
+    path = str(tmp_path / "warnings.bcw")
+    built.save(path)
+    loaded = load_columns(path)
+
+    assert len(loaded) == len(books)
+    assert [loaded.book_id(row) for row in range(len(loaded))] == [book[0] for book in books]
+    assert [loaded.warnings(row) for row in range(len(loaded))] == \
+        [[name for name in CATEGORY_REGISTRY if name in book[1]] for book in books]
+    for query in QUERIES:
+        assert list(loaded.select(**query)) == list(built.select(**query))
+        assert loaded.count(**query) == built.count(**query)
+    if with_scores:
+        for category in CATEGORY_REGISTRY:
+            assert list(loaded.score_column(category)) == [book[2].get(category, 0) for book in books]
+    loaded.close()
+
+
+def test_select_finds_the_matching_rows():
+    columns = build(BOOKS, with_scores=False)
+    assert list(columns.select(all_of=[SELF_HARM], none_of=[VIOLENCE])) == [0]
+    assert list(columns.select(any_of=[ANIMAL_ABUSE, SELF_HARM])) == [0, 1, 3]
+    assert columns.count(none_of=list(CATEGORY_REGISTRY)) == 1
+
+
+def test_close_releases_the_file_after_queries(tmp_path):
+    path = str(tmp_path / "warnings.bcw")
+    build(BOOKS, with_scores=True).save(path)
+    loaded = load_columns(path)
+    loaded.select(all_of=[SELF_HARM])
+    scores = loaded.score_column(VIOLENCE)
+    loaded.close()
+    loaded.close()
+    assert list(scores) == [0, 255, 0, 0]
+    with pytest.raises(ValueError):
+        loaded.append("book-5", [])
@@ -0,0 +1,421 @@
+"""
+Module: Warning Columns
+
+This module stores the content warnings of a whole catalogue compactly. Each book's warnings are a
+16-bit mask, one bit per category, with the bit of each category fixed by CATEGORY_REGISTRY. The
+rows are kept in array-backed columns (book IDs, masks and optional per-category scores) instead
+of one list of category names per book.
+
+The columns can be saved to a binary file and loaded back memory-mapped, so a large catalogue is
+queried without reading it into memory. Queries such as "flagged Self-Harm/Suicide but not
+Violence & Graphic Content" run over the whole mask column at once (bytes.translate and big-integer
+operations), without building a Python object per book.
+
+Usage:
+    python warning_columns.py export ratings.jsonl ratings.bcw
+    python warning_columns.py query ratings.bcw --all "Self-Harm/Suicide" --none "Violence & Graphic Content"
+
+File layout (little-endian; every section starts on an 8-byte boundary):
+    header: magic b"BCRW", format version, flags (bit 0: has scores), registry length, row count
+    registry: the category names in bit order, as a JSON list
+    masks: one uint16 per row
+    ID offsets: row count + 1 uint64 offsets into the ID bytes
+    ID bytes: the UTF-8 book IDs, back to back
+    scores (if present): one column of uint8 per category, one byte per row
+
+Attributes:
+    CATEGORY_REGISTRY (tuple): The category names, in bit order. Append new categories at the end
+        and never reorder or reuse entries, so masks written earlier keep their meaning.
+    CATEGORY_IDS (dict): Category name -> bit number.
+    MASK_BITS (int): Number of categories a mask can hold.
+"""
+
+import argparse  # For command-line arguments
+import csv  # For reading CSV results
+import json  # For the registry and JSON lines results
+import mmap  # For loading columns without reading them
+import re  # For collecting the matching rows
+import struct  # For the file header
+import sys  # For the byte order
+from array import array  # For the columns
+
+from bulk_import import detect_format  # Same format rules as the results it reads
+from content_analysis import KEYWORD_WARNINGS  # For checking the registry
+
+CATEGORY_REGISTRY = (
+    "Animal Abuse",
+    "Sexual Violence",
+    "Body Image/Disordered Eating",
+    "Self-Harm/Suicide",
+    "Discrimination/Hate Crimes",
+    "Violence & Graphic Content",
+    "Substance Abuse/Addiction",
+    "Child Abuse/Domestic Violence",
+    "Homicide/Gun Violence",
+)
+CATEGORY_IDS = {name: bit for bit, name in enumerate(CATEGORY_REGISTRY)}
+MASK_BITS = 16
+
+_MAGIC = b"BCRW"
+_VERSION = 1
+_HAS_SCORES = 1
+_HEADER = struct.Struct("<4sHHIQ")  # magic, version, flags, registry length, rows
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+# Byte -> b"\x01" if it has the bit set, b"\x00" otherwise, for each of the 8 bits of a byte
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+if len(CATEGORY_REGISTRY) > MASK_BITS:
+    raise ValueError(f"CATEGORY_REGISTRY holds more than {MASK_BITS} categories.")
+if set(KEYWORD_WARNINGS) - set(CATEGORY_REGISTRY):
+    raise ValueError("Every KEYWORD_WARNINGS category needs an entry in CATEGORY_REGISTRY.")
+
+
+def encode_warnings(warnings, category_ids=CATEGORY_IDS):
+    """
+    Encodes a list of warning categories as a mask.
+
+    Args:
+        warnings (iterable): Category names, as returned by analyze_description.
+        category_ids (dict, optional): Category name -> bit number. Defaults to CATEGORY_IDS.
+
+    Returns:
+        int: The mask, with the bit of every listed category set.
+
+    Raises:
+        ValueError: If a category has no bit in the registry.
+    """
+
+    mask = 0
+    for name in warnings:
+        try:
+            mask |= 1 << category_ids[name]
+        except KeyError:
+            raise ValueError(f"Unknown warning category: {name!r}") from None
+    return mask
+
+
+def decode_mask(mask, registry=CATEGORY_REGISTRY):
+    """
+    Decodes a mask into its category names, in registry order.
+    """
+
+    return [name for bit, name in enumerate(registry) if mask >> bit & 1]
+
+
+def _pad(size):
+    return -size % 8
+
+
+class WarningColumns:
+    """
+    The warnings of many books in columns: book IDs, masks and optional per-category scores.
+
+    Rows are added with append() and read back by row number. A loaded file (see load_columns)
+    is read-only and its columns are memoryviews over the mapped file, released by close().
+
+    Args:
+        with_scores (bool, optional): Keep a score column (0-255) for each category. Defaults to False.
+        registry (tuple, optional): The category names in bit order. Defaults to CATEGORY_REGISTRY.
+    """
+
+    def __init__(self, with_scores=False, registry=CATEGORY_REGISTRY):
+        self.registry = tuple(registry)
+        self.category_ids = {name: bit for bit, name in enumerate(self.registry)}
+        self.masks = array("H")
+        self.id_offsets = array("Q", [0])
+        self.id_bytes = bytearray()
+        self.scores = [array("B") for _ in self.registry] if with_scores else None
+        self._planes = None  # Low and high bytes of every mask, for queries (until the next append)
+        self._mapped = None
+        self._views = []  # Memoryviews over the mapped file, released before it is closed
+
+    def __len__(self):
+        return len(self.masks)
+
+    def append(self, book_id, warnings, scores=None):
+        """
+        Adds a book.
+
+        Args:
+            book_id (str): The book identifier.
+            warnings (iterable): Its warning categories.
+            scores (dict, optional): Category name -> score (0-255); missing categories score 0.
+                Ignored if the columns have no scores.
+
+        Raises:
+            ValueError: If a category is not in the registry, or the columns were loaded from a file.
+        """
+
+        if self._mapped is not None:
+            raise ValueError("Columns loaded from a file are read-only.")
+        self.masks.append(encode_warnings(warnings, self.category_ids))
+        self.id_bytes += book_id.encode("utf-8")
+        self.id_offsets.append(len(self.id_bytes))
+        if self.scores is not None:
+            scores = scores or {}
+            for name, column in zip(self.registry, self.scores):
+                column.append(scores.get(name, 0))
+        self._planes = None
+
+    def book_id(self, row):
+        """
+        Returns the book ID of a row.
+        """
+
+        return bytes(self.id_bytes[self.id_offsets[row]:self.id_offsets[row + 1]]).decode("utf-8")
+
+    def warnings(self, row):
+        """
+        Returns the warning categories of a row, in registry order.
+        """
+
+        return decode_mask(self.masks[row], self.registry)
+
+    def score_column(self, category):
+        """
+        Returns the score column of a category (one value per row). For loaded columns it is a
+        copy, so it stays usable after close().
+
+        Raises:
+            ValueError: If the columns have no scores.
+        """
+
+        if self.scores is None:
+            raise ValueError("These columns have no scores.")
+        column = self.scores[self._bit(category)]
+        return array("B", column) if self._mapped is not None else column
+
+    def _bit(self, category):
+        try:
+            return self.category_ids[category]
+        except KeyError:
+            raise ValueError(f"Unknown warning category: {category!r}") from None
+
+    def _mask_planes(self):
+        """
+        Splits the mask column into its low and high bytes (one byte per row each).
+        """
+
+        if self._planes is None:
+            data = self.masks.tobytes() if isinstance(self.masks, array) else bytes(self.masks)
+            if not _LITTLE_ENDIAN and isinstance(self.masks, array):
+                swapped = array("H", self.masks)
+                swapped.byteswap()
+                data = swapped.tobytes()
+            self._planes = (data[0::2], data[1::2])
+        return self._planes
+
+    def _flags(self, categories):
+        """
+        Returns, for each row, whether any of the categories is set: one byte (0 or 1) per row,
+        as a big integer so several conditions can be combined in one operation.
+        """
+
+        planes = self._mask_planes()
+        flags = 0
+        for category in categories:
+            bit = self._bit(category)
+            flags |= int.from_bytes(planes[bit // 8].translate(_BIT_TABLES[bit % 8]), "big")
+        return flags
+
+    def select(self, all_of=(), none_of=(), any_of=()):
+        """
+        Finds the rows matching a condition on their warnings, over the whole mask column at once.
+
+        Args:
+            all_of (iterable, optional): Categories a row must have.
+            none_of (iterable, optional): Categories a row must not have.
+            any_of (iterable, optional): Categories a row must have at least one of (ignored if empty).
+
+        Returns:
+            array: The matching row numbers, in order.
+
+        Raises:
+            ValueError: If a category is not in the registry.
+        """
+
+        count = len(self)
+        ones = int.from_bytes(b"\x01" * count, "big")
+        selected = ones
+        for category in all_of:
+            selected &= self._flags([category])
+        if none_of:
+            selected &= ones ^ self._flags(none_of)
+        if any_of:
+            selected &= self._flags(any_of)
+        matches = selected.to_bytes(count, "big")
+        return array("Q", (found.start() for found in re.finditer(b"\x01", matches)))
+
+    def count(self, all_of=(), none_of=(), any_of=()):
+        """
+        Counts the rows matching a condition (see select).
+        """
+
+        return len(self.select(all_of, none_of, any_of))
+
+    def save(self, path):
+        """
+        Writes the columns to a binary file (see the module docstring for the layout).
+
+        Args:
+            path (str): Path of the file.
+        """
+
+        registry = json.dumps(list(self.registry)).encode("utf-8")
+        sections = [registry, self._little_endian(self.masks), self._little_endian(self.id_offsets),
+                    bytes(self.id_bytes)]
+        sections.extend(bytes(column) for column in self.scores or ())
+        with open(path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, _HAS_SCORES if self.scores is not None else 0,
+                                    len(registry), len(self)))
+            file.write(b"\x00" * _pad(_HEADER.size))
+            for section in sections:
+                file.write(section)
+                file.write(b"\x00" * _pad(len(section)))
+
+    @staticmethod
+    def _little_endian(column):
+        if isinstance(column, array) and not _LITTLE_ENDIAN:
+            column = array(column.typecode, column)
+            column.byteswap()
+        return bytes(column)
+
+    def close(self):
+        """
+        Releases the mapped file of loaded columns (their columns are unusable afterwards).
+
+        Raises:
+            BufferError: If the caller still holds a memoryview it derived from one of the columns.
+        """
+
+        if self._mapped is not None and not self._mapped.closed:
+            self.masks = self.id_offsets = self.id_bytes = self.scores = self._planes = None
+            for view in reversed(self._views):
+                view.release()
+            self._views = []
+            self._mapped.close()
+
+
+def load_columns(path):
+    """
+    Loads columns saved with WarningColumns.save by memory-mapping the file.
+
+    The mask, ID and score columns are memoryviews over the mapping, so only the pages that are
+    used get read. On a big-endian host the masks and ID offsets are copied and byte-swapped.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        WarningColumns: Read-only columns; call close() to release the file.
+
+    Raises:
+        ValueError: If the file is not a warning columns file or uses a newer format version.
+    """
+
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    views = [view]
+    try:
+        magic, version, flags, registry_length, rows = _HEADER.unpack_from(view)
+    except struct.error:
+        magic = version = None
+    if magic != _MAGIC or version is None or version > _VERSION:
+        view.release()
+        mapped.close()
+        raise ValueError(f"{path} is not a warning columns file this version can read.")
+
+    position = _HEADER.size + _pad(_HEADER.size)
+
+    def section(size):
+        nonlocal position
+        start = position
+        position += size + _pad(size)
+        views.append(view[start:start + size])
+        return views[-1]
+
+    registry = json.loads(bytes(section(registry_length)).decode("utf-8"))
+    columns = WarningColumns(registry=registry)
+    columns.masks = section(rows * 2).cast("H")
+    columns.id_offsets = section((rows + 1) * 8).cast("Q")
+    views.extend((columns.masks, columns.id_offsets))
+    if not _LITTLE_ENDIAN:
+        for name in ("masks", "id_offsets"):
+            column = array(getattr(columns, name).format, getattr(columns, name).tobytes())
+            column.byteswap()
+            setattr(columns, name, column)
+    columns.id_bytes = section(columns.id_offsets[rows])
+    if flags & _HAS_SCORES:
+        columns.scores = [section(rows) for _ in registry]
+    columns._mapped = mapped
+    columns._views = views
+    return columns
+
+
+def read_results(path, input_format=None):
+    """
+    Reads the rated books of a bulk_import output file, skipping the records that were not rated.
+
+    Yields:
+        tuple: (book ID, list of warning categories).
+    """
+
+    input_format = input_format or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as file:
+        if input_format == "csv":
+            for row in csv.DictReader(file):
+                if not row.get("error"):
+                    yield row["id"], [name for name in row["warnings"].split("; ") if name]
+        else:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    if not record.get("error") and record.get("warnings") is not None:
+                        yield str(record["id"]), record["warnings"]
+
+
+def main():
+    """
+    Command-line entry point: exports bulk_import results to a columns file, or queries one.
+    """
+
+    parser = argparse.ArgumentParser(description="Store and query catalogue warnings as compact columns.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Write the results of bulk_import.py to a columns file")
+    export.add_argument("input", help="JSON lines or CSV output of bulk_import.py")
+    export.add_argument("output", help="Columns file to write")
+    export.add_argument("--input-format", choices=("csv", "jsonl"), help="Input format (default: from the extension)")
+    query = commands.add_parser("query", help="List the books of a columns file matching a condition")
+    query.add_argument("path", help="Columns file")
+    query.add_argument("--all", action="append", default=[], metavar="CATEGORY", help="Category the books must have")
+    query.add_argument("--none", action="append", default=[], metavar="CATEGORY", help="Category the books must not have")
+    query.add_argument("--any", action="append", default=[], metavar="CATEGORY",
+                       help="Categories the books must have at least one of")
+    query.add_argument("--count", action="store_true", help="Only print the number of matching books")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        columns = WarningColumns()
+        for book_id, warnings in read_results(args.input, args.input_format):
+            columns.append(book_id, warnings)
+        columns.save(args.output)
+        print(f"Books written: {len(columns)}")
+        return
+
+    columns = load_columns(args.path)
+    try:
+        rows = columns.select(args.all, args.none, args.any)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.count:
+        print(len(rows))
+    else:
+        for row in rows:
+            print(columns.book_id(row))
+    columns.close()
+
+
+if __name__ == "__main__":
+    main()